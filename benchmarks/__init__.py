@@ -0,0 +1,4 @@
+"""
+Offline benchmarks: fake Discord objects and an in-memory database so handlers can be
+timed without a gateway connection or a Mongo server
+"""
@@ -0,0 +1,142 @@
+"""
+Compare the memory each cache profile costs by feeding synthetic gateway payloads
+through py-cord's own ConnectionState.
+
+    python -m benchmarks.cache_profiles [--guilds 5] [--members 20000] [--messages 5000]
+
+Members arrive the way the gateway would deliver them for the profile's intents:
+chunked member lists (with presences for the online share) when the profile chunks,
+otherwise nothing. Message content is only sent with the message_content intent.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from discord.state import ConnectionState
+from cache_profiles import CACHE_PROFILES, cache_options
+
+ONLINE_SHARE = 0.3
+JOINED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat()
+
+
+def user_payload(user_id):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None, "bot": False}
+
+
+def member_payload(user_id, role_id):
+    return {"user": user_payload(user_id), "roles": [str(role_id)], "joined_at": JOINED_AT, "deaf": False, "mute": False, "nick": None, "flags": 0}
+
+
+def presence_payload(user_id):
+    return {
+        "user": {"id": str(user_id)},
+        "status": "online",
+        "activities": [{"name": "Benchmarking", "type": 0}],
+        "client_status": {"desktop": "online"},
+    }
+
+
+def guild_payload(guild_id, member_count, options):
+    intents = options["intents"]
+    role_id = guild_id + 1
+    members, presences = [], []
+    if options["chunk_guilds_at_startup"]:
+        first = guild_id * 1_000_000
+        members = [member_payload(first + i, role_id) for i in range(member_count)]
+        if intents.presences:
+            presences = [presence_payload(first + i) for i in range(int(member_count * ONLINE_SHARE))]
+    everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "colors": {"primary_color": 0, "secondary_color": None, "tertiary_color": None}, "hoist": False, "managed": False, "mentionable": False}
+    return {
+        "id": str(guild_id),
+        "name": f"Guild {guild_id}",
+        "owner_id": str(guild_id * 1_000_000),
+        "member_count": member_count,
+        "large": True,
+        "features": [],
+        "emojis": [],
+        "stickers": [],
+        "roles": [everyone, {**everyone, "id": str(role_id), "name": "Member", "position": 1}],
+        "channels": [{"id": str(guild_id + 2), "type": 0, "name": "general", "position": 0, "permission_overwrites": []}],
+        "members": members,
+        "presences": presences,
+    }
+
+
+def message_payload(message_id, guild_id, author_id, content):
+    return {
+        "id": str(message_id),
+        "channel_id": str(guild_id + 2),
+        "guild_id": str(guild_id),
+        "author": user_payload(author_id),
+        "member": {"roles": [], "joined_at": JOINED_AT, "deaf": False, "mute": False, "flags": 0},
+        "content": content,
+        "timestamp": JOINED_AT,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def measure(profile, guilds, members, messages):
+    """Build a profile's cache and return what it holds and the bytes it allocated"""
+    options = cache_options(profile)
+    content = "benchmark message " * 4 if options["intents"].message_content else ""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = ConnectionState(dispatch=lambda *args, **kwargs: None, handlers={}, hooks={}, http=None, loop=None, **options)
+    for guild_id in range(1, guilds + 1):
+        state._add_guild_from_data(guild_payload(guild_id * 10, members, options))
+    for i in range(messages):
+        guild_id = (i % guilds + 1) * 10
+        state.parse_message_create(message_payload(10**15 + i, guild_id, guild_id * 1_000_000 + i % members, content))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "profile": profile,
+        "members": sum(len(guild._members) for guild in state._guilds.values()),
+        "users": len(state._users),
+        "messages": len(state._messages or ()),
+        "bytes": allocated,
+        "seconds": elapsed,
+    }
+    del state
+    return result
+
+
+def format_results(results):
+    lines = [f"{'profile':<11} {'members':>9} {'users':>9} {'messages':>9} {'memory':>10} {'bytes/member':>13} {'build':>8}"]
+    for row in results:
+        per_member = row["bytes"] / row["members"] if row["members"] else 0
+        lines.append(
+            f"{row['profile']:<11} {row['members']:>9} {row['users']:>9} {row['messages']:>9} "
+            f"{row['bytes'] / 2**20:>8.1f}MB {per_member:>13.0f} {row['seconds']:>7.2f}s"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the memory cost of each cache profile")
+    parser.add_argument("--guilds", type=int, default=5, help="guilds to create")
+    parser.add_argument("--members", type=int, default=20_000, help="members per guild")
+    parser.add_argument("--messages", type=int, default=5000, help="MESSAGE_CREATE events to replay")
+    parser.add_argument("--profiles", default=",".join(CACHE_PROFILES), help="comma-separated profiles to measure")
+    args = parser.parse_args(argv)
+    profiles = [name for name in args.profiles.split(",") if name]
+    unknown = set(profiles) - set(CACHE_PROFILES)
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(sorted(unknown))}")
+    print(format_results([measure(profile, args.guilds, args.members, args.messages) for profile in profiles]))
+
+
+if __name__ == "__main__":
+    main()
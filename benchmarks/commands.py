@@ -0,0 +1,209 @@
+"""
+Run every slash command handler in commands/ against fake guilds and an in-memory database.
+
+    python -m benchmarks.commands [--members 100000] [--iterations 2000] [--only serverinfo,warn]
+
+Handlers are called directly (option parsing and the HTTP layer are skipped), so results
+track the cost of the bot's own code: embed building, cache lookups and database calls.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+import db
+from cache import embed_cache, guild_settings_cache, cache_guild_settings
+from log_dispatcher import log_dispatcher
+from ratelimit import DEFAULT_LIMITS
+from member_stats import member_counters, membership_index
+from project import _discover_modules
+from benchmarks.fakes import FakeBot, FakeContext, MemoryDatabase, make_guild
+
+ALLOCATION_SAMPLES = 200
+SKIPPED = {"bot reload"}  # re-imports modules from disk
+
+
+def iter_commands(commands):
+    for command in commands:
+        yield command
+        yield from iter_commands(getattr(command, "subcommands", []))
+
+
+def load_cogs(bot):
+    """Run every command module's setup() against the fake bot, quietly"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for module_name in _discover_modules(Path(__file__).parent.parent / "commands"):
+            importlib.import_module(module_name).setup(bot)
+    handlers = {}
+    for cog in bot.cogs.values():
+        for command in iter_commands(cog.get_commands()):
+            if getattr(command, "callback", None) is not None:
+                handlers[command.qualified_name] = (cog, command.callback)
+    return handlers
+
+
+class Workload:
+    """One guild, its moderators and targets, and the arguments each command is called with"""
+
+    def __init__(self, member_count):
+        self.guild = make_guild(member_count)
+        self.bot = FakeBot([self.guild])
+        self.moderator = self.guild.owner
+        self.members = self.guild.members
+        self.target = self.members[0]
+        self.log_channel = self.guild.text_channels[0]
+        self._next = 1
+
+    def next_member(self):
+        # Rotate through members so mod actions don't all pile onto one user
+        member = self.members[self._next % (len(self.members) - 2)]
+        self._next += 1
+        return member
+
+    async def seed(self):
+        db.db = MemoryDatabase()
+        await db.ensure_indexes()
+        guild_settings_cache.clear()
+        embed_cache.clear()
+        member_counters.drop(self.guild.id)
+        settings = {"_id": self.guild.id, "log_channel_id": self.log_channel.id, "fun_enabled": True, "modlog_enabled": True}
+        # One moderator makes every call, so lift the rate limits to time the commands themselves
+        settings["rate_limits"] = {name: [0, 60] for name in DEFAULT_LIMITS}
+        await db.get_guild_settings_collection().insert_one(settings)
+        cache_guild_settings(self.guild.id, settings)
+        start = datetime.utcnow() - timedelta(days=365)
+        logs = [
+            {
+                "guild_id": self.guild.id,
+                "user_id": self.target.id if i < 35 else self.members[i % len(self.members)].id,
+                "action": ("warn", "kick", "ban")[i % 3],
+                "reason": "benchmark",
+                "moderator_id": self.moderator.id,
+                "timestamp": start + timedelta(hours=i)
+            }
+            for i in range(5000)
+        ]
+        await db.get_mod_logs_collection().insert_many(logs)
+
+    def mass_targets(self, count=50):
+        return " ".join(str(self.next_member().id) for _ in range(count))
+
+    def arguments(self, name):
+        """Keyword arguments for one call of the named command"""
+        return {
+            "echo": lambda: {"message": "hello"},
+            "userinfo": lambda: {"user": self.target},
+            "rapsheet": lambda: {"user": self.target, "include_archived": False},
+            "warn": lambda: {"user": self.next_member(), "reason": "spam"},
+            "kick": lambda: {"user": self.next_member(), "reason": "spam"},
+            "ban": lambda: {"user": self.next_member(), "reason": "spam"},
+            "massban": lambda: {"reason": "raid", "user_ids": self.mass_targets(), "joined_within": None, "account_age_days": None},
+            "masskick": lambda: {"reason": "raid", "user_ids": self.mass_targets(), "joined_within": None, "account_age_days": None},
+            "settings setlog": lambda: {"channel": self.log_channel},
+            "settings togglefun": lambda: {"enabled": True},
+            "settings togglemodlog": lambda: {"enabled": True},
+            "settings welcomebatch": lambda: {"seconds": 0},
+            "settings retention": lambda: {"days": 0},
+            "settings ratelimit": lambda: {"command": "echo", "uses": 0, "seconds": 60},
+            "bot metrics": lambda: {"kind": None},
+        }.get(name, dict)()
+
+
+# Commands that fan out to many members, or recount every log, run fewer iterations
+ITERATION_DIVISORS = {"massban": 50, "masskick": 50, "settings rebuildsummaries": 100}
+
+
+async def bench(cog, callback, workload, name, iterations):
+    ctx = FakeContext(workload.guild, workload.moderator)
+
+    async def call():
+        await callback(cog, ctx, **workload.arguments(name))
+
+    for _ in range(min(20, iterations)):
+        await call()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await call()
+    elapsed = time.perf_counter() - start
+
+    samples = min(ALLOCATION_SAMPLES, iterations)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peak_total = 0
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await call()
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+        "us_per_op": elapsed / iterations * 1e6,
+        "peak_kib_per_op": peak_total / samples / 1024,
+        "retained_b_per_op": retained / samples,
+    }
+
+
+def format_results(results):
+    width = max(len(row["name"]) for row in results)
+    lines = [f"{'command':<{width}}  {'iters':>6}  {'ops/s':>10}  {'µs/op':>9}  {'peak KiB/op':>11}  {'retained B/op':>13}"]
+    for row in results:
+        lines.append(
+            f"{row['name']:<{width}}  {row['iterations']:>6}  {row['ops_per_sec']:>10.0f}  {row['us_per_op']:>9.1f}"
+            f"  {row['peak_kib_per_op']:>11.1f}  {row['retained_b_per_op']:>13.0f}"
+        )
+    return "\n".join(lines)
+
+
+async def run_benchmarks(member_count=100_000, iterations=2000, only=None):
+    workload = Workload(member_count)
+    handlers = load_cogs(workload.bot)
+    await workload.seed()
+    # Let queued log embeds go out immediately instead of piling up behind the flush delay
+    log_dispatcher.flush_interval = 0
+    membership_index.build(workload.bot.guilds)
+
+    results = []
+    try:
+        for name, (cog, callback) in handlers.items():
+            if name in SKIPPED or (only and name not in only):
+                continue
+            divisor = ITERATION_DIVISORS.get(name) or ITERATION_DIVISORS.get(name.split()[0], 1)
+            count = max(1, iterations // divisor)
+            results.append(await bench(cog, callback, workload, name, count))
+    finally:
+        await log_dispatcher.close()
+        await db.mod_log_writer.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark slash command handlers offline")
+    parser.add_argument("--members", type=int, default=100_000, help="members in the fake guild")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per command")
+    parser.add_argument("--only", help="comma-separated command names to run")
+    parser.add_argument("--output", help="also write the table to this file")
+    args = parser.parse_args(argv)
+    only = set(args.only.split(",")) if args.only else None
+
+    start = time.perf_counter()
+    results = asyncio.run(run_benchmarks(args.members, args.iterations, only))
+    table = format_results(results)
+    print(table)
+    print(f"\n{len(results)} commands, {args.members} members, {time.perf_counter() - start:.1f}s total")
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(table + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+Fake Discord objects and an in-memory stand-in for the Motor collections in db.py
+"""
+import random
+import functools
+from datetime import datetime, timedelta, timezone
+import discord
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument
+from storage import apply_update, matches, project, sort_documents, upsert_seed
+
+# ====== DISCORD OBJECTS ======
+@functools.total_ordering
+class FakeRole:
+    __slots__ = ("id", "name", "position")
+
+    def __init__(self, role_id, name, position):
+        self.id = role_id
+        self.name = name
+        self.position = position
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+    def __eq__(self, other):
+        return isinstance(other, FakeRole) and self.position == other.position
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeAsset:
+    __slots__ = ("url",)
+
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeMember:
+    __slots__ = ("id", "name", "bot", "status", "activity", "joined_at", "roles", "guild", "guild_permissions")
+
+    color = discord.Color.default()
+    avatar = None
+    default_avatar = FakeAsset("https://cdn.discordapp.com/embed/avatars/0.png")
+
+    def __init__(self, member_id, name, guild, roles, joined_at, bot=False, status=discord.Status.offline, permissions=None):
+        self.id = member_id
+        self.name = name
+        self.bot = bot
+        self.status = status
+        self.activity = None
+        self.joined_at = joined_at
+        self.roles = roles
+        self.guild = guild
+        self.guild_permissions = permissions or discord.Permissions.none()
+
+    @property
+    def display_name(self):
+        return self.name
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    @property
+    def created_at(self):
+        return discord.utils.snowflake_time(self.id)
+
+    @property
+    def top_role(self):
+        return self.roles[-1]
+
+    def __str__(self):
+        return self.name
+
+    async def kick(self, reason=None):
+        self.guild.kicked += 1
+
+    async def ban(self, reason=None):
+        self.guild.banned += 1
+
+
+class FakeChannel:
+    def __init__(self, channel_id, name, kind="text"):
+        self.id = channel_id
+        self.name = name
+        self.kind = kind
+        self.sent = 0
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    async def send(self, content=None, embed=None, embeds=None):
+        self.sent += 1
+
+
+class FakeGuild:
+    """A guild with its member, role and channel caches filled in"""
+
+    icon = None
+    banner = None
+    premium_tier = 2
+    premium_subscription_count = 14
+    verification_level = discord.VerificationLevel.medium
+    mfa_level = 1
+    chunked = True
+    features = ["COMMUNITY", "WELCOME_SCREEN_ENABLED", "THREADS_ENABLED"]
+
+    def __init__(self, guild_id, name="Benchmark Guild"):
+        self.id = guild_id
+        self.name = name
+        self.owner_id = None
+        self.me = None
+        self.roles = []
+        self.channels = []
+        self._members = {}
+        self._channels = {}
+        self.kicked = 0
+        self.banned = 0
+
+    @property
+    def created_at(self):
+        return discord.utils.snowflake_time(self.id)
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    @property
+    def owner(self):
+        return self._members.get(self.owner_id)
+
+    @property
+    def text_channels(self):
+        return [channel for channel in self.channels if channel.kind == "text"]
+
+    @property
+    def voice_channels(self):
+        return [channel for channel in self.channels if channel.kind == "voice"]
+
+    @property
+    def categories(self):
+        return [channel for channel in self.channels if channel.kind == "category"]
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    def get_channel(self, channel_id):
+        return self._channels.get(channel_id)
+
+    def add_member(self, member):
+        self._members[member.id] = member
+
+    def remove_member(self, member):
+        self._members.pop(member.id, None)
+
+    def add_channel(self, channel):
+        self.channels.append(channel)
+        self._channels[channel.id] = channel
+
+    async def kick(self, user, reason=None):
+        self.kicked += 1
+
+    async def ban(self, user, reason=None):
+        self.banned += 1
+
+
+def make_guild(member_count=100_000, role_count=50, channel_count=100, seed=0, now=None):
+    """Build a guild shaped like a large community server, deterministically from ``seed``"""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    guild = FakeGuild(discord.utils.time_snowflake(now - timedelta(days=1500)))
+    guild.roles = [FakeRole(guild.id + position, "@everyone" if position == 0 else f"role-{position}", position) for position in range(role_count)]
+    for i in range(channel_count):
+        kind = "category" if i % 10 == 0 else "voice" if i % 10 == 9 else "text"
+        guild.add_channel(FakeChannel(guild.id + 1000 + i, "welcome" if i == 1 else f"channel-{i}", kind))
+
+    statuses = [discord.Status.online, discord.Status.idle, discord.Status.dnd] + [discord.Status.offline] * 7
+    for i in range(member_count):
+        created = now - timedelta(days=rng.uniform(1, 3000))
+        joined = now - timedelta(minutes=rng.uniform(1, 730 * 24 * 60))
+        member_roles = [guild.roles[0]] + sorted(rng.sample(guild.roles[1:], min(3, role_count - 1)), key=lambda role: role.position)
+        guild.add_member(FakeMember(
+            discord.utils.time_snowflake(created) + i,
+            f"user{i}",
+            guild,
+            member_roles,
+            joined,
+            bot=rng.random() < 0.01,
+            status=rng.choice(statuses),
+        ))
+
+    # Owner and bot sit above every other role so permission checks pass
+    top = FakeRole(guild.id + role_count, "admin", role_count)
+    guild.roles.append(top)
+    owner = FakeMember(discord.utils.time_snowflake(now - timedelta(days=2000)), "owner", guild, [guild.roles[0], top], now - timedelta(days=1400), permissions=discord.Permissions.all())
+    bot_top = FakeRole(guild.id + role_count + 1, "bot", role_count + 1)
+    guild.roles.append(bot_top)
+    me = FakeMember(discord.utils.time_snowflake(now - timedelta(days=900)), "Recon", guild, [guild.roles[0], bot_top], now - timedelta(days=800), bot=True, status=discord.Status.online, permissions=discord.Permissions.all())
+    guild.add_member(owner)
+    guild.add_member(me)
+    guild.owner_id = owner.id
+    guild.me = me
+    return guild
+
+
+class FakeContext:
+    """Just enough of ApplicationContext for the command handlers"""
+
+    def __init__(self, guild, author):
+        self.guild = guild
+        self.author = author
+        self.responses = 0
+
+    async def respond(self, *args, **kwargs):
+        self.responses += 1
+
+    async def defer(self, *args, **kwargs):
+        pass
+
+    async def edit(self, *args, **kwargs):
+        pass
+
+
+class FakeMessage:
+    __slots__ = ("id", "author", "guild", "channel", "content", "reactions")
+
+    def __init__(self, message_id, author, channel, content):
+        self.id = message_id
+        self.author = author
+        self.guild = author.guild
+        self.channel = channel
+        self.content = content
+        self.reactions = 0
+
+    async def add_reaction(self, emoji):
+        self.reactions += 1
+
+
+class FakeBot:
+    latency = 0.042
+    intents = discord.Intents.all()
+
+    def __init__(self, guilds=()):
+        self.guilds = list(guilds)
+        self.cogs = {}
+        self.loaded_commands = set()
+        self.loaded_events = set()
+        self.startup_profile = []
+
+    def add_cog(self, cog):
+        self.cogs[cog.qualified_name] = cog
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+
+# ====== IN-MEMORY DATABASE ======
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class MemoryCursor:
+    def __init__(self, docs, projection):
+        self._docs = docs
+        self._projection = projection
+        self._sort = None
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = key if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def _results(self):
+        docs = self._docs
+        if self._sort:
+            docs = sort_documents(docs, self._sort)
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length=None):
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._results():
+            yield doc
+
+
+class MemoryCollection:
+    """Async, Motor-shaped collection backed by a dict.
+
+    Each prefix of a created index gets a hash table, so equality lookups on leading
+    index fields skip the full scan; range conditions are still evaluated per document.
+    Equality on ``_id`` goes straight to the document, like Mongo's built-in _id index.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.docs = {}
+        self.indexes = {"_id_": [("_id", 1)]}
+        self._hashes = {}  # index prefix fields -> {values: {_id: doc}}
+
+    def _index(self, doc):
+        for fields, buckets in self._hashes.items():
+            buckets.setdefault(tuple(doc.get(field) for field in fields), {})[doc["_id"]] = doc
+
+    def _unindex(self, doc):
+        for fields, buckets in self._hashes.items():
+            key = tuple(doc.get(field) for field in fields)
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.pop(doc["_id"], None)
+                if not bucket:
+                    del buckets[key]
+
+    def _candidates(self, query):
+        if "_id" in query and not isinstance(query["_id"], dict):
+            doc = self.docs.get(query["_id"])
+            return [doc] if doc is not None else []
+        best = ()
+        for fields in self._hashes:
+            if len(fields) > len(best) and all(field in query and not isinstance(query[field], dict) for field in fields):
+                best = fields
+        if not best:
+            return self.docs.values()
+        return self._hashes[best].get(tuple(query[field] for field in best), {}).values()
+
+    def _find(self, query):
+        query = query or {}
+        return [doc for doc in self._candidates(query) if matches(doc, query)]
+
+    def _insert(self, doc):
+        doc.setdefault("_id", ObjectId())
+        stored = self.docs[doc["_id"]] = dict(doc)
+        self._index(stored)
+        return doc["_id"]
+
+    async def insert_one(self, doc):
+        return _Result(inserted_id=self._insert(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        return _Result(inserted_ids=[self._insert(doc) for doc in docs])
+
+    async def find_one(self, query=None, projection=None):
+        for doc in self._candidates(query or {}):
+            if matches(doc, query or {}):
+                return project(doc, projection)
+        return None
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self._find(query), projection)
+
+    async def count_documents(self, query):
+        return len(self._find(query))
+
+    async def _update(self, query, update, upsert):
+        found = self._find(query)
+        if found:
+            self._unindex(found[0])
+            apply_update(found[0], update)
+            self._index(found[0])
+            return found[0], False
+        if not upsert:
+            return None, False
+        doc = upsert_seed(query)
+        apply_update(doc, update)
+        self._insert(doc)
+        return doc, True
+
+    async def update_one(self, query, update, upsert=False):
+        doc, inserted = await self._update(query, update, upsert)
+        return _Result(matched_count=int(doc is not None and not inserted), upserted_id=doc["_id"] if inserted else None)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=ReturnDocument.BEFORE, projection=None):
+        before = await self.find_one(query)
+        doc, _ = await self._update(query, update, upsert)
+        if return_document == ReturnDocument.AFTER:
+            return project(doc, projection) if doc is not None else None
+        return before
+
+    async def _replace(self, query, replacement, upsert):
+        found = self._find(query)
+        if found:
+            self._unindex(self.docs.pop(found[0]["_id"]))
+            self._insert({**replacement, "_id": found[0]["_id"]})
+            return found[0], False
+        if not upsert:
+            return None, False
+        doc = dict(replacement)
+        if "_id" in query and not isinstance(query["_id"], dict):
+            doc.setdefault("_id", query["_id"])
+        self._insert(doc)
+        return doc, True
+
+    async def bulk_write(self, requests, ordered=True):
+        matched, upserted = 0, {}
+        for index, request in enumerate(requests):
+            write = self._replace if isinstance(request, ReplaceOne) else self._update
+            doc, inserted = await write(request._filter, request._doc, request._upsert)
+            matched += doc is not None and not inserted
+            if inserted:
+                upserted[index] = doc["_id"]
+        return _Result(matched_count=matched, upserted_ids=upserted)
+
+    async def delete_many(self, query):
+        doomed = [doc["_id"] for doc in self._find(query)]
+        for doc_id in doomed:
+            self._unindex(self.docs.pop(doc_id))
+        return _Result(deleted_count=len(doomed))
+
+    async def create_indexes(self, models):
+        names = []
+        for model in models:
+            document = model.document
+            fields = list(document["key"])
+            self.indexes[document["name"]] = list(document["key"].items())
+            names.append(document["name"])
+            for length in range(1, len(fields) + 1):
+                if tuple(fields[:length]) not in self._hashes:
+                    self._hashes[tuple(fields[:length])] = {}
+                    for doc in self.docs.values():
+                        self._index(doc)
+        return names
+
+    async def index_information(self):
+        return {name: {"key": key} for name, key in self.indexes.items()}
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(name)
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
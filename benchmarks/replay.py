@@ -0,0 +1,271 @@
+"""
+Replay a stream of gateway events through the bot's listeners, with no network.
+
+    python -m benchmarks.replay generate raid --joins 500 -o raid.jsonl
+    python -m benchmarks.replay run raid.jsonl --rate 2000
+    python -m benchmarks.replay run --scenario raid --template
+
+Streams are JSON lines, one event each:
+
+    {"t": 0.50, "type": "member_join", "guild": 0, "user": 1234, "name": "raider1"}
+    {"t": 0.52, "type": "message", "guild": 0, "user": 1234, "content": "free nitro"}
+    {"t": 0.60, "type": "message", "guild": 0, "member": 42, "content": "hello"}
+    {"t": 0.90, "type": "presence_update", "guild": 0, "member": 42, "status": "online"}
+    {"t": 1.00, "type": "member_ban", "guild": 0, "user": 1234}
+    {"t": 1.00, "type": "member_remove", "guild": 0, "user": 1234}
+
+"guild" indexes the fake guilds, "member" indexes a guild's existing members and
+"user" refers to a member by id (joiners keep the id they joined with). "t" is seconds
+from the start of the stream.
+"""
+import argparse
+import asyncio
+import contextlib
+import copy
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import discord
+import db
+from cache import cache_guild_settings
+from log_dispatcher import log_dispatcher
+from metrics import Histogram, metrics
+from project import DiscordBot
+from benchmarks.fakes import FakeMember, FakeMessage, MemoryDatabase, make_guild
+
+LAG_INTERVAL = 0.01  # seconds between event loop lag probes
+
+
+# ====== STREAM ======
+class EventBuilder:
+    """Turn stream records into the objects py-cord would pass to listeners"""
+
+    def __init__(self, guilds):
+        self.guilds = guilds
+        self.members = [guild.members for guild in guilds]  # snapshot for "member" indexes
+        self._message_id = 0
+
+    def member(self, guild_index, guild, record):
+        if "user" in record:
+            member = guild.get_member(record["user"])
+            if member is None:
+                # Already gone (e.g. banned after leaving); listeners still get a user-like object
+                member = FakeMember(record["user"], f"user{record['user']}", guild, [guild.roles[0]], None)
+            return member
+        members = self.members[guild_index]
+        return members[record.get("member", 0) % len(members)]
+
+    def build(self, record):
+        """Return (event name, args) for one record, updating the fake caches as the gateway would"""
+        kind = record["type"]
+        guild_index = record.get("guild", 0) % len(self.guilds)
+        guild = self.guilds[guild_index]
+        if kind == "member_join":
+            member = FakeMember(
+                record["user"], record.get("name") or f"user{record['user']}", guild, [guild.roles[0]],
+                datetime.now(timezone.utc), bot=record.get("bot", False), status=discord.Status.online
+            )
+            guild.add_member(member)
+            return kind, (member,)
+        member = self.member(guild_index, guild, record)
+        if kind == "member_remove":
+            guild.remove_member(member)
+            return kind, (member,)
+        if kind == "member_ban":
+            return kind, (guild, member)
+        if kind == "message":
+            self._message_id += 1
+            channels = guild.text_channels
+            channel = channels[record.get("channel", 0) % len(channels)]
+            return kind, (FakeMessage(self._message_id, member, channel, record.get("content", "")),)
+        if kind == "presence_update":
+            before = copy.copy(member)
+            member.status = discord.Status(record.get("status", "online"))
+            return kind, (before, member)
+        raise ValueError(f"Unknown event type {kind!r}")
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def generate_raid(joins=500, raid_seconds=10.0, duration=30.0, background_rate=20.0, messages_per_raider=3, ban_ratio=0.9, seed=0):
+    """A join raid on guild 0: fresh accounts join in a burst and spam, then most get banned.
+
+    Ordinary chatter and presence changes from existing members run for the whole stream.
+    """
+    rng = random.Random(seed)
+    events = []
+    for _ in range(int(duration * background_rate)):
+        t = rng.uniform(0, duration)
+        if rng.random() < 0.7:
+            events.append({"t": t, "type": "message", "guild": 0, "member": rng.randrange(1_000_000), "channel": rng.randrange(10), "content": rng.choice(["hello", "gm", "anyone here?", "lol"])})
+        else:
+            events.append({"t": t, "type": "presence_update", "guild": 0, "member": rng.randrange(1_000_000), "status": rng.choice(["online", "idle", "dnd", "offline"])})
+
+    raid_start = duration / 3
+    first_id = discord.utils.time_snowflake(datetime.now(timezone.utc) - timedelta(hours=1))
+    for i in range(joins):
+        user_id = first_id + i
+        joined = raid_start + rng.uniform(0, raid_seconds)
+        events.append({"t": joined, "type": "member_join", "guild": 0, "user": user_id, "name": f"raider{i}"})
+        for _ in range(messages_per_raider):
+            events.append({"t": joined + rng.uniform(0.05, 2.0), "type": "message", "guild": 0, "user": user_id, "channel": 0, "content": "@everyone free nitro https://example.invalid"})
+        if rng.random() < ban_ratio:
+            # Moderators catch up a few seconds behind the raid
+            banned = max(joined + 2.0, raid_start + raid_seconds / 2 + rng.uniform(0, raid_seconds))
+            events.append({"t": banned, "type": "member_ban", "guild": 0, "user": user_id})
+            events.append({"t": banned, "type": "member_remove", "guild": 0, "user": user_id})
+    events.sort(key=lambda event: event["t"])
+    return events
+
+
+SCENARIOS = {"raid": generate_raid}
+
+
+# ====== REPLAY ======
+async def monitor_lag(histogram, interval=LAG_INTERVAL):
+    """Record how late the loop wakes from a fixed sleep; the overshoot is time spent blocked"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - start - interval))
+
+
+async def replay(bot, builder, events, rate=None, speed=1.0):
+    """Dispatch every event, paced by ``rate`` (events/sec), by the stream's timestamps, or as fast as possible.
+
+    Returns (seconds spent dispatching, seconds waiting for listeners to finish).
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for i, record in enumerate(events):
+        if rate:
+            due = start + i / rate
+        elif rate is None and "t" in record:
+            due = start + record["t"] / speed
+        else:
+            due = None
+        if due is not None and due > loop.time():
+            await asyncio.sleep(due - loop.time())
+        else:
+            await asyncio.sleep(0)  # let listeners run between events, as the gateway reader would
+        name, args = builder.build(record)
+        bot.dispatch(name, *args)
+    dispatched = loop.time()
+    welcome = bot.get_cog("Welcome")
+    # Batched welcomes are sent from their own tasks once the listeners have returned
+    while bot._tasks or (welcome and welcome.flushes):
+        await asyncio.gather(*list(bot._tasks), *(welcome.flushes.values() if welcome else ()), return_exceptions=True)
+    return dispatched - start, loop.time() - dispatched
+
+
+async def run_replay(events, members=10_000, guild_count=1, rate=None, speed=1.0, template=False, welcome_batch=0):
+    db.db = MemoryDatabase()
+    await db.ensure_indexes()
+    guilds = [make_guild(members, seed=i) for i in range(guild_count)]
+    for guild in guilds:
+        settings = {"_id": guild.id, "log_channel_id": guild.text_channels[-1].id, "fun_enabled": True, "modlog_enabled": True, "welcome_batch_seconds": welcome_batch}
+        await db.get_guild_settings_collection().insert_one(settings)
+        cache_guild_settings(guild.id, settings)
+    log_dispatcher.flush_interval = 0
+
+    bot = DiscordBot()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        await bot.load_events()
+        if template:
+            await bot._setup_module("events._template_events", importlib.import_module("events._template_events"))
+    metrics.reset()
+
+    lag = Histogram()
+    lag_task = asyncio.create_task(monitor_lag(lag))
+    try:
+        # Listeners print freely; keep the report readable while still paying for the writes
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            dispatch_seconds, drain_seconds = await replay(bot, EventBuilder(guilds), events, rate, speed)
+    finally:
+        lag_task.cancel()
+        await log_dispatcher.close()
+        await db.mod_log_writer.close()
+    return {
+        "events": len(events),
+        "by_type": Counter(record["type"] for record in events),
+        "dispatch_seconds": dispatch_seconds,
+        "drain_seconds": drain_seconds,
+        "lag": lag,
+        "listeners": metrics.summary("event"),
+    }
+
+
+def format_report(report):
+    elapsed = report["dispatch_seconds"] + report["drain_seconds"]
+    lag = report["lag"]
+    lines = [
+        f"Replayed {report['events']} events in {elapsed:.2f}s "
+        f"({report['events'] / elapsed if elapsed else 0:.0f} events/s; dispatch {report['dispatch_seconds']:.2f}s, drain {report['drain_seconds']:.2f}s)",
+        "  " + ", ".join(f"{kind}: {count}" for kind, count in sorted(report["by_type"].items())),
+        f"Event loop lag: p50 {lag.percentile(0.5) * 1000:.2f}ms  p99 {lag.percentile(0.99) * 1000:.2f}ms  ({lag.count} probes)",
+        "",
+    ]
+    rows = report["listeners"]
+    if rows:
+        width = max(len(row["name"]) for row in rows)
+        lines.append(f"{'listener':<{width}}  {'calls':>7} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for row in rows:
+            lines.append(
+                f"{row['name']:<{width}}  {row['count']:>7} {row['errors']:>6} "
+                f"{row['p50_ms']:>7.2f}ms {row['p95_ms']:>7.2f}ms {row['p99_ms']:>7.2f}ms"
+            )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay gateway events through the bot's listeners")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="write a synthetic event stream")
+    generate.add_argument("scenario", choices=sorted(SCENARIOS))
+    generate.add_argument("--joins", type=int, default=500, help="accounts that join in the raid")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("-o", "--output", help="file to write (default: stdout)")
+
+    run = subparsers.add_parser("run", help="replay a stream")
+    run.add_argument("path", nargs="?", help="JSONL stream to replay")
+    run.add_argument("--scenario", choices=sorted(SCENARIOS), help="generate the stream instead of reading a file")
+    run.add_argument("--joins", type=int, default=500, help="raid size when using --scenario")
+    run.add_argument("--members", type=int, default=10_000, help="members per fake guild")
+    run.add_argument("--guilds", type=int, default=1, help="number of fake guilds")
+    run.add_argument("--rate", type=float, help="events per second, ignoring timestamps (0 = as fast as possible)")
+    run.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier for timestamped streams")
+    run.add_argument("--template", action="store_true", help="also load events/_template_events.py")
+    run.add_argument("--welcome-batch", type=int, default=0, help="welcome_batch_seconds for every guild")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        events = SCENARIOS[args.scenario](joins=args.joins, seed=args.seed)
+        with open(args.output, "w") if args.output else contextlib.nullcontext(sys.stdout) as out:
+            for record in events:
+                out.write(json.dumps(record) + "\n")
+        return
+
+    if args.scenario:
+        events = SCENARIOS[args.scenario](joins=args.joins)
+    elif args.path:
+        events = read_events(args.path)
+    else:
+        parser.error("run needs a stream path or --scenario")
+    start = time.perf_counter()
+    report = asyncio.run(run_replay(events, args.members, args.guilds, args.rate, args.speed, args.template, args.welcome_batch))
+    print(format_report(report))
+    print(f"\nTotal wall time {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Compare storage backends on the bot's own query shapes.
+
+    python -m benchmarks.storage [--logs 100000] [--ops 2000] [--backends mongo,sqlite]
+
+The Mongo run uses MONGO_URI and a throwaway database, and is skipped if no server answers.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+import motor.motor_asyncio
+from pymongo import ReturnDocument
+from db import INDEXES, MONGO_URI
+from metrics import Histogram
+from storage import SQLiteDatabase
+from commands.rapsheet import LOG_PROJECTION, LOG_SORT, PAGE_SIZE, page_query
+
+GUILDS = 1000
+USERS_PER_GUILD = 100
+INSERT_BATCH = 100
+
+
+async def open_mongo():
+    client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        print(f"⚠️  Skipping mongo: {e.__class__.__name__}")
+        client.close()
+        return None, None
+    await client.drop_database("recon_benchmark")
+    database = client["recon_benchmark"]
+
+    async def close():
+        await client.drop_database("recon_benchmark")
+        client.close()
+    return database, close
+
+
+async def open_sqlite():
+    directory = tempfile.TemporaryDirectory()
+    database = SQLiteDatabase(os.path.join(directory.name, "bench.db"))
+
+    async def close():
+        await database.close()
+        directory.cleanup()
+    return database, close
+
+
+BACKENDS = {"mongo": open_mongo, "sqlite": open_sqlite}
+
+
+def log_document(rng, start):
+    return {
+        "guild_id": rng.randrange(GUILDS),
+        "user_id": rng.randrange(USERS_PER_GUILD),
+        "action": rng.choice(("warn", "kick", "ban")),
+        "reason": "benchmark",
+        "moderator_id": 1,
+        "timestamp": start + timedelta(seconds=rng.randrange(365 * 86400)),
+    }
+
+
+async def timed(histogram, coro):
+    start = time.perf_counter()
+    await coro
+    histogram.observe(time.perf_counter() - start)
+
+
+async def run_backend(database, log_count, ops, seed=0):
+    rng = random.Random(seed)
+    settings = database["guild_settings"]
+    logs = database["mod_logs"]
+    for collection, indexes in INDEXES.items():
+        await database[collection].create_indexes(indexes)
+    start = datetime(2024, 1, 1)
+    await settings.insert_many([{"_id": guild_id, "log_channel_id": guild_id * 10, "fun_enabled": True} for guild_id in range(GUILDS)])
+
+    results = {}
+    histogram = results["insert_many x100"] = Histogram()
+    for _ in range(log_count // INSERT_BATCH):
+        await timed(histogram, logs.insert_many([log_document(rng, start) for _ in range(INSERT_BATCH)], ordered=False))
+
+    async def rapsheet_page():
+        guild_id, user_id = rng.randrange(GUILDS), rng.randrange(USERS_PER_GUILD)
+        cursor = logs.find(page_query(guild_id, user_id), LOG_PROJECTION).sort(LOG_SORT).limit(PAGE_SIZE + 1)
+        await cursor.to_list(length=PAGE_SIZE + 1)
+
+    workloads = {
+        "settings find_one": lambda: settings.find_one({"_id": rng.randrange(GUILDS)}),
+        "settings upsert": lambda: settings.find_one_and_update({"_id": rng.randrange(GUILDS)}, {"$set": {"fun_enabled": rng.random() < 0.5}}, upsert=True, return_document=ReturnDocument.AFTER),
+        "rapsheet count": lambda: logs.count_documents({"guild_id": rng.randrange(GUILDS), "user_id": rng.randrange(USERS_PER_GUILD)}),
+        "rapsheet page": rapsheet_page,
+        "mod log insert_one": lambda: logs.insert_one(log_document(rng, start)),
+    }
+    for name, make in workloads.items():
+        histogram = results[name] = Histogram()
+        for _ in range(ops):
+            await timed(histogram, make())
+    return results
+
+
+def format_results(all_results):
+    lines = [f"{'backend':<8} {'operation':<20} {'ops':>7} {'ops/s':>9} {'p50':>9} {'p99':>9}"]
+    for backend, results in all_results.items():
+        for name, histogram in results.items():
+            mean = histogram.sum / histogram.count if histogram.count else 0
+            lines.append(
+                f"{backend:<8} {name:<20} {histogram.count:>7} {1 / mean if mean else 0:>9.0f} "
+                f"{histogram.percentile(0.5) * 1000:>7.3f}ms {histogram.percentile(0.99) * 1000:>7.3f}ms"
+            )
+    return "\n".join(lines)
+
+
+async def run_benchmarks(backends, log_count, ops):
+    all_results = {}
+    for name in backends:
+        database, close = await BACKENDS[name]()
+        if database is None:
+            continue
+        try:
+            all_results[name] = await run_backend(database, log_count, ops)
+        finally:
+            await close()
+    return all_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare storage backends on the bot's query shapes")
+    parser.add_argument("--logs", type=int, default=100_000, help="mod log documents to load first")
+    parser.add_argument("--ops", type=int, default=2000, help="operations per workload")
+    parser.add_argument("--backends", default="mongo,sqlite", help="comma-separated backends to run")
+    args = parser.parse_args(argv)
+    backends = [name for name in args.backends.split(",") if name]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+    print(format_results(asyncio.run(run_benchmarks(backends, args.logs, args.ops))))
+
+
+if __name__ == "__main__":
+    main()
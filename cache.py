@@ -0,0 +1,172 @@
+"""
+In-process caches shared by commands and events
+"""
+import asyncio
+import copy
+import os
+import time
+from collections import OrderedDict
+
+from pymongo import ReturnDocument
+
+from db import get_guild_settings_collection
+
+SETTINGS_CACHE_SIZE = int(os.getenv("SETTINGS_CACHE_SIZE") or 1024)
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL") or 300)
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE") or 512)
+EMBED_CACHE_TTL = float(os.getenv("EMBED_CACHE_TTL") or 300)
+APPROXIMATE_COUNTS_TTL = float(os.getenv("APPROXIMATE_COUNTS_TTL") or 60)
+
+MISSING = object()
+
+
+class TTLCache:
+    """LRU cache whose entries also expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (self._clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop every entry whose key matches; scans the whole cache, so keep it for rare events"""
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# ====== GUILD SETTINGS ======
+guild_settings_cache = TTLCache(SETTINGS_CACHE_SIZE, SETTINGS_CACHE_TTL)
+_pending_loads = {}  # guild_id -> Task, so concurrent misses share one query
+_write_versions = {}  # guild_id -> int, bumped on every write-through
+
+
+async def _load_guild_settings(guild_id):
+    version = _write_versions.get(guild_id, 0)
+    doc = await get_guild_settings_collection().find_one({"_id": guild_id})
+    # Don't let a read that raced a write overwrite the fresher value
+    if _write_versions.get(guild_id, 0) == version:
+        guild_settings_cache.set(guild_id, doc)
+    return doc
+
+
+async def get_guild_settings(guild_id):
+    """Return the settings document for a guild (or None), served from cache when possible"""
+    doc = guild_settings_cache.get(guild_id, MISSING)
+    if doc is not MISSING:
+        return doc
+    task = _pending_loads.get(guild_id)
+    if task is None:
+        task = asyncio.ensure_future(_load_guild_settings(guild_id))
+        _pending_loads[guild_id] = task
+        task.add_done_callback(lambda _: _pending_loads.pop(guild_id, None))
+    return await asyncio.shield(task)
+
+
+def cache_guild_settings(guild_id, doc):
+    """Store a settings document that was just written to the database"""
+    _write_versions[guild_id] = _write_versions.get(guild_id, 0) + 1
+    guild_settings_cache.set(guild_id, doc)
+
+
+async def update_guild_settings(guild_id, fields):
+    """Write settings fields to the database and update the cache with the result"""
+    doc = await get_guild_settings_collection().find_one_and_update(
+        {"_id": guild_id},
+        {"$set": fields},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    cache_guild_settings(guild_id, doc)
+    return doc
+
+
+# ====== RENDERED EMBEDS ======
+# /serverinfo and /userinfo cache the parts of their embeds that only change with gateway
+# events, which events/embedcache.py turns into invalidations. The TTL bounds how stale an
+# entry can get when an event is missed (e.g. member updates without the members intent).
+embed_cache = TTLCache(EMBED_CACHE_SIZE, EMBED_CACHE_TTL)
+
+
+def copy_embed(embed):
+    """A copy of a cached embed that per-call fields can be added to without touching the original.
+
+    Embed.copy() round-trips through a dict; a shallow copy with its own field list is enough
+    because setting the footer or timestamp replaces those objects rather than mutating them.
+    """
+    fresh = copy.copy(embed)
+    fresh.fields = list(embed.fields)
+    return fresh
+
+
+# Without the member cache, /serverinfo asks Discord for its approximate member and online
+# counts. They are approximate anyway, so one REST call per guild per TTL is plenty.
+approximate_counts_cache = TTLCache(EMBED_CACHE_SIZE, APPROXIMATE_COUNTS_TTL)  # guild_id -> (members, online)
+
+
+def guild_embed_key(guild_id):
+    return ("guild", guild_id)
+
+
+def member_embed_key(guild_id, user_id):
+    return ("member", guild_id, user_id)
+
+
+def invalidate_guild_embeds(guild_id, members=False):
+    """Drop a guild's /serverinfo embed and, with ``members``, every /userinfo embed in it"""
+    embed_cache.invalidate(guild_embed_key(guild_id))
+    if members:
+        embed_cache.invalidate_where(lambda key: key[0] == "member" and key[1] == guild_id)
+
+
+def invalidate_member_embed(guild_id, user_id):
+    embed_cache.invalidate(member_embed_key(guild_id, user_id))
+
+
+def invalidate_user_embeds(user_id):
+    """Drop a user's /userinfo embeds in every guild, e.g. after a username or avatar change"""
+    embed_cache.invalidate_where(lambda key: key[0] == "member" and key[2] == user_id)
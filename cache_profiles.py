@@ -0,0 +1,48 @@
+"""
+Gateway cache profiles: which intents the bot requests and how much of what they deliver
+is kept in memory (members, presences, message history)
+"""
+import os
+import discord
+
+CACHE_PROFILE = (os.getenv("CACHE_PROFILE") or "moderation").lower()
+CACHE_PROFILES = ("full", "moderation", "minimal")
+
+
+def cache_options(profile):
+    """Client keyword arguments for a cache profile.
+
+    full        every intent, every member with presences, the last 1000 messages
+    moderation  members intent and a chunked member list for massmod, welcome and the
+                member counters; no presences and no message history
+    minimal     default intents only; members are known from interactions and fetched on demand
+    """
+    if profile == "full":
+        return {
+            "intents": discord.Intents.all(),
+            "member_cache_flags": discord.MemberCacheFlags.all(),
+            "chunk_guilds_at_startup": True,
+            "max_messages": 1000,
+        }
+    if profile == "moderation":
+        intents = discord.Intents.default()
+        intents.members = True
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+            "chunk_guilds_at_startup": True,
+            "max_messages": None,  # 0 would mean the library default of 1000
+        }
+    if profile == "minimal":
+        return {
+            "intents": discord.Intents.default(),
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "chunk_guilds_at_startup": False,
+            "max_messages": None,
+        }
+    raise ValueError(f"Unknown CACHE_PROFILE {profile!r}, expected one of {', '.join(CACHE_PROFILES)}")
+
+
+def members_cached(bot, guild):
+    """Whether ``guild.members`` holds the whole member list"""
+    return bot.intents.members and guild.chunked
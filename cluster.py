@@ -0,0 +1,359 @@
+"""
+Multi-process clustering: a supervisor runs project.py once per cluster, each worker owning
+a contiguous range of shards, and restarts workers that crash.
+
+    python cluster.py --clusters 4 [--shards 16] [-- bot arguments]
+
+Workers talk to the supervisor over a Unix socket with newline-delimited JSON. A worker
+can broadcast a command ("status", "reload", "metrics"); the supervisor asks every
+connected worker, including the sender, and returns all replies to the sender.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from logging_config import setup_logging
+
+log = logging.getLogger(__name__)
+
+CLUSTER_SOCKET = os.getenv("CLUSTER_SOCKET") or ""
+CLUSTER_ID = int(os.getenv("CLUSTER_ID") or 0)
+IPC_TIMEOUT = float(os.getenv("CLUSTER_IPC_TIMEOUT") or 10.0)
+STREAM_LIMIT = 2 ** 24  # one message per line; metrics exports run to hundreds of KB
+STABLE_AFTER = 60.0  # seconds a worker must run before its restart delay resets
+
+
+async def send_message(writer, message):
+    writer.write(json.dumps(message, default=str).encode() + b"\n")
+    await writer.drain()
+
+
+async def read_message(reader):
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+def shard_ranges(shard_count, clusters):
+    """Split shard ids into ``clusters`` contiguous ranges whose sizes differ by at most one"""
+    if clusters > shard_count:
+        raise ValueError(f"Can't split {shard_count} shards across {clusters} clusters")
+    size, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for cluster_id in range(clusters):
+        end = start + size + (cluster_id < extra)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+class Supervisor:
+    """Runs one worker process per cluster, relays IPC broadcasts and restarts crashed workers"""
+
+    def __init__(self, clusters, shard_count, socket_path, command, restart_delay=1.0, max_restart_delay=60.0):
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, clusters)
+        self.socket_path = socket_path
+        self.command = command
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.processes = {}  # cluster_id -> running asyncio Process
+        self.restarts = {cluster_id: 0 for cluster_id in range(clusters)}
+        self._connections = {}  # cluster_id -> StreamWriter
+        self._pending = {}  # request id -> (replies, expected cluster ids, future)
+        self._ids = itertools.count()
+        self._tasks = set()
+        self._server = None
+        self._stopping = asyncio.Event()
+
+    # --- IPC ---
+    async def start_server(self):
+        Path(self.socket_path).unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle_worker, self.socket_path, limit=STREAM_LIMIT)
+
+    async def _handle_worker(self, reader, writer):
+        cluster_id = None
+        try:
+            hello = await read_message(reader)
+            if not hello or hello.get("op") != "hello":
+                return
+            cluster_id = hello["cluster"]
+            self._connections[cluster_id] = writer
+            while (message := await read_message(reader)) is not None:
+                if message["op"] == "broadcast":
+                    task = asyncio.create_task(self._relay(writer, message))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                elif message["op"] == "reply":
+                    self._reply(cluster_id, message)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            log.warning("⚠️  Cluster %s IPC connection dropped: %s", cluster_id, e)
+        finally:
+            if cluster_id is not None and self._connections.get(cluster_id) is writer:
+                del self._connections[cluster_id]
+                # Don't make pending requests wait out the timeout for a worker that's gone
+                for _, expected, future in self._pending.values():
+                    expected.discard(cluster_id)
+                    if not expected and not future.done():
+                        future.set_result(None)
+            writer.close()
+
+    def _reply(self, cluster_id, message):
+        pending = self._pending.get(message["id"])
+        if pending is None:
+            return  # Arrived after the timeout
+        replies, expected, future = pending
+        replies[cluster_id] = {"cluster": cluster_id, "data": message.get("data"), "error": message.get("error")}
+        expected.discard(cluster_id)
+        if not expected and not future.done():
+            future.set_result(None)
+
+    async def collect(self, command, args=None, timeout=IPC_TIMEOUT):
+        """Send ``command`` to every connected worker and return their replies by cluster id"""
+        request_id = next(self._ids)
+        connections = dict(self._connections)
+        replies, future = {}, asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (replies, set(connections), future)
+        try:
+            for cluster_id, writer in connections.items():
+                try:
+                    await send_message(writer, {"op": "request", "id": request_id, "command": command, "args": args})
+                except ConnectionError:
+                    self._pending[request_id][1].discard(cluster_id)
+            if self._pending[request_id][1]:
+                try:
+                    await asyncio.wait_for(future, timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            del self._pending[request_id]
+        for cluster_id in range(len(self.ranges)):
+            if cluster_id not in replies:
+                replies[cluster_id] = {"cluster": cluster_id, "data": None, "error": "not connected" if cluster_id not in connections else "timed out"}
+        return [replies[cluster_id] for cluster_id in sorted(replies)]
+
+    async def _relay(self, writer, message):
+        replies = await self.collect(message["command"], message.get("args"), message.get("timeout") or IPC_TIMEOUT)
+        try:
+            await send_message(writer, {"op": "result", "id": message["id"], "replies": replies})
+        except ConnectionError:
+            pass
+
+    async def metrics_text(self):
+        """Every worker's metrics merged into one Prometheus exposition"""
+        from metrics import Metrics
+        merged = Metrics()
+        for reply in await self.collect("metrics"):
+            if reply["data"]:
+                merged.merge(reply["data"])
+        return merged.prometheus_text()
+
+    # --- processes ---
+    def worker_env(self, cluster_id):
+        shards = self.ranges[cluster_id]
+        return dict(
+            os.environ,
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=f"{shards.start}-{shards.stop - 1}",
+            CLUSTER_ID=str(cluster_id),
+            CLUSTER_SOCKET=self.socket_path,
+            METRICS_PORT="0",  # the supervisor serves the merged metrics instead
+        )
+
+    async def _watch(self, cluster_id):
+        delay = self.restart_delay
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(*self.command, env=self.worker_env(cluster_id))
+            self.processes[cluster_id] = process
+            shards = self.ranges[cluster_id]
+            log.info("🚀 Cluster %d started (pid %d, shards %d-%d)", cluster_id, process.pid, shards.start, shards.stop - 1)
+            code = await process.wait()
+            del self.processes[cluster_id]
+            if self._stopping.is_set():
+                return
+            if code == 0:
+                log.info("Cluster %d exited cleanly, not restarting", cluster_id)
+                return
+            if time.monotonic() - started >= STABLE_AFTER:
+                delay = self.restart_delay
+            self.restarts[cluster_id] += 1
+            log.error("❌ Cluster %d exited with code %d, restarting in %.0fs", cluster_id, code, delay)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_restart_delay)
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self, metrics_port=0):
+        await self.start_server()
+        metrics_server = None
+        if metrics_port:
+            from metrics import start_metrics_server
+            metrics_server = await start_metrics_server(metrics_port, render=self.metrics_text)
+            log.info("📈 Serving cluster metrics on http://127.0.0.1:%d/metrics", metrics_port)
+        watchers = [asyncio.create_task(self._watch(cluster_id)) for cluster_id in range(len(self.ranges))]
+        try:
+            await self._stopping.wait()
+        finally:
+            for process in list(self.processes.values()):
+                process.terminate()
+            try:
+                await asyncio.wait_for(asyncio.gather(*watchers, return_exceptions=True), 15)
+            except asyncio.TimeoutError:
+                for process in list(self.processes.values()):
+                    process.kill()
+            if metrics_server is not None:
+                metrics_server.close()
+            self._server.close()
+            Path(self.socket_path).unlink(missing_ok=True)
+
+
+class ClusterClient:
+    """A worker's side of the IPC channel: answers requests and broadcasts commands"""
+
+    def __init__(self, path, cluster_id):
+        self.path = path
+        self.cluster_id = cluster_id
+        self.handlers = {}  # command -> async callable(args) returning JSON-serialisable data
+        self._writer = None
+        self._pending = {}  # request id -> future for the supervisor's result
+        self._ids = itertools.count()
+        self._tasks = set()
+        self._task = None
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    @property
+    def connected(self):
+        return self._writer is not None
+
+    def register(self, command, handler):
+        self.handlers[command] = handler
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+            except OSError:
+                await asyncio.sleep(1)  # Supervisor not listening yet
+                continue
+            try:
+                await send_message(writer, {"op": "hello", "cluster": self.cluster_id})
+                self._writer = writer
+                while (message := await read_message(reader)) is not None:
+                    if message["op"] == "request":
+                        task = asyncio.create_task(self._answer(writer, message))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+                    elif message["op"] == "result":
+                        future = self._pending.pop(message["id"], None)
+                        if future is not None and not future.done():
+                            future.set_result(message["replies"])
+            except (ConnectionError, json.JSONDecodeError):
+                pass
+            finally:
+                self._writer = None
+                writer.close()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("Lost the cluster supervisor"))
+                self._pending.clear()
+            await asyncio.sleep(1)
+
+    async def _answer(self, writer, message):
+        reply = {"op": "reply", "id": message["id"]}
+        handler = self.handlers.get(message["command"])
+        try:
+            if handler is None:
+                raise KeyError(f"Unknown cluster command {message['command']!r}")
+            reply["data"] = await handler(message.get("args"))
+        except Exception as e:
+            reply["error"] = str(e)
+        try:
+            await send_message(writer, reply)
+        except ConnectionError:
+            pass
+
+    async def broadcast(self, command, args=None, timeout=IPC_TIMEOUT):
+        """Run ``command`` on every cluster and return ``[{cluster, data, error}]`` sorted by cluster"""
+        if self._writer is None:
+            raise ConnectionError("Not connected to the cluster supervisor")
+        request_id = next(self._ids)
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        await send_message(self._writer, {"op": "broadcast", "id": request_id, "command": command, "args": args, "timeout": timeout})
+        try:
+            return await asyncio.wait_for(future, timeout + 1)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+cluster_client = ClusterClient(CLUSTER_SOCKET, CLUSTER_ID)
+
+
+async def recommended_shards(token):
+    """Ask Discord how many shards the bot should run"""
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot", headers={"Authorization": f"Bot {token}"}) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+async def _supervise(args, bot_args):
+    shard_count = args.shards
+    if shard_count is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        setting = (os.getenv("SHARD_COUNT") or "auto").lower()
+        shard_count = await recommended_shards(os.getenv("TOKEN")) if setting == "auto" else int(setting)
+    clusters = min(args.clusters, shard_count)
+    socket_path = args.socket or os.path.join(tempfile.gettempdir(), f"recon-cluster-{os.getpid()}.sock")
+    command = [sys.executable, str(Path(__file__).with_name("project.py")), *bot_args]
+    supervisor = Supervisor(clusters, shard_count, socket_path, command)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, supervisor.stop)
+    log.info("🧩 Running %d shards across %d clusters", shard_count, clusters)
+    await supervisor.run(int(os.getenv("METRICS_PORT") or 0))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the bot as several sharded worker processes")
+    parser.add_argument("--clusters", type=int, default=os.cpu_count() or 1, help="worker processes to run (default: one per core, at most one per shard)")
+    parser.add_argument("--shards", type=int, default=None, help="total shard count (default: SHARD_COUNT, or Discord's recommendation)")
+    parser.add_argument("--socket", default=None, help="Unix socket path for IPC")
+    parser.add_argument("bot_args", nargs=argparse.REMAINDER, help="arguments passed to each worker after --")
+    args = parser.parse_args(argv)
+    bot_args = args.bot_args[1:] if args.bot_args[:1] == ["--"] else args.bot_args
+    setup_logging()
+    asyncio.run(_supervise(args, bot_args))
+
+
+if __name__ == "__main__":
+    main()
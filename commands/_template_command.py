@@ -3,9 +3,12 @@ Command Template - Copy this file to create new commands
 Rename the file and modify the configuration below
 """
 
+import logging
 import discord
 from discord.ext import commands
 
+log = logging.getLogger(__name__)
+
 # ====== COMMAND CONFIGURATION ======
 COMMAND_NAME = "template"
 COMMAND_DESCRIPTION = "This is a template command"
@@ -79,7 +82,7 @@ class TemplateCommand(commands.Cog):
 def setup(bot):
     """Required setup function for automatic loading"""
     bot.add_cog(TemplateCommand(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
 
 # ====== DEVELOPMENT NOTES ======
 """
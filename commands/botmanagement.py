@@ -6,9 +6,19 @@ Commands for managing the bot (reload, status, etc.)
 import discord
 from discord.ext import commands
 import importlib
+import logging
 import sys
 import traceback
 from datetime import datetime, timedelta
+from cache import embed_cache, guild_settings_cache
+from db import database_info, mod_log_writer, ping_database
+from member_stats import membership_index
+from log_dispatcher import log_dispatcher
+from metrics import Metrics, metrics
+from sharding import shard_stats
+from cluster import cluster_client
+
+log = logging.getLogger(__name__)
 
 # Command configuration
 COMMAND_NAME = "bot"
@@ -30,7 +40,19 @@ class BotManagementCommand(discord.Cog):
         uptime = datetime.utcnow() - self.start_time
         uptime_str = str(uptime).split('.')[0]
         total_guilds = len(self.bot.guilds)
-        total_users = len(set(self.bot.get_all_members()))
+        membership_index.ensure_built(self.bot.guilds)
+        total_users = membership_index.unique_users
+        memberships = membership_index.memberships
+        shards = shard_stats.snapshot(self.bot)
+        clusters = None
+        if cluster_client.connected:
+            # Every cluster reports its own servers and shards; users can't be deduplicated across them
+            await ctx.defer()
+            clusters = await cluster_client.broadcast("status")
+            live = [reply["data"] for reply in clusters if reply["data"]]
+            total_guilds = sum(data["guilds"] for data in live)
+            memberships = sum(data["memberships"] for data in live)
+            shards = sorted((shard for data in live for shard in data["shards"]), key=lambda shard: shard["id"])
         total_commands = len(self.bot.loaded_commands)
         total_events = len(self.bot.loaded_events)
         embed = discord.Embed(
@@ -40,7 +62,8 @@ class BotManagementCommand(discord.Cog):
         embed.add_field(
             name="📊 Statistics",
             value=f"**Servers:** {total_guilds}\n"
-                  f"**Users:** {total_users}\n"
+                  f"**Users:** {total_users}" + (f" (cluster {cluster_client.cluster_id})" if clusters else "") + "\n"
+                  f"**Memberships:** {memberships}\n"
                   f"**Commands:** {total_commands}\n"
                   f"**Events:** {total_events}",
             inline=True
@@ -51,6 +74,75 @@ class BotManagementCommand(discord.Cog):
                   f"**Uptime:** {uptime_str}",
             inline=True
         )
+        if clusters:
+            embed.add_field(
+                name=f"🖧 Clusters ({len(clusters)})",
+                value="\n".join(
+                    f"**#{reply['cluster']}:** {reply['data']['guilds']} servers · {len(reply['data']['shards'])} shards"
+                    if reply["data"] else f"**#{reply['cluster']}:** ❌ {reply['error']}"
+                    for reply in clusters
+                ),
+                inline=False
+            )
+        if len(shards) > 1 or getattr(self.bot, "shard_count", None):
+            lines = [
+                f"**#{shard['id']}:** "
+                + (f"{shard['latency_ms']:.0f}ms" if shard["latency_ms"] is not None else "connecting")
+                + f" · {shard['guilds']} servers"
+                + (f" · {shard['events_per_sec']:.1f} events/s" if shard["events_per_sec"] is not None else "")
+                for shard in shards[:15]
+            ]
+            if len(shards) > 15:
+                lines.append(f"...and {len(shards) - 15} more")
+            embed.add_field(name=f"🧩 Shards ({len(shards)})", value="\n".join(lines), inline=False)
+        largest = membership_index.largest_guilds(5)
+        if largest:
+            embed.add_field(
+                name="🏰 Largest Servers",
+                value="\n".join(
+                    f"**{guild.name if (guild := self.bot.get_guild(guild_id)) else guild_id}:** {size}"
+                    for guild_id, size in largest
+                ),
+                inline=False
+            )
+        settings_stats = guild_settings_cache.stats()
+        embed.add_field(
+            name="🗄️ Settings Cache",
+            value=f"**Entries:** {settings_stats['size']}/{settings_stats['maxsize']}\n"
+                  f"**Hits:** {settings_stats['hits']}\n"
+                  f"**Misses:** {settings_stats['misses']}\n"
+                  f"**Hit Rate:** {settings_stats['hit_rate']:.0%}",
+            inline=True
+        )
+        embed_stats = embed_cache.stats()
+        embed.add_field(
+            name="🖼️ Embed Cache",
+            value=f"**Entries:** {embed_stats['size']}/{embed_stats['maxsize']}\n"
+                  f"**Hits:** {embed_stats['hits']}\n"
+                  f"**Misses:** {embed_stats['misses']}\n"
+                  f"**Hit Rate:** {embed_stats['hit_rate']:.0%}",
+            inline=True
+        )
+        writer_stats = mod_log_writer.stats()
+        embed.add_field(
+            name="📝 Mod Log Writer",
+            value=f"**Queued:** {writer_stats['queued']}/{writer_stats['max_queued']}\n"
+                  f"**Written:** {writer_stats['written']}\n"
+                  f"**Failed:** {writer_stats['failed']}\n"
+                  f"**Flush:** {writer_stats['avg_flush_ms']:.1f}ms avg, {writer_stats['max_flush_ms']:.1f}ms max",
+            inline=True
+        )
+        dispatch_stats = log_dispatcher.stats()
+        busiest = sorted(dispatch_stats["channels"].items(), key=lambda item: item[1]["queued"], reverse=True)[:3]
+        embed.add_field(
+            name="📤 Log Dispatcher",
+            value=f"**Queued:** {dispatch_stats['queued']}\n"
+                  f"**Sent:** {dispatch_stats['sent_embeds']} embeds in {dispatch_stats['sent_messages']} messages\n"
+                  f"**Dropped:** {dispatch_stats['dropped']}\n"
+                  f"**Errors:** {dispatch_stats['errors']}"
+                  + "".join(f"\n<#{channel_id}>: {channel['queued']} queued" for channel_id, channel in busiest if channel["queued"]),
+            inline=True
+        )
         embed.set_footer(text=f"Bot started at {self.start_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
         await ctx.respond(embed=embed)
 
@@ -61,12 +153,110 @@ class BotManagementCommand(discord.Cog):
             return
         await ctx.defer()
         try:
-            await self.bot.reload_commands()
-            await self.bot.reload_events()
-            await ctx.respond("✅ Reloaded all commands and events!")
+            if cluster_client.connected:
+                # Every cluster runs its own copy of the code, so all of them reload
+                replies = await cluster_client.broadcast("reload", timeout=60)
+                reports = [(f"[#{reply['cluster']}] ", reply["data"], reply["error"]) for reply in replies]
+            else:
+                reports = [("", await self.bot.reload_changed(), None)]
+            lines = []
+            synced = False
+            for prefix, report, error in reports:
+                if report is None:
+                    lines.append(f"{prefix}❌ Reload failed: {error}")
+                    continue
+                lines += [f"{prefix}🔄 Reloaded `{name}`" for name in report["reloaded"]]
+                lines += [f"{prefix}🗑️ Unloaded `{name}`" for name in report["unloaded"]]
+                lines += [f"{prefix}❌ `{name}`: {failure}" for name, failure in report["failed"]]
+                synced |= report["synced"]
+            if not lines:
+                await ctx.respond("✅ Nothing changed since the last load.")
+                return
+            if synced:
+                lines.append("Slash commands re-synced.")
+            await ctx.respond("\n".join(lines)[:2000])
         except Exception as e:
             await ctx.respond(f"❌ Reload failed: {e}")
 
+    @group.command(name="profile", description="Show how long each module took to load at startup")
+    @discord.default_permissions(administrator=True)
+    async def profile(self, ctx: discord.ApplicationContext):
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need Administrator permissions to use this command.", ephemeral=True)
+            return
+        if not self.bot.startup_profile:
+            await ctx.respond("No startup profile recorded yet.", ephemeral=True)
+            return
+        table = self.bot.startup_report()
+        await ctx.respond(f"```\n{table[:1900]}\n```", ephemeral=True)
+
+    @group.command(name="metrics", description="Show command, listener and database latency")
+    @discord.default_permissions(administrator=True)
+    async def metrics(
+        self,
+        ctx: discord.ApplicationContext,
+        kind: discord.Option(str, "Only show one kind of timing", choices=["command", "event", "db"], required=False, default=None) # type: ignore
+    ):
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need Administrator permissions to use this command.", ephemeral=True)
+            return
+        source = metrics
+        if cluster_client.connected:
+            # Histograms merge bucket by bucket, so the percentiles cover every cluster
+            source = Metrics()
+            for reply in await cluster_client.broadcast("metrics"):
+                if reply["data"]:
+                    source.merge(reply["data"])
+        rows = source.summary(kind)[:20]
+        if not rows:
+            await ctx.respond("No timings recorded yet.", ephemeral=True)
+            return
+        width = max(len(row["name"]) for row in rows)
+        lines = [f"{'name':<{width}}  {'kind':<7} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8}"]
+        for row in rows:
+            lines.append(
+                f"{row['name']:<{width}}  {row['kind']:<7} {row['count']:>6} {row['errors']:>4} "
+                f"{row['p50_ms']:>6.1f}ms {row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms"
+            )
+        table = "\n".join(lines)
+        await ctx.respond(f"```\n{table[:1900]}\n```", ephemeral=True)
+
+    @group.command(name="db", description="Check database health and latency")
+    @discord.default_permissions(administrator=True)
+    async def database(self, ctx: discord.ApplicationContext):
+        if not ctx.author.guild_permissions.administrator:
+            await ctx.respond("❌ You need Administrator permissions to use this command.", ephemeral=True)
+            return
+        info = database_info()
+        try:
+            ping = f"{await ping_database():.1f}ms"
+            healthy = True
+        except Exception as e:
+            ping = f"unreachable ({e.__class__.__name__})"
+            healthy = False
+        embed = discord.Embed(
+            title="🗃️ Database",
+            color=discord.Color.green() if healthy else discord.Color.red()
+        )
+        connection = f"**Backend:** {info['backend']}\n**Target:** {info['target']}\n**Ping:** {ping}"
+        if info["backend"] == "mongo":
+            connection += f"\n**Pool:** {info['pool']} connections\n**Compression:** {info['compressors']}"
+            if info.get("servers"):
+                connection += f"\n**Servers:** {', '.join(info['servers'])}"
+        embed.add_field(name="🔌 Connection", value=connection, inline=False)
+        rows = sorted(metrics.summary("db"), key=lambda row: row["count"], reverse=True)[:8]
+        if rows:
+            embed.add_field(
+                name="⏱️ Operations",
+                value="\n".join(
+                    f"**{row['name']}:** {row['count']} ops, p50 {row['p50_ms']:.1f}ms, p99 {row['p99_ms']:.1f}ms"
+                    + (f", {row['errors']} errors" if row["errors"] else "")
+                    for row in rows
+                ),
+                inline=False
+            )
+        await ctx.respond(embed=embed, ephemeral=True)
+
     @group.command(name="info", description="Show detailed bot information")
     async def info(self, ctx: discord.ApplicationContext):
         embed = discord.Embed(
@@ -79,4 +269,4 @@ class BotManagementCommand(discord.Cog):
 
 def setup(bot):
     bot.add_cog(BotManagementCommand(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
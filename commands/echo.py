@@ -1,5 +1,9 @@
+import logging
 import discord
 from discord.ext import commands
+from ratelimit import rate_limited
+
+log = logging.getLogger(__name__)
 
 # ====== COMMAND CONFIGURATION ======
 COMMAND_NAME = "echo"
@@ -15,6 +19,7 @@ class Echo(commands.Cog):
         name=f"{COMMAND_NAME}",
         description="Template command with options"
     )
+    @rate_limited(COMMAND_NAME)
     async def echo(
         self,
         ctx: discord.ApplicationContext,
@@ -25,4 +30,4 @@ class Echo(commands.Cog):
 def setup(bot):
     """Required setup function for automatic loading"""
     bot.add_cog(Echo(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
@@ -1,11 +1,15 @@
 """
 /kick and /ban commands with logging
 """
+import logging
 import discord
 from discord.ext import commands
-from db import get_mod_logs_collection, get_guild_settings_collection
+from db import mod_log_writer
+from log_dispatcher import send_mod_log
 from datetime import datetime
 
+logger = logging.getLogger(__name__)  # "log" is the mod log document below
+
 class KickBanCog(discord.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -23,7 +27,6 @@ class KickBanCog(discord.Cog):
             return
         try:
             await user.kick(reason=reason)
-            col = get_mod_logs_collection()
             log = {
                 "guild_id": ctx.guild.id,
                 "user_id": user.id,
@@ -32,17 +35,14 @@ class KickBanCog(discord.Cog):
                 "moderator_id": ctx.author.id,
                 "timestamp": datetime.utcnow()
             }
-            await col.insert_one(log)
+            await mod_log_writer.put(log)
             embed = discord.Embed(title="User Kicked", color=discord.Color.red(), timestamp=datetime.utcnow())
             embed.add_field(name="User", value=user.mention)
             embed.add_field(name="Moderator", value=ctx.author.mention)
             embed.add_field(name="Reason", value=reason)
             await ctx.respond(embed=embed)
-            settings = await get_guild_settings_collection().find_one({"_id": ctx.guild.id})
-            if settings and settings.get("log_channel_id"):
-                channel = ctx.guild.get_channel(settings["log_channel_id"])
-                if channel:
-                    await channel.send(embed=embed)
+            # Log to channel if set
+            await send_mod_log(ctx.guild, embed)
         except discord.Forbidden:
             embed = discord.Embed(title="Missing Permissions", description="I do not have permission to kick this user.", color=discord.Color.red())
             await ctx.respond(embed=embed, ephemeral=True)
@@ -63,7 +63,6 @@ class KickBanCog(discord.Cog):
             return
         try:
             await user.ban(reason=reason)
-            col = get_mod_logs_collection()
             log = {
                 "guild_id": ctx.guild.id,
                 "user_id": user.id,
@@ -72,17 +71,14 @@ class KickBanCog(discord.Cog):
                 "moderator_id": ctx.author.id,
                 "timestamp": datetime.utcnow()
             }
-            await col.insert_one(log)
+            await mod_log_writer.put(log)
             embed = discord.Embed(title="User Banned", color=discord.Color.red(), timestamp=datetime.utcnow())
             embed.add_field(name="User", value=user.mention)
             embed.add_field(name="Moderator", value=ctx.author.mention)
             embed.add_field(name="Reason", value=reason)
             await ctx.respond(embed=embed)
-            settings = await get_guild_settings_collection().find_one({"_id": ctx.guild.id})
-            if settings and settings.get("log_channel_id"):
-                channel = ctx.guild.get_channel(settings["log_channel_id"])
-                if channel:
-                    await channel.send(embed=embed)
+            # Log to channel if set
+            await send_mod_log(ctx.guild, embed)
         except discord.Forbidden:
             embed = discord.Embed(title="Missing Permissions", description="I do not have permission to ban this user.", color=discord.Color.red())
             await ctx.respond(embed=embed, ephemeral=True)
@@ -92,4 +88,4 @@ class KickBanCog(discord.Cog):
 
 def setup(bot):
     bot.add_cog(KickBanCog(bot))
-    print("🔧 Command 'kick' and 'ban' registered successfully")
+    logger.info("🔧 Command 'kick' and 'ban' registered successfully")
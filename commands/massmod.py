@@ -0,0 +1,239 @@
+"""
+/massban and /masskick commands for handling raids
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+import discord
+from datetime import datetime, timedelta, timezone
+from cache_profiles import members_cached
+from db import get_mod_logs_collection, record_mod_summaries
+from log_dispatcher import send_mod_log
+
+log = logging.getLogger(__name__)
+
+MASS_ACTION_CONCURRENCY = int(os.getenv("MASS_ACTION_CONCURRENCY") or 5)
+MAX_TARGETS = 1000
+PROGRESS_INTERVAL = 2  # seconds between progress message edits
+
+ID_PATTERN = re.compile(r"\d{15,20}")
+
+def parse_user_ids(text):
+    """Extract user ids from a list of ids or mentions separated by spaces, commas or newlines"""
+    return list(dict.fromkeys(int(match) for match in ID_PATTERN.findall(text or "")))
+
+def select_targets(guild, user_ids=None, joined_within=None, account_age_days=None, now=None):
+    """Resolve the user ids to act on from explicit ids and/or join-time and account-age filters"""
+    now = now or datetime.now(timezone.utc)
+    joined_after = now - timedelta(minutes=joined_within) if joined_within else None
+    created_after = now - timedelta(days=account_age_days) if account_age_days else None
+
+    def matches(user_id, member):
+        if created_after and discord.utils.snowflake_time(user_id) < created_after:
+            return False
+        if joined_after and (member is None or member.joined_at is None or member.joined_at < joined_after):
+            return False
+        return True
+
+    if user_ids:
+        return [user_id for user_id in user_ids if matches(user_id, guild.get_member(user_id))]
+    if not joined_after and not created_after:
+        return []  # Never sweep the whole member list without a filter
+    return [member.id for member in guild.members if matches(member.id, member)]
+
+def can_moderate(ctx, user_id):
+    """Skip the invoker, the owner, the bot, and members at or above the invoker's or bot's top role"""
+    guild = ctx.guild
+    if user_id in (ctx.author.id, guild.owner_id, guild.me.id):
+        return False
+    member = guild.get_member(user_id)
+    if member is None:
+        return True
+    if member.top_role >= guild.me.top_role:
+        return False
+    return ctx.author.id == guild.owner_id or member.top_role < ctx.author.top_role
+
+async def run_bounded(items, action, concurrency, progress=None):
+    """Run ``action`` over ``items`` with at most ``concurrency`` in flight.
+
+    Returns (succeeded, failed) where failed maps each item to its error message.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    succeeded, failed = [], {}
+
+    async def worker(item):
+        async with semaphore:
+            for attempt in range(2):
+                try:
+                    await action(item)
+                    succeeded.append(item)
+                    break
+                except discord.HTTPException as e:
+                    # The HTTP client already honours rate-limit buckets; one extra back-off if it gave up
+                    if e.status == 429 and attempt == 0:
+                        await asyncio.sleep(getattr(e, "retry_after", None) or 5)
+                        continue
+                    failed[item] = e.text or str(e)
+                    break
+                except Exception as e:
+                    failed[item] = str(e)
+                    break
+            if progress:
+                progress(len(succeeded) + len(failed))
+
+    await asyncio.gather(*(worker(item) for item in items))
+    return succeeded, failed
+
+class MassModerationCog(discord.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def mass_action(self, ctx, action, user_ids, joined_within, account_age_days, reason):
+        deferred = False
+        if not user_ids and not joined_within and not account_age_days:
+            embed = discord.Embed(title="No Targets", description="Pass user ids, a join time or an account age.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        if not user_ids and not members_cached(self.bot, ctx.guild):
+            # Filter sweeps read the member list, which lean cache profiles don't keep
+            if not self.bot.intents.members:
+                embed = discord.Embed(title="Member List Unavailable", description="Filtering by join time or account age needs the members intent; pass user ids instead.", color=discord.Color.red())
+                await ctx.respond(embed=embed, ephemeral=True)
+                return
+            await ctx.defer()
+            deferred = True
+            await ctx.guild.chunk()
+        targets = select_targets(ctx.guild, parse_user_ids(user_ids), joined_within, account_age_days)
+        skipped = [user_id for user_id in targets if not can_moderate(ctx, user_id)]
+        targets = [user_id for user_id in targets if can_moderate(ctx, user_id)]
+        if not targets:
+            embed = discord.Embed(title="No Targets", description="No members matched those filters.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        if len(targets) > MAX_TARGETS:
+            embed = discord.Embed(title="Too Many Targets", description=f"{len(targets)} members matched; the limit is {MAX_TARGETS}.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+
+        if not deferred:
+            await ctx.defer()
+        audit_reason = f"{reason} (mass {action} by {ctx.author})"
+        if action == "ban":
+            perform = lambda user_id: ctx.guild.ban(discord.Object(id=user_id), reason=audit_reason)
+        else:
+            perform = lambda user_id: ctx.guild.kick(discord.Object(id=user_id), reason=audit_reason)
+
+        done = 0
+        def progress(count):
+            nonlocal done
+            done = count
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                try:
+                    await ctx.edit(content=f"⏳ Mass {action}: {done}/{len(targets)} processed...")
+                except discord.HTTPException:
+                    pass
+
+        start = time.perf_counter()
+        reporter = asyncio.create_task(report_progress())
+        try:
+            succeeded, failed = await run_bounded(targets, perform, MASS_ACTION_CONCURRENCY, progress)
+        finally:
+            reporter.cancel()
+        elapsed = time.perf_counter() - start
+
+        log_error = None
+        if succeeded:
+            now = datetime.utcnow()
+            logs = [
+                {
+                    "guild_id": ctx.guild.id,
+                    "user_id": user_id,
+                    "action": action,
+                    "reason": reason,
+                    "moderator_id": ctx.author.id,
+                    "timestamp": now
+                }
+                for user_id in succeeded
+            ]
+            # The bans/kicks already happened, so a database failure must not hide the results
+            try:
+                await get_mod_logs_collection().insert_many(logs, ordered=False)
+                await record_mod_summaries(logs)
+            except Exception as e:
+                log.exception("Failed to log mass %s in guild %s", action, ctx.guild.id)
+                log_error = e
+
+        embed = discord.Embed(
+            title=f"Mass {action.capitalize()} Complete",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Moderator", value=ctx.author.mention)
+        embed.add_field(name="Reason", value=reason)
+        embed.add_field(
+            name="Results",
+            value=f"**Succeeded:** {len(succeeded)}\n"
+                  f"**Failed:** {len(failed)}\n"
+                  f"**Skipped:** {len(skipped)}\n"
+                  f"**Took:** {elapsed:.1f}s",
+            inline=False
+        )
+        if succeeded:
+            ids = " ".join(str(user_id) for user_id in succeeded)
+            embed.add_field(name="Users", value=ids if len(ids) <= 1024 else ids[:1000] + " ...", inline=False)
+        if log_error is not None:
+            embed.add_field(name="⚠️ Not Logged", value=f"These {action}s could not be saved to the moderation log: {log_error}"[:1024], inline=False)
+        try:
+            await ctx.edit(content=None, embed=embed)
+        except discord.HTTPException as e:
+            log.warning("Could not show mass %s results in guild %s: %s", action, ctx.guild.id, e)
+        await send_mod_log(ctx.guild, embed)
+
+    @discord.slash_command(
+        name="massban",
+        description="Ban many users at once by id, join time or account age"
+    )
+    @discord.default_permissions(ban_members=True)
+    async def massban(
+        self,
+        ctx: discord.ApplicationContext,
+        reason: discord.Option(str, "Reason for the bans"), # type: ignore
+        user_ids: discord.Option(str, "User ids or mentions, separated by spaces or commas", required=False, default=None), # type: ignore
+        joined_within: discord.Option(int, "Only members who joined in the last N minutes", required=False, default=None, min_value=1), # type: ignore
+        account_age_days: discord.Option(int, "Only accounts younger than N days", required=False, default=None, min_value=1) # type: ignore
+    ):
+        # Only allow mods (ban_members) to use this command
+        if not ctx.author.guild_permissions.ban_members:
+            embed = discord.Embed(title="Missing Permissions", description="You do not have permission to ban members.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        await self.mass_action(ctx, "ban", user_ids, joined_within, account_age_days, reason)
+
+    @discord.slash_command(
+        name="masskick",
+        description="Kick many members at once by id, join time or account age"
+    )
+    @discord.default_permissions(kick_members=True)
+    async def masskick(
+        self,
+        ctx: discord.ApplicationContext,
+        reason: discord.Option(str, "Reason for the kicks"), # type: ignore
+        user_ids: discord.Option(str, "User ids or mentions, separated by spaces or commas", required=False, default=None), # type: ignore
+        joined_within: discord.Option(int, "Only members who joined in the last N minutes", required=False, default=None, min_value=1), # type: ignore
+        account_age_days: discord.Option(int, "Only accounts younger than N days", required=False, default=None, min_value=1) # type: ignore
+    ):
+        # Only allow mods (kick_members) to use this command
+        if not ctx.author.guild_permissions.kick_members:
+            embed = discord.Embed(title="Missing Permissions", description="You do not have permission to kick members.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        await self.mass_action(ctx, "kick", user_ids, joined_within, account_age_days, reason)
+
+def setup(bot):
+    bot.add_cog(MassModerationCog(bot))
+    log.info("🔧 Command 'massban' and 'masskick' registered successfully")
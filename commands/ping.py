@@ -3,9 +3,12 @@ Ping command - Template for Discord bot commands
 This command responds with the bot's latency
 """
 
+import logging
 import discord
 from discord.ext import commands
 
+log = logging.getLogger(__name__)
+
 # Command configuration
 COMMAND_NAME = "ping"
 COMMAND_DESCRIPTION = "Check the bot's latency"
@@ -35,4 +38,4 @@ class PingCommand(commands.Cog):
 def setup(bot):
     """Required setup function for automatic loading (py-cord)"""
     bot.add_cog(PingCommand(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
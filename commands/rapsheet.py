@@ -1,10 +1,134 @@
 """
 /rapsheet command: show all moderation actions for a user
 """
+import asyncio
+import logging
 import discord
-from db import get_mod_logs_collection
+from pymongo import ASCENDING
+from db import get_mod_logs_collection, get_mod_summary, mod_log_writer
+from ratelimit import rate_limited
+from retention import log_archiver, read_archive
 from datetime import datetime
 
+log = logging.getLogger(__name__)
+
+PAGE_SIZE = 10
+LOG_PROJECTION = {"action": 1, "reason": 1, "moderator_id": 1, "timestamp": 1}
+LOG_SORT = [("timestamp", ASCENDING), ("_id", ASCENDING)]
+FLUSH_TIMEOUT = 2.0  # seconds to wait for buffered logs; a raid's backlog can take much longer
+
+def page_query(guild_id, user_id, start=None):
+    """Build the range filter for a page beginning at the (timestamp, _id) key ``start``"""
+    query = {"guild_id": guild_id, "user_id": user_id}
+    if start is not None:
+        timestamp, log_id = start
+        query["$or"] = [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$gte": log_id}}
+        ]
+    return query
+
+async def fetch_page(guild_id, user_id, start=None, limit=PAGE_SIZE):
+    """Fetch up to ``limit`` logs plus the key of the entry after them (None at the end)"""
+    cursor = (
+        get_mod_logs_collection()
+        .find(page_query(guild_id, user_id, start), LOG_PROJECTION)
+        .sort(LOG_SORT)
+        .limit(limit + 1)
+        .batch_size(limit + 1)
+    )
+    entries = await cursor.to_list(length=limit + 1)
+    next_start = None
+    if len(entries) > limit:
+        extra = entries.pop()
+        next_start = (extra.get("timestamp"), extra["_id"])
+    return entries, next_start
+
+class RapSheetView(discord.ui.View):
+    """Previous/next buttons that fetch each page on demand.
+
+    Archived entries, when included, are older than everything in the collection,
+    so they fill the first pages and the live logs follow.
+    """
+
+    def __init__(self, ctx: discord.ApplicationContext, user: discord.Member, total: int, archived=(), summary=None):
+        super().__init__(timeout=180, disable_on_timeout=True)
+        self.ctx = ctx
+        self.user = user
+        self.summary = summary
+        self.archived = list(archived)
+        self.total = total + len(self.archived)
+        self.page = 0
+        self.page_count = max(1, -(-self.total // PAGE_SIZE))
+        self.starts = {}  # page -> key of its first live entry; pages not listed start at the first one
+
+    async def load(self, page):
+        """Fetch ``page`` and return its embed"""
+        offset = page * PAGE_SIZE
+        entries = self.archived[offset:offset + PAGE_SIZE]
+        if len(entries) < PAGE_SIZE:
+            live, next_start = await fetch_page(self.ctx.guild.id, self.user.id, self.starts.get(page), PAGE_SIZE - len(entries))
+            entries += live
+            if next_start is not None:
+                self.starts[page + 1] = next_start
+            has_next = next_start is not None
+        else:
+            has_next = offset + PAGE_SIZE < self.total
+        self.page = page
+        self.previous_page.disabled = page == 0
+        self.next_page.disabled = not has_next
+        return self.build_embed(entries)
+
+    def build_embed(self, entries):
+        description = f"**Total actions:** {self.total}"
+        if self.archived:
+            description += f" ({len(self.archived)} archived)"
+        if self.summary:
+            # Counters cover the whole history, including logs the retention policy archived
+            description += (
+                f"\n**Warns:** {self.summary.get('warns', 0)} · **Kicks:** {self.summary.get('kicks', 0)}"
+                f" · **Bans:** {self.summary.get('bans', 0)}"
+            )
+            if self.summary.get("last_action_at"):
+                description += f"\n**Last action:** {self.summary['last_action_at'].strftime('%Y-%m-%d %H:%M UTC')}"
+        embed = discord.Embed(
+            title=f"Rap Sheet for {self.user.display_name}",
+            description=description,
+            color=discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        for i, entry in enumerate(entries, self.page * PAGE_SIZE + 1):
+            action = entry.get("action", "?").capitalize()
+            reason = entry.get("reason", "No reason provided.")
+            mod_id = entry.get("moderator_id")
+            mod = self.ctx.guild.get_member(mod_id)
+            mod_str = mod.mention if mod else (f"<@{mod_id}>" if mod_id else "Unknown")
+            time = entry.get("timestamp")
+            if isinstance(time, datetime):
+                time_str = time.strftime('%Y-%m-%d %H:%M UTC')
+            else:
+                time_str = str(time)
+            embed.add_field(
+                name=f"{i}. {action}",
+                value=f"By: {mod_str}\nReason: {reason}\nAt: {time_str}",
+                inline=False
+            )
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count}")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.ctx.author.id
+
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        embed = await self.load(self.page - 1)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, button: discord.ui.Button, interaction: discord.Interaction):
+        embed = await self.load(self.page + 1)
+        await interaction.response.edit_message(embed=embed, view=self)
+
 class RapSheetCog(discord.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -14,17 +138,29 @@ class RapSheetCog(discord.Cog):
         description="Show all moderation actions (warnings, kicks, bans) for a user."
     )
     @discord.default_permissions(kick_members=True)
-    async def rapsheet(self, ctx: discord.ApplicationContext, user: discord.Member):
+    @rate_limited("rapsheet")
+    async def rapsheet(
+        self,
+        ctx: discord.ApplicationContext,
+        user: discord.Member,
+        include_archived: discord.Option(bool, "Also show logs moved to the archive by the retention policy", required=False, default=False) # type: ignore
+    ):
         # Only allow mods (kick_members) to use this command
         if not ctx.author.guild_permissions.kick_members:
             embed = discord.Embed(title="Missing Permissions", description="You do not have permission to view rapsheets.", color=discord.Color.red())
             await ctx.respond(embed=embed, ephemeral=True)
             return
+        # Acknowledge first: the interaction expires if it isn't answered within 3 seconds
+        await ctx.defer(ephemeral=True)
         try:
-            col = get_mod_logs_collection()
-            logs = col.find({"guild_id": ctx.guild.id, "user_id": user.id})
-            actions = [log async for log in logs]
-            if not actions:
+            # Make sure actions still waiting in the write-behind buffer show up, unless that takes too long
+            if not await mod_log_writer.flush(FLUSH_TIMEOUT):
+                log.warning("Mod log buffer still draining; /rapsheet for %s may miss recent actions", user.id)
+            total = await get_mod_logs_collection().count_documents({"guild_id": ctx.guild.id, "user_id": user.id})
+            archived = []
+            if include_archived:
+                archived = await asyncio.to_thread(read_archive, log_archiver.root, ctx.guild.id, user.id)
+            if not total and not archived:
                 embed = discord.Embed(
                     title=f"Rap Sheet for {user.display_name}",
                     description="No moderation actions found.",
@@ -32,30 +168,13 @@ class RapSheetCog(discord.Cog):
                 )
                 await ctx.respond(embed=embed, ephemeral=True)
                 return
-            # Sort by timestamp
-            actions.sort(key=lambda x: x.get("timestamp", datetime.min))
-            embed = discord.Embed(
-                title=f"Rap Sheet for {user.display_name}",
-                color=discord.Color.orange(),
-                timestamp=datetime.utcnow()
-            )
-            for i, entry in enumerate(actions, 1):
-                action = entry.get("action", "?").capitalize()
-                reason = entry.get("reason", "No reason provided.")
-                mod_id = entry.get("moderator_id")
-                mod = ctx.guild.get_member(mod_id)
-                mod_str = mod.mention if mod else (f"<@{mod_id}>" if mod_id else "Unknown")
-                time = entry.get("timestamp")
-                if isinstance(time, datetime):
-                    time_str = time.strftime('%Y-%m-%d %H:%M UTC')
-                else:
-                    time_str = str(time)
-                embed.add_field(
-                    name=f"{i}. {action}",
-                    value=f"By: {mod_str}\nReason: {reason}\nAt: {time_str}",
-                    inline=False
-                )
-            await ctx.respond(embed=embed, ephemeral=True)
+            summary = await get_mod_summary(ctx.guild.id, user.id)
+            view = RapSheetView(ctx, user, total, archived, summary)
+            embed = await view.load(0)
+            if view.page_count == 1:
+                await ctx.respond(embed=embed, ephemeral=True)
+            else:
+                await ctx.respond(embed=embed, view=view, ephemeral=True)
         except discord.errors.Forbidden:
             await ctx.respond(embed=discord.Embed(
                 title="Missing Permissions",
@@ -72,4 +191,4 @@ class RapSheetCog(discord.Cog):
 
 def setup(bot):
     bot.add_cog(RapSheetCog(bot))
-    print("🔧 Command 'rapsheet' registered successfully")
+    log.info("🔧 Command 'rapsheet' registered successfully")
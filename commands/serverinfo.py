@@ -3,9 +3,16 @@ Server Information Command
 Shows detailed information about the Discord server
 """
 
+import logging
 import discord
 from discord.ext import commands
 from datetime import datetime
+from cache import approximate_counts_cache, copy_embed, embed_cache, guild_embed_key
+from cache_profiles import members_cached
+from member_stats import member_counters, MEMBER_COUNTS_CHECK
+from ratelimit import rate_limited
+
+log = logging.getLogger(__name__)
 
 # Command configuration
 COMMAND_NAME = "serverinfo"
@@ -20,11 +27,61 @@ class ServerinfoCommand(commands.Cog):
         name=COMMAND_NAME,
         description=COMMAND_DESCRIPTION
     )
+    @rate_limited(COMMAND_NAME)
     async def serverinfo_command(self, ctx: discord.ApplicationContext):
         """Get detailed information about the server"""
 
         guild = ctx.guild
 
+        # Everything but the member counts only changes with guild, channel and role events
+        cached = embed_cache.get(guild_embed_key(guild.id))
+        if cached is None:
+            cached = self.static_embed(guild)
+            embed_cache.set(guild_embed_key(guild.id), cached)
+        embed = copy_embed(cached)
+
+        # Member counts: the counters need the member cache, and online counts need presences
+        total_members = guild.member_count
+        humans = bots = online = None
+        if members_cached(self.bot, guild):
+            if MEMBER_COUNTS_CHECK:
+                drift = member_counters.verify(guild)
+                if drift:
+                    log.warning("⚠️  Member counters for %s drifted: %s", guild.id, drift)
+            counts = member_counters.get(guild)
+            humans, bots = counts.humans, counts.bots
+            if self.bot.intents.presences:
+                online = counts.online
+        if online is None:
+            # Lean cache profiles: ask Discord for its approximate counts instead, at most once per TTL
+            approximate = approximate_counts_cache.get(guild.id)
+            if approximate is None:
+                try:
+                    fetched = await self.bot.fetch_guild(guild.id, with_counts=True)
+                    approximate = (fetched.approximate_member_count, fetched.approximate_presence_count)
+                    approximate_counts_cache.set(guild.id, approximate)
+                except discord.HTTPException:
+                    approximate = (None, None)
+            total_members = total_members or approximate[0]
+            online = approximate[1]
+
+        embed.insert_field_at(
+            1,
+            name="👥 Members",
+            value=f"**Total:** {total_members if total_members is not None else 'Unknown'}\n"
+                  f"**Humans:** {humans if humans is not None else 'Unknown'}\n"
+                  f"**Bots:** {bots if bots is not None else 'Unknown'}\n"
+                  f"**Online:** {online if online is not None else 'Unknown'}",
+            inline=True
+        )
+
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        embed.timestamp = datetime.utcnow()
+
+        await ctx.respond(embed=embed)
+
+    def static_embed(self, guild):
+        """The parts of the embed that stay valid until the guild, a channel or a role changes"""
         # Create embed
         embed = discord.Embed(
             title=f"Server Information - {guild.name}",
@@ -40,27 +97,11 @@ class ServerinfoCommand(commands.Cog):
             name="📊 Basic Info",
             value=f"**Name:** {guild.name}\n"
                   f"**ID:** {guild.id}\n"
-                  f"**Owner:** {guild.owner.mention if guild.owner else 'Unknown'}\n"
+                  f"**Owner:** {guild.owner.mention if guild.owner else (f'<@{guild.owner_id}>' if guild.owner_id else 'Unknown')}\n"
                   f"**Created:** {discord.utils.format_dt(guild.created_at, 'F')}",
             inline=True
         )
 
-        # Member counts
-        total_members = guild.member_count
-        humans = len([m for m in guild.members if not m.bot])
-        bots = len([m for m in guild.members if m.bot])
-
-        online_members = len([m for m in guild.members if m.status != discord.Status.offline])
-
-        embed.add_field(
-            name="👥 Members",
-            value=f"**Total:** {total_members}\n"
-                  f"**Humans:** {humans}\n"
-                  f"**Bots:** {bots}\n"
-                  f"**Online:** {online_members}",
-            inline=True
-        )
-
         # Channel counts
         text_channels = len(guild.text_channels)
         voice_channels = len(guild.voice_channels)
@@ -135,12 +176,9 @@ class ServerinfoCommand(commands.Cog):
         if guild.banner:
             embed.set_image(url=guild.banner.url)
 
-        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
-        embed.timestamp = datetime.utcnow()
-
-        await ctx.respond(embed=embed)
+        return embed
 
 def setup(bot):
     """Required setup function for automatic loading (py-cord)"""
     bot.add_cog(ServerinfoCommand(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
@@ -1,9 +1,16 @@
 """
 /settings command for managing server settings (log channel, fun commands, etc.)
 """
+import asyncio
+import logging
 import discord
 from discord.ext import commands
-from db import get_guild_settings_collection
+from db import get_guild_settings_collection, mod_log_writer, rebuild_mod_summaries
+from retention import log_archiver, read_archive
+from cache import get_guild_settings, cache_guild_settings, update_guild_settings
+from ratelimit import DEFAULT_LIMITS, rate_limited
+
+log = logging.getLogger(__name__)
 
 COMMAND_NAME = "settings"
 COMMAND_DESCRIPTION = "Bot settings for the server"
@@ -18,37 +25,104 @@ class SettingsCog(discord.Cog):
         description=COMMAND_DESCRIPTION
     )
     @settings.command(name="show", description="Show current settings")
+    @rate_limited("settings show")
     async def show(self, ctx: discord.ApplicationContext):
         """Show current server settings"""
-        col = get_guild_settings_collection()
-        doc = await col.find_one({"_id": ctx.guild.id})
+        doc = await get_guild_settings(ctx.guild.id)
         if not doc:
             doc = {"_id": ctx.guild.id, "log_channel_id": None, "fun_enabled": True, "modlog_enabled": True}
-            await col.insert_one(doc)
+            await get_guild_settings_collection().insert_one(doc)
+            cache_guild_settings(ctx.guild.id, doc)
         embed = discord.Embed(title=f"Settings for {ctx.guild.name}", color=discord.Color.blurple())
         embed.add_field(name="Log Channel", value=f'<#{doc.get("log_channel_id")}>' if doc.get("log_channel_id") else "Not set", inline=False)
         embed.add_field(name="Fun Commands", value="Enabled" if doc.get("fun_enabled", True) else "Disabled", inline=True)
         embed.add_field(name="Mod Logs", value="Enabled" if doc.get("modlog_enabled", True) else "Disabled", inline=True)
+        embed.add_field(name="Welcome Batching", value=f'{doc["welcome_batch_seconds"]}s' if doc.get("welcome_batch_seconds") else "Off", inline=True)
+        embed.add_field(name="Log Retention", value=f'{doc["log_retention_days"]} days' if doc.get("log_retention_days") else "Forever", inline=True)
+        overrides = {name: limit for name, limit in (doc.get("rate_limits") or {}).items() if limit}
+        if overrides:
+            embed.add_field(
+                name="Rate Limits",
+                value="\n".join(f"`/{name}`: " + (f"{uses} per {seconds}s" if uses else "unlimited") for name, (uses, seconds) in sorted(overrides.items())),
+                inline=False
+            )
         await ctx.respond(embed=embed)
 
     @settings.command(name="setlog", description="Set the moderation log channel")
     async def setlog(self, ctx: discord.ApplicationContext, channel: discord.Option(discord.TextChannel, "Log channel")): # type: ignore
-        col = get_guild_settings_collection()
-        await col.update_one({"_id": ctx.guild.id}, {"$set": {"log_channel_id": channel.id}}, upsert=True)
+        await update_guild_settings(ctx.guild.id, {"log_channel_id": channel.id})
         await ctx.respond(f"Log channel set to {channel.mention}")
 
     @settings.command(name="togglefun", description="Enable or disable fun commands")
     async def togglefun(self, ctx: discord.ApplicationContext, enabled: bool):
-        col = get_guild_settings_collection()
-        await col.update_one({"_id": ctx.guild.id}, {"$set": {"fun_enabled": enabled}}, upsert=True)
+        await update_guild_settings(ctx.guild.id, {"fun_enabled": enabled})
         await ctx.respond(f"Fun commands {'enabled' if enabled else 'disabled'}.")
 
     @settings.command(name="togglemodlog", description="Enable or disable moderation logs")
     async def togglemodlog(self, ctx: discord.ApplicationContext, enabled: bool):
-        col = get_guild_settings_collection()
-        await col.update_one({"_id": ctx.guild.id}, {"$set": {"modlog_enabled": enabled}}, upsert=True)
+        await update_guild_settings(ctx.guild.id, {"modlog_enabled": enabled})
         await ctx.respond(f"Moderation logs {'enabled' if enabled else 'disabled'}.")
 
+    @settings.command(name="welcomebatch", description="Combine joins within a window into one welcome message")
+    async def welcomebatch(self, ctx: discord.ApplicationContext, seconds: discord.Option(int, "Window in seconds (0 to disable)", min_value=0, max_value=60)): # type: ignore
+        await update_guild_settings(ctx.guild.id, {"welcome_batch_seconds": seconds})
+        await ctx.respond(f"Welcome batching {'set to ' + str(seconds) + 's' if seconds else 'disabled'}.")
+
+    @settings.command(name="retention", description="Archive moderation logs older than a number of days")
+    @discord.default_permissions(manage_guild=True)
+    async def retention(self, ctx: discord.ApplicationContext, days: discord.Option(int, "Days to keep logs in the rap sheet (0 keeps them forever)", min_value=0, max_value=3650)): # type: ignore
+        # Archiving moves logs out of every rap sheet, so only server managers may change it
+        if not ctx.author.guild_permissions.manage_guild:
+            embed = discord.Embed(title="Missing Permissions", description="You need Manage Server to change log retention.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        await update_guild_settings(ctx.guild.id, {"log_retention_days": days})
+        await ctx.respond(f"Moderation logs {'older than ' + str(days) + ' days will be archived' if days else 'will be kept forever'}.")
+
+    @settings.command(name="ratelimit", description="Change how often each member may use a command")
+    @discord.default_permissions(manage_guild=True)
+    async def ratelimit(
+        self,
+        ctx: discord.ApplicationContext,
+        command: discord.Option(str, "Command to limit", choices=list(DEFAULT_LIMITS)), # type: ignore
+        uses: discord.Option(int, "Uses allowed per window (0 for no limit, empty for the default)", required=False, default=None, min_value=0, max_value=100), # type: ignore
+        seconds: discord.Option(int, "Window length in seconds", required=False, default=60, min_value=1, max_value=3600) # type: ignore
+    ):
+        if not ctx.author.guild_permissions.manage_guild:
+            embed = discord.Embed(title="Missing Permissions", description="You need Manage Server to change rate limits.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        doc = await get_guild_settings(ctx.guild.id)
+        limits = dict((doc or {}).get("rate_limits") or {})
+        if uses is None:
+            limits.pop(command, None)
+            default_uses, default_seconds = DEFAULT_LIMITS[command]
+            message = f"`/{command}` is back to the default of {default_uses} uses per {default_seconds}s."
+        else:
+            limits[command] = [uses, seconds]
+            message = f"`/{command}` is now limited to {uses} uses per {seconds}s per member." if uses else f"`/{command}` is no longer rate limited."
+        await update_guild_settings(ctx.guild.id, {"rate_limits": limits})
+        await ctx.respond(message)
+
+    @settings.command(name="rebuildsummaries", description="Recount every member's moderation summary from the logs")
+    @discord.default_permissions(manage_guild=True)
+    async def rebuildsummaries(self, ctx: discord.ApplicationContext):
+        if not ctx.author.guild_permissions.manage_guild:
+            embed = discord.Embed(title="Missing Permissions", description="You need Manage Server to rebuild moderation summaries.", color=discord.Color.red())
+            await ctx.respond(embed=embed, ephemeral=True)
+            return
+        await ctx.defer()
+        try:
+            await mod_log_writer.flush()
+            archived = await asyncio.to_thread(read_archive, log_archiver.root, ctx.guild.id)
+            count = await rebuild_mod_summaries(ctx.guild.id, archived)
+        except Exception as e:
+            log.exception("Failed to rebuild moderation summaries for guild %s", ctx.guild.id)
+            embed = discord.Embed(title="Error", description=f"Could not rebuild moderation summaries: {e}", color=discord.Color.red())
+            await ctx.respond(embed=embed)
+            return
+        await ctx.respond(f"Rebuilt moderation summaries for {count} members.")
+
 def setup(bot):
     bot.add_cog(SettingsCog(bot))
-    print("🔧 Command 'settings' registered successfully")
+    log.info("🔧 Command 'settings' registered successfully")
@@ -3,9 +3,15 @@ User Information Command
 Shows detailed information about a Discord user
 """
 
+import logging
 import discord
 from discord.ext import commands
 from datetime import datetime
+from cache import copy_embed, embed_cache, member_embed_key
+from db import get_mod_summary
+from ratelimit import rate_limited
+
+log = logging.getLogger(__name__)
 
 # Command configuration
 COMMAND_NAME = "userinfo"
@@ -20,6 +26,7 @@ class UserinfoCommand(commands.Cog):
         name=COMMAND_NAME,
         description=COMMAND_DESCRIPTION
     )
+    @rate_limited(COMMAND_NAME)
     async def userinfo_command(
         self,
         ctx: discord.ApplicationContext,
@@ -29,7 +36,75 @@ class UserinfoCommand(commands.Cog):
 
         # If no user specified, use the command author
         target_user = user or ctx.author
+        key = member_embed_key(ctx.guild.id, target_user.id) if ctx.guild is not None else None
+        cached = embed_cache.get(key) if key is not None else None
+        if cached is None:
+            if ctx.guild is not None and not hasattr(target_user, "joined_at"):
+                # Not in the member cache (lean cache profiles): fetch the member for roles and join date
+                try:
+                    target_user = await ctx.guild.fetch_member(target_user.id)
+                except discord.HTTPException:
+                    pass
+            cached = self.static_embed(target_user)
+            # Only members are invalidated by member, role and guild events
+            if key is not None and hasattr(target_user, "joined_at"):
+                embed_cache.set(key, cached)
+        embed, status_index = cached
+        embed = copy_embed(embed)
+
+        # Status and activity (only known with the presences intent)
+        if hasattr(target_user, 'status') and self.bot.intents.presences:
+            status_emoji = {
+                discord.Status.online: "🟢",
+                discord.Status.idle: "🟡",
+                discord.Status.dnd: "🔴",
+                discord.Status.offline: "⚫"
+            }
+
+            status_text = f"{status_emoji.get(target_user.status, '❓')} {target_user.status.name.title()}"
+
+            if target_user.activity:
+                activity = target_user.activity
+                if activity.type == discord.ActivityType.playing:
+                    status_text += f"\n🎮 Playing **{activity.name}**"
+                elif activity.type == discord.ActivityType.streaming:
+                    status_text += f"\n📺 Streaming **{activity.name}**"
+                elif activity.type == discord.ActivityType.listening:
+                    status_text += f"\n🎵 Listening to **{activity.name}**"
+                elif activity.type == discord.ActivityType.watching:
+                    status_text += f"\n👀 Watching **{activity.name}**"
+                elif activity.type == discord.ActivityType.custom:
+                    status_text += f"\n💭 {activity.name}"
+
+            embed.insert_field_at(
+                status_index,
+                name="💬 Status",
+                value=status_text,
+                inline=True
+            )
+
+        # Moderation record badges, one point read on the user's summary
+        if ctx.guild is not None:
+            try:
+                summary = await get_mod_summary(ctx.guild.id, target_user.id)
+            except Exception:
+                summary = None
+            if summary:
+                badges = [
+                    f"{emoji} {summary[field]} {label}{'s' if summary[field] != 1 else ''}"
+                    for field, emoji, label in (("warns", "⚠️", "warning"), ("kicks", "👢", "kick"), ("bans", "🔨", "ban"))
+                    if summary.get(field)
+                ]
+                if badges:
+                    embed.add_field(name="🛡️ Moderation Record", value=" · ".join(badges), inline=False)
+
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        embed.timestamp = datetime.utcnow()
+
+        await ctx.respond(embed=embed)
 
+    def static_embed(self, target_user):
+        """Build everything but status and moderation record; returns (embed, index for the status field)"""
         # Create embed
         embed = discord.Embed(
             title=f"User Information - {target_user.display_name}",
@@ -79,35 +154,7 @@ class UserinfoCommand(commands.Cog):
                 inline=False
             )
 
-        # Status and activity
-        if hasattr(target_user, 'status'):
-            status_emoji = {
-                discord.Status.online: "🟢",
-                discord.Status.idle: "🟡",
-                discord.Status.dnd: "🔴",
-                discord.Status.offline: "⚫"
-            }
-
-            status_text = f"{status_emoji.get(target_user.status, '❓')} {target_user.status.name.title()}"
-
-            if target_user.activity:
-                activity = target_user.activity
-                if activity.type == discord.ActivityType.playing:
-                    status_text += f"\n🎮 Playing **{activity.name}**"
-                elif activity.type == discord.ActivityType.streaming:
-                    status_text += f"\n📺 Streaming **{activity.name}**"
-                elif activity.type == discord.ActivityType.listening:
-                    status_text += f"\n🎵 Listening to **{activity.name}**"
-                elif activity.type == discord.ActivityType.watching:
-                    status_text += f"\n👀 Watching **{activity.name}**"
-                elif activity.type == discord.ActivityType.custom:
-                    status_text += f"\n💭 {activity.name}"
-
-            embed.add_field(
-                name="💬 Status",
-                value=status_text,
-                inline=True
-            )
+        status_index = len(embed.fields)
 
         # Permissions (if it's a guild member)
         if hasattr(target_user, 'guild_permissions'):
@@ -136,12 +183,9 @@ class UserinfoCommand(commands.Cog):
                     inline=True
                 )
 
-        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
-        embed.timestamp = datetime.utcnow()
-
-        await ctx.respond(embed=embed)
+        return embed, status_index
 
 def setup(bot):
     """Required setup function for automatic loading (py-cord)"""
     bot.add_cog(UserinfoCommand(bot))
-    print(f"Command '{COMMAND_NAME}' registered successfully")
+    log.info("Command '%s' registered successfully", COMMAND_NAME)
@@ -1,11 +1,15 @@
 """
 /warn command and warning log system
 """
+import logging
 import discord
 from discord.ext import commands
-from db import get_mod_logs_collection, get_guild_settings_collection
+from db import get_mod_summary, mod_log_writer
+from log_dispatcher import send_mod_log
 from datetime import datetime
 
+logger = logging.getLogger(__name__)  # "log" is the mod log document below
+
 
 class WarnCog(discord.Cog):
     def __init__(self, bot):
@@ -23,7 +27,6 @@ class WarnCog(discord.Cog):
             await ctx.respond(embed=embed, ephemeral=True)
             return
         try:
-            col = get_mod_logs_collection()
             log = {
                 "guild_id": ctx.guild.id,
                 "user_id": user.id,
@@ -32,18 +35,17 @@ class WarnCog(discord.Cog):
                 "moderator_id": ctx.author.id,
                 "timestamp": datetime.utcnow()
             }
-            await col.insert_one(log)
+            # Escalation check: prior warnings come from the user's summary, not a count over logs
+            summary = await get_mod_summary(ctx.guild.id, user.id)
+            await mod_log_writer.put(log)
             embed = discord.Embed(title="User Warned", color=discord.Color.orange(), timestamp=datetime.utcnow())
             embed.add_field(name="User", value=user.mention)
             embed.add_field(name="Moderator", value=ctx.author.mention)
             embed.add_field(name="Reason", value=reason)
+            embed.add_field(name="Warnings", value=str((summary or {}).get("warns", 0) + 1))
             await ctx.respond(embed=embed)
             # Log to channel if set
-            settings = await get_guild_settings_collection().find_one({"_id": ctx.guild.id})
-            if settings and settings.get("log_channel_id"):
-                channel = ctx.guild.get_channel(settings["log_channel_id"])
-                if channel:
-                    await channel.send(embed=embed)
+            await send_mod_log(ctx.guild, embed)
         except discord.Forbidden:
             embed = discord.Embed(title="Missing Permissions", description="I do not have permission to warn this user.", color=discord.Color.red())
             await ctx.respond(embed=embed, ephemeral=True)
@@ -53,4 +55,4 @@ class WarnCog(discord.Cog):
 
 def setup(bot):
     bot.add_cog(WarnCog(bot))
-    print("🔧 Command 'warn' registered successfully")
+    logger.info("🔧 Command 'warn' registered successfully")
@@ -0,0 +1,14 @@
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop, closed afterwards"""
+    def run(coro):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+    return run
@@ -1,14 +1,422 @@
 import os
+import asyncio
+import logging
+import time
+from datetime import datetime
 import motor.motor_asyncio
+from pymongo import ASCENDING, IndexModel, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from metrics import DatabaseTimer
 
+log = logging.getLogger(__name__)
+
+DB_BACKEND = (os.getenv("DB_BACKEND") or "mongo").lower()
 MONGO_URI = os.getenv("MONGO_URI") or "mongodb://localhost:27017"
 DB_NAME = os.getenv("MONGO_DB") or "discordbot"
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE") or 100)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE") or 0)
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS") or 0)
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS") or 10000)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS") or 10000)
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS") or 0)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS") or ""
+MOD_LOG_BATCH_SIZE = int(os.getenv("MOD_LOG_BATCH_SIZE") or 100)
+MOD_LOG_FLUSH_INTERVAL = float(os.getenv("MOD_LOG_FLUSH_INTERVAL") or 1.0)
+MOD_LOG_QUEUE_SIZE = int(os.getenv("MOD_LOG_QUEUE_SIZE") or 10000)
+SQLITE_PATH = os.getenv("SQLITE_PATH") or "recon.db"
+SQLITE_COMMIT_INTERVAL = float(os.getenv("SQLITE_COMMIT_INTERVAL") or 0.05)
+
+if DB_BACKEND not in ("mongo", "sqlite"):
+    raise ValueError(f"Unknown DB_BACKEND {DB_BACKEND!r}, expected 'mongo' or 'sqlite'")
+
+def mongo_client_options():
+    """Pool, timeout and compression settings for the Motor client"""
+    options = {
+        "appname": "recon",
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [DatabaseTimer()],
+    }
+    # 0 leaves pymongo's default: no idle limit, no socket timeout
+    if MONGO_MAX_IDLE_MS:
+        options["maxIdleTimeMS"] = MONGO_MAX_IDLE_MS
+    if MONGO_SOCKET_TIMEOUT_MS:
+        options["socketTimeoutMS"] = MONGO_SOCKET_TIMEOUT_MS
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
 
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-db = client[DB_NAME]
+def get_database():
+    """The active database, opened on first use so the client binds to the running loop"""
+    global client, db
+    database = globals().get("db")
+    if database is None:
+        if DB_BACKEND == "sqlite":
+            from storage import SQLiteDatabase
+            client = None
+            db = database = SQLiteDatabase(SQLITE_PATH, SQLITE_COMMIT_INTERVAL)
+        else:
+            client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI, **mongo_client_options())
+            db = database = client[DB_NAME]
+    return database
+
+def __getattr__(name):
+    # ``db.client`` and ``db.db`` are created on first access rather than at import
+    if name in ("client", "db"):
+        get_database()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_guild_settings_collection():
-    return db.guild_settings
+    return get_database().guild_settings
 
 def get_mod_logs_collection():
-    return db.mod_logs
+    return get_database().mod_logs
+
+def get_mod_summary_collection():
+    return get_database().mod_summary
+
+# ====== INDEXES ======
+# Indexes the bot's queries rely on, keyed by collection name
+INDEXES = {
+    "mod_logs": [
+        # /rapsheet: filter on guild + user, keyset-paginated on (timestamp, _id)
+        IndexModel([("guild_id", ASCENDING), ("user_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="guild_user_timestamp_id"),
+        # Retention sweep: a guild's logs older than a cutoff, oldest first
+        IndexModel([("guild_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)], name="guild_timestamp_id"),
+    ],
+    "mod_summary": [
+        # One summary per member; rebuilds replace a guild's summaries in one delete
+        IndexModel([("guild_id", ASCENDING), ("user_id", ASCENDING)], name="guild_user", unique=True),
+    ],
+}
+
+# Query shapes the bot issues: name -> (collection, filter, sort)
+QUERY_SHAPES = {
+    "settings_lookup": ("guild_settings", {"_id": 0}, None),
+    "summary_lookup": ("mod_summary", {"_id": "0:0"}, None),
+    "rapsheet": ("mod_logs", {"guild_id": 0, "user_id": 0}, [("timestamp", ASCENDING), ("_id", ASCENDING)]),
+    "retention_sweep": ("mod_logs", {"guild_id": 0, "timestamp": {"$lt": datetime(2000, 1, 1)}}, [("timestamp", ASCENDING), ("_id", ASCENDING)]),
+}
+
+INDEX_STAGES = {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK", "COUNT_SCAN", "DISTINCT_SCAN"}
+
+async def ensure_indexes():
+    """Create any missing indexes and return the names that still don't exist afterwards"""
+    missing = []
+    for collection, indexes in INDEXES.items():
+        col = get_database()[collection]
+        await col.create_indexes(indexes)
+        existing = await col.index_information()
+        missing.extend(f"{collection}.{index.document['name']}" for index in indexes if index.document["name"] not in existing)
+    return missing
+
+def plan_stages(plan):
+    """Return every stage name found in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+async def explain_query_shapes():
+    """Run explain() on every known query shape and report whether it uses an index"""
+    report = {}
+    for name, (collection, query, sort) in QUERY_SHAPES.items():
+        cursor = get_database()[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        stages = plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {}))
+        report[name] = {
+            "stages": stages,
+            "uses_index": "COLLSCAN" not in stages and any(stage in INDEX_STAGES for stage in stages),
+            "in_memory_sort": "SORT" in stages,
+        }
+    return report
+
+async def ping_database():
+    """Round-trip time to the database in milliseconds"""
+    database = get_database()
+    start = time.perf_counter()
+    if isinstance(database, motor.motor_asyncio.AsyncIOMotorDatabase):
+        await database.client.admin.command("ping")
+    else:
+        await database.guild_settings.find_one({"_id": 0})
+    return (time.perf_counter() - start) * 1000
+
+async def warm_up_database():
+    """Open the connection pool and create missing indexes; returns (ping ms, missing index names)"""
+    ping_ms = await ping_database()
+    missing = await ensure_indexes()
+    return ping_ms, missing
+
+def database_info():
+    """Backend, target and pool settings, for health reports"""
+    if DB_BACKEND == "sqlite":
+        return {"backend": "sqlite", "target": SQLITE_PATH, "open": globals().get("db") is not None}
+    info = {
+        "backend": "mongo",
+        "target": DB_NAME,
+        "open": globals().get("client") is not None,
+        "pool": f"{MONGO_MIN_POOL_SIZE}-{MONGO_MAX_POOL_SIZE}",
+        "compressors": MONGO_COMPRESSORS or "none",
+    }
+    if info["open"]:
+        info["servers"] = [f"{host}:{port}" for host, port in client.nodes]
+    return info
+
+async def close_database():
+    """Commit and close the local database, or close the Mongo client; the next use reopens it"""
+    global client, db
+    database = globals().get("db")
+    if globals().get("client") is not None:
+        client.close()
+    elif database is not None and hasattr(database, "close"):
+        await database.close()
+    client = db = None
+
+# ====== SUMMARIES ======
+# mod_summary holds one document per (guild, user) with per-action counters and the
+# latest timestamps, kept in step with mod_logs so headers and badges are a point read
+SUMMARY_COUNTERS = {"warn": "warns", "kick": "kicks", "ban": "bans"}
+
+def summary_id(guild_id, user_id):
+    return f"{guild_id}:{user_id}"
+
+def summary_updates(docs):
+    """Fold mod-log documents into one upsert per (guild, user): summary _id -> update"""
+    updates = {}
+    for doc in docs:
+        key = summary_id(doc["guild_id"], doc["user_id"])
+        update = updates.get(key)
+        if update is None:
+            update = updates[key] = {
+                "$setOnInsert": {"guild_id": doc["guild_id"], "user_id": doc["user_id"]},
+                "$inc": {"total": 0},
+                "$max": {},
+            }
+        update["$inc"]["total"] += 1
+        action = doc.get("action")
+        fields = ["last_action_at"]
+        if action in SUMMARY_COUNTERS:
+            counter = SUMMARY_COUNTERS[action]
+            update["$inc"][counter] = update["$inc"].get(counter, 0) + 1
+            fields.append(f"last_{action}_at")
+        timestamp = doc.get("timestamp")
+        if timestamp is not None:
+            for field in fields:
+                latest = update["$max"].get(field)
+                update["$max"][field] = timestamp if latest is None else max(latest, timestamp)
+    for update in updates.values():
+        if not update["$max"]:
+            del update["$max"]  # Mongo rejects an empty operator
+    return updates
+
+async def record_mod_summaries(docs):
+    """Add freshly written mod logs to their users' summaries in one bulk write"""
+    updates = summary_updates(docs)
+    if updates:
+        await get_mod_summary_collection().bulk_write(
+            [UpdateOne({"_id": key}, update, upsert=True) for key, update in updates.items()], ordered=False
+        )
+
+async def get_mod_summary(guild_id, user_id):
+    """A member's moderation counters, or None if they've never been actioned"""
+    return await get_mod_summary_collection().find_one({"_id": summary_id(guild_id, user_id)})
+
+def summary_pipeline(guild_id):
+    """Aggregation that recomputes a guild's summaries from mod_logs, grouped by user"""
+    group = {"_id": "$user_id", "total": {"$sum": 1}, "last_action_at": {"$max": "$timestamp"}}
+    for action, counter in SUMMARY_COUNTERS.items():
+        is_action = {"$eq": ["$action", action]}
+        group[counter] = {"$sum": {"$cond": [is_action, 1, 0]}}
+        # $max skips nulls, so users without this action get no timestamp
+        group[f"last_{action}_at"] = {"$max": {"$cond": [is_action, "$timestamp", None]}}
+    return [{"$match": {"guild_id": guild_id}}, {"$group": group}]
+
+async def rebuild_mod_summaries(guild_id, archived=()):
+    """Recompute a guild's summaries from its logs plus any archived ones; returns how many users have one"""
+    logs = get_mod_logs_collection()
+    summaries = {}
+    if hasattr(logs, "aggregate"):
+        async for row in logs.aggregate(summary_pipeline(guild_id)):
+            user_id = row.pop("_id")
+            summary = {key: value for key, value in row.items() if value is not None}
+            summaries[summary_id(guild_id, user_id)] = {"guild_id": guild_id, "user_id": user_id, **summary}
+        fold = summary_updates(archived)
+    else:
+        # The SQLite backend has no aggregate(); fold the logs in Python instead
+        fold = summary_updates([*archived, *await logs.find({"guild_id": guild_id}).to_list(length=None)])
+    for key, update in fold.items():
+        summary = summaries.setdefault(key, dict(update["$setOnInsert"]))
+        for field, amount in update["$inc"].items():
+            summary[field] = summary.get(field, 0) + amount
+        for field, timestamp in update.get("$max", {}).items():
+            summary[field] = timestamp if summary.get(field) is None else max(summary[field], timestamp)
+    collection = get_mod_summary_collection()
+    # Replace in place, then drop only the users left without logs, so a summary is never missing mid-rebuild
+    if summaries:
+        await collection.bulk_write(
+            [ReplaceOne({"_id": key}, {"_id": key, **summary}, upsert=True) for key, summary in summaries.items()], ordered=False
+        )
+    existing = await collection.find({"guild_id": guild_id}, {"_id": 1}).to_list(length=None)
+    stale = [doc["_id"] for doc in existing if doc["_id"] not in summaries]
+    if stale:
+        await collection.delete_many({"_id": {"$in": stale}})
+    return len(summaries)
+
+# ====== WRITE-BEHIND ======
+class ModLogWriter:
+    """Buffers mod-log documents and writes them in batches with insert_many.
+
+    A batch is written once ``batch_size`` documents are queued or ``flush_interval``
+    seconds after the first one arrived. ``put`` waits while ``max_queued`` documents
+    are already buffered, so a burst slows callers down instead of growing memory.
+    ``on_written`` is awaited with the documents of each batch that were stored.
+    """
+
+    def __init__(self, get_collection, batch_size=100, flush_interval=1.0, max_queued=10000, retries=3, on_written=None):
+        self._get_collection = get_collection
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.retries = retries
+        # Created on first use so they bind to the running loop
+        self._queue = None
+        self._batch_ready = None
+        self._task = None
+        self._flush_requests = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_queued)
+            self._batch_ready = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, doc):
+        """Queue a document for writing, waiting if the buffer is full"""
+        self._start()
+        await self._queue.put(doc)
+        if self._queue.qsize() >= self.batch_size - 1:
+            self._batch_ready.set()
+
+    async def flush(self, timeout=None):
+        """Write every queued document now and wait until they're stored.
+
+        Gives up after ``timeout`` seconds if one is given; returns whether the queue drained.
+        """
+        if self._queue is None or self._task is None or self._task.done():
+            return True
+        self._flush_requests += 1
+        self._batch_ready.set()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._flush_requests -= 1
+
+    async def close(self):
+        """Flush outstanding documents and stop the background writer"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            if not self._flush_requests and self._queue.qsize() + 1 < self.batch_size:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch):
+        start = time.perf_counter()
+        stored = []
+        for attempt in range(self.retries + 1):
+            try:
+                await self._get_collection().insert_many(batch, ordered=False)
+                stored = batch
+                break
+            except BulkWriteError as e:
+                # Unordered inserts still store every document that didn't error
+                errors = {error["index"] for error in e.details.get("writeErrors", [])}
+                stored = [doc for index, doc in enumerate(batch) if index not in errors]
+                self.failed += len(errors)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    log.error("❌ Dropped %d mod logs after %d attempts: %s", len(batch), attempt + 1, e)
+                    self.failed += len(batch)
+                else:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+        self.written += len(stored)
+        if stored and self.on_written is not None:
+            try:
+                await self.on_written(stored)
+            except Exception as e:
+                # The logs are stored; /settings rebuildsummaries repairs the counters
+                log.exception("❌ Failed to update summaries for %d mod logs: %s", len(stored), e)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queued": self.max_queued,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self._total_flush_ms / self.flushes if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+mod_log_writer = ModLogWriter(
+    get_mod_logs_collection, MOD_LOG_BATCH_SIZE, MOD_LOG_FLUSH_INTERVAL, MOD_LOG_QUEUE_SIZE, on_written=record_mod_summaries
+)
+
+async def _main():
+    missing = await ensure_indexes()
+    print("All indexes present" if not missing else f"⚠️  Missing indexes: {', '.join(missing)}")
+    for name, result in (await explain_query_shapes()).items():
+        flag = "✅" if result["uses_index"] and not result["in_memory_sort"] else "⚠️ "
+        print(f"{flag} {name}: {' <- '.join(result['stages'])}")
+
+if __name__ == "__main__":
+    asyncio.run(_main())
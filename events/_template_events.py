@@ -3,7 +3,11 @@ Event Template - Copy this file to create new events
 Rename the file and modify the configuration below
 """
 
+import logging
 import discord
+from discord.ext import commands
+
+log = logging.getLogger(__name__)
 
 # ====== EVENT CONFIGURATION ======
 EVENT_NAME = "template_events"
@@ -25,8 +29,9 @@ class TemplateEvents(discord.Cog):
         if "hello" in message.content.lower():
             await message.add_reaction("👋")
 
-        # Log message (optional)
-        print(f"📝 Message from {message.author}: {message.content[:50]}...")
+        # Log message (optional). Pass arguments instead of an f-string so nothing is formatted
+        # unless DEBUG is enabled; the "event" extra lets logging_config sample and rate limit it
+        log.debug("📝 Message from %s: %.50s", message.author, message.content, extra={"event": "on_message"})
 
     @discord.Cog.listener()
     async def on_message_delete(self, message):
@@ -34,7 +39,7 @@ class TemplateEvents(discord.Cog):
         if message.author.bot:
             return
 
-        print(f"🗑️ Message deleted by {message.author}: {message.content}")
+        log.debug("🗑️ Message deleted by %s: %s", message.author, message.content, extra={"event": "on_message_delete"})
 
     @discord.Cog.listener()
     async def on_message_edit(self, before, after):
@@ -42,15 +47,13 @@ class TemplateEvents(discord.Cog):
         if before.author.bot:
             return
 
-        print(f"✏️ Message edited by {before.author}")
-        print(f"   Before: {before.content}")
-        print(f"   After: {after.content}")
+        log.debug("✏️ Message edited by %s: %r → %r", before.author, before.content, after.content, extra={"event": "on_message_edit"})
 
     # ====== MEMBER EVENTS ======
     @discord.Cog.listener()
     async def on_member_join(self, member):
         """Triggered when a member joins the server"""
-        print(f"👋 {member.name} joined {member.guild.name}")
+        log.info("👋 %s joined %s", member.name, member.guild.name, extra={"event": "on_member_join"})
 
         # Example: Send welcome message
         # channel = discord.utils.get(member.guild.channels, name="welcome")
@@ -60,24 +63,24 @@ class TemplateEvents(discord.Cog):
     @discord.Cog.listener()
     async def on_member_remove(self, member):
         """Triggered when a member leaves the server"""
-        print(f"👋 {member.name} left {member.guild.name}")
+        log.info("👋 %s left %s", member.name, member.guild.name, extra={"event": "on_member_remove"})
 
     @discord.Cog.listener()
     async def on_member_update(self, before, after):
         """Triggered when a member's profile is updated"""
         # Check what changed
         if before.nick != after.nick:
-            print(f"🏷️ {after.name} changed nickname: {before.nick} → {after.nick}")
+            log.debug("🏷️ %s changed nickname: %s → %s", after.name, before.nick, after.nick, extra={"event": "on_member_update"})
 
         if before.roles != after.roles:
             added_roles = set(after.roles) - set(before.roles)
             removed_roles = set(before.roles) - set(after.roles)
 
             for role in added_roles:
-                print(f"➕ {after.name} gained role: {role.name}")
+                log.debug("➕ %s gained role: %s", after.name, role.name, extra={"event": "on_member_update"})
 
             for role in removed_roles:
-                print(f"➖ {after.name} lost role: {role.name}")
+                log.debug("➖ %s lost role: %s", after.name, role.name, extra={"event": "on_member_update"})
 
     # ====== REACTION EVENTS ======
     @discord.Cog.listener()
@@ -86,7 +89,7 @@ class TemplateEvents(discord.Cog):
         if user.bot:
             return
 
-        print(f"👍 {user.name} reacted with {reaction.emoji}")
+        log.debug("👍 %s reacted with %s", user.name, reaction.emoji, extra={"event": "on_reaction_add"})
 
         # Example: Role reactions
         # if reaction.emoji == "🎯" and reaction.message.id == ROLE_MESSAGE_ID:
@@ -100,7 +103,7 @@ class TemplateEvents(discord.Cog):
         if user.bot:
             return
 
-        print(f"👎 {user.name} removed reaction {reaction.emoji}")
+        log.debug("👎 %s removed reaction %s", user.name, reaction.emoji, extra={"event": "on_reaction_remove"})
 
     # ====== VOICE EVENTS ======
     @discord.Cog.listener()
@@ -108,28 +111,28 @@ class TemplateEvents(discord.Cog):
         """Triggered when a member's voice state changes"""
         if before.channel != after.channel:
             if before.channel is None:
-                print(f"🔊 {member.name} joined voice channel: {after.channel.name}")
+                log.debug("🔊 %s joined voice channel: %s", member.name, after.channel.name, extra={"event": "on_voice_state_update"})
             elif after.channel is None:
-                print(f"🔇 {member.name} left voice channel: {before.channel.name}")
+                log.debug("🔇 %s left voice channel: %s", member.name, before.channel.name, extra={"event": "on_voice_state_update"})
             else:
-                print(f"🔄 {member.name} moved from {before.channel.name} to {after.channel.name}")
+                log.debug("🔄 %s moved from %s to %s", member.name, before.channel.name, after.channel.name, extra={"event": "on_voice_state_update"})
 
     # ====== GUILD EVENTS ======
     @discord.Cog.listener()
     async def on_guild_join(self, guild):
         """Triggered when the bot joins a new server"""
-        print(f"🎉 Bot joined new server: {guild.name} ({guild.member_count} members)")
+        log.info("🎉 Bot joined new server: %s (%s members)", guild.name, guild.member_count)
 
     @discord.Cog.listener()
     async def on_guild_remove(self, guild):
         """Triggered when the bot leaves a server"""
-        print(f"😢 Bot left server: {guild.name}")
+        log.info("😢 Bot left server: %s", guild.name)
 
     # ====== ERROR HANDLING ======
     @discord.Cog.listener()
     async def on_application_command_error(self, ctx, error):
         """Triggered when a slash command encounters an error"""
-        print(f"Command error in {ctx.command}: {error}")
+        log.error("Command error in %s: %s", ctx.command, error)
 
         if isinstance(error, commands.CommandOnCooldown):
             await ctx.respond(f"Command is on cooldown. Try again in {error.retry_after:.2f} seconds.", ephemeral=True)
@@ -138,10 +141,10 @@ class TemplateEvents(discord.Cog):
         else:
             await ctx.respond("An error occurred while executing the command.", ephemeral=True)
 
-async def setup(bot):
+def setup(bot):
     """Required setup function for automatic loading"""
-    await bot.add_cog(TemplateEvents(bot))
-    print(f"🔧 Events '{EVENT_NAME}' registered successfully")
+    bot.add_cog(TemplateEvents(bot))
+    log.info("🔧 Events '%s' registered successfully", EVENT_NAME)
 
 # ====== DEVELOPMENT NOTES ======
 """
@@ -177,6 +180,10 @@ Available Discord events:
 - on_application_command_error: Command error
 - on_error: General error
 
+Logging: use log (logging.getLogger(__name__)) rather than print(). Logs for events that
+fire constantly (messages, reactions, voice) go at DEBUG with extra={"event": "<name>"} so
+LOG_EVENT_SAMPLE and LOG_EVENT_RATE can thin them out.
+
 Event listener decorator: @discord.Cog.listener()
 All event methods must be async and match the exact event name.
 """
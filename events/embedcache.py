@@ -0,0 +1,69 @@
+"""
+Event listeners that drop cached /serverinfo and /userinfo embeds when what they show changes
+"""
+import logging
+import discord
+from cache import invalidate_guild_embeds, invalidate_member_embed, invalidate_user_embeds
+
+log = logging.getLogger(__name__)
+
+# ====== EVENT CONFIGURATION ======
+EVENT_NAME = "embedcache"
+EVENT_DESCRIPTION = "Invalidates the rendered embed cache used by /serverinfo and /userinfo."
+
+class EmbedCacheEvents(discord.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @discord.Cog.listener()
+    async def on_guild_update(self, before, after):
+        # Boosts, features and the owner all arrive as guild updates; a new owner changes permissions
+        invalidate_guild_embeds(after.id, members=before.owner_id != after.owner_id)
+
+    @discord.Cog.listener()
+    async def on_guild_remove(self, guild):
+        invalidate_guild_embeds(guild.id, members=True)
+
+    @discord.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        invalidate_guild_embeds(channel.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        invalidate_guild_embeds(channel.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        # Only the per-type channel counts are shown; renames and permission edits don't matter
+        if before.type != after.type:
+            invalidate_guild_embeds(after.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_role_create(self, role):
+        # Nobody has a new role yet, so only the role count changes
+        invalidate_guild_embeds(role.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        invalidate_guild_embeds(role.guild.id, members=True)
+
+    @discord.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        # Colors and permissions show up in every holder's /userinfo
+        invalidate_guild_embeds(after.guild.id, members=True)
+
+    @discord.Cog.listener()
+    async def on_member_update(self, before, after):
+        invalidate_member_embed(after.guild.id, after.id)
+
+    @discord.Cog.listener()
+    async def on_member_remove(self, member):
+        invalidate_member_embed(member.guild.id, member.id)
+
+    @discord.Cog.listener()
+    async def on_user_update(self, before, after):
+        invalidate_user_embeds(after.id)
+
+def setup(bot):
+    bot.add_cog(EmbedCacheEvents(bot))
+    log.info("🔧 Events '%s' registered successfully", EVENT_NAME)
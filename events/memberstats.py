@@ -0,0 +1,52 @@
+"""
+Event listeners that keep member statistics up to date
+"""
+import logging
+import discord
+from member_stats import member_counters, membership_index
+
+log = logging.getLogger(__name__)
+
+# ====== EVENT CONFIGURATION ======
+EVENT_NAME = "memberstats"
+EVENT_DESCRIPTION = "Maintains member counters for /serverinfo and the membership index for /bot status."
+
+class MemberStatsEvents(discord.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @discord.Cog.listener()
+    async def on_ready(self):
+        # Events may have been missed while disconnected, so start from a fresh scan
+        for guild in self.bot.guilds:
+            member_counters.rebuild(guild)
+        membership_index.build(self.bot.guilds)
+
+    @discord.Cog.listener()
+    async def on_guild_join(self, guild):
+        member_counters.rebuild(guild)
+        if membership_index.built:
+            membership_index.add_guild(guild)
+
+    @discord.Cog.listener()
+    async def on_guild_remove(self, guild):
+        member_counters.drop(guild.id)
+        membership_index.remove_guild(guild)
+
+    @discord.Cog.listener()
+    async def on_member_join(self, member):
+        member_counters.member_joined(member)
+        membership_index.member_joined(member)
+
+    @discord.Cog.listener()
+    async def on_member_remove(self, member):
+        member_counters.member_left(member)
+        membership_index.member_left(member)
+
+    @discord.Cog.listener()
+    async def on_presence_update(self, before, after):
+        member_counters.presence_changed(before, after)
+
+def setup(bot):
+    bot.add_cog(MemberStatsEvents(bot))
+    log.info("🔧 Events '%s' registered successfully", EVENT_NAME)
@@ -1,17 +1,20 @@
 """
 Event listeners for kick/ban logging
 """
+import logging
 import discord
-from db import get_mod_logs_collection, get_guild_settings_collection
+from db import mod_log_writer
+from log_dispatcher import send_mod_log
 from datetime import datetime
 
+logger = logging.getLogger(__name__)  # "log" is the mod log document below
+
 class ModLogEvents(discord.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @discord.Cog.listener()
     async def on_member_ban(self, guild, user):
-        col = get_mod_logs_collection()
         log = {
             "guild_id": guild.id,
             "user_id": user.id,
@@ -20,14 +23,10 @@ class ModLogEvents(discord.Cog):
             "moderator_id": None,
             "timestamp": datetime.utcnow()
         }
-        await col.insert_one(log)
-        settings = await get_guild_settings_collection().find_one({"_id": guild.id})
-        if settings and settings.get("log_channel_id"):
-            channel = guild.get_channel(settings["log_channel_id"])
-            if channel:
-                embed = discord.Embed(title="User Banned", color=discord.Color.red(), timestamp=datetime.utcnow())
-                embed.add_field(name="User", value=f"<@{user.id}>")
-                await channel.send(embed=embed)
+        await mod_log_writer.put(log)
+        embed = discord.Embed(title="User Banned", color=discord.Color.red(), timestamp=datetime.utcnow())
+        embed.add_field(name="User", value=f"<@{user.id}>")
+        await send_mod_log(guild, embed)
 
     @discord.Cog.listener()
     async def on_member_remove(self, member):
@@ -37,4 +36,4 @@ class ModLogEvents(discord.Cog):
 
 def setup(bot):
     bot.add_cog(ModLogEvents(bot))
-    print("🔧 Events 'modlog' registered successfully")
+    logger.info("🔧 Events 'modlog' registered successfully")
@@ -1,23 +1,94 @@
 """
 Event listeners for joining member
 """
+import asyncio
+import logging
 import discord
+from cache import TTLCache, MISSING, get_guild_settings
+
+log = logging.getLogger(__name__)
 
 # ====== EVENT CONFIGURATION ======
 EVENT_NAME = "welcome"
 EVENT_DESCRIPTION = "Sends a welcome message whenever a person joins."
+WELCOME_CHANNEL_NAME = "welcome"
+MAX_MENTIONS_PER_MESSAGE = 50
 
 class Welcome(discord.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.channels = TTLCache(maxsize=10000, ttl=3600)  # guild_id -> welcome channel id or None
+        self.pending = {}  # guild_id -> members waiting for the next batched welcome
+        self.flushes = {}  # guild_id -> task that sends the batched welcome when the window closes
+
+    def welcome_channel(self, guild):
+        """Resolve the guild's welcome channel, scanning its channels only on a cache miss"""
+        channel_id = self.channels.get(guild.id, MISSING)
+        if channel_id is MISSING:
+            channel = discord.utils.get(guild.channels, name=WELCOME_CHANNEL_NAME)
+            channel_id = channel.id if channel else None
+            self.channels.set(guild.id, channel_id)
+        return guild.get_channel(channel_id) if channel_id else None
+
+    async def send_welcome(self, guild, members):
+        channel = self.welcome_channel(guild)
+        if not channel:
+            return
+        for i in range(0, len(members), MAX_MENTIONS_PER_MESSAGE):
+            mentions = ", ".join(member.mention for member in members[i:i + MAX_MENTIONS_PER_MESSAGE])
+            await channel.send(f"Welcome {mentions}, Hope you enjoy your stay here.")
+
+    async def flush_welcome(self, guild, window):
+        """Wait out the batch window, then welcome everyone who joined during it"""
+        try:
+            await asyncio.sleep(window)
+        finally:
+            # Always end the window, so a cancelled or failed flush can't swallow later joins
+            members = self.pending.pop(guild.id, [])
+            self.flushes.pop(guild.id, None)
+        try:
+            await self.send_welcome(guild, members)
+        except Exception:
+            log.exception("Failed to send batched welcome for %d members in guild %s", len(members), guild.id)
+
+    def cog_unload(self):
+        for task in self.flushes.values():
+            task.cancel()
 
     # ====== MEMBER EVENTS ======
     @discord.Cog.listener()
     async def on_member_join(self, member):
-        channel = discord.utils.get(member.guild.channels, name="welcome")
-        if channel:
-            await channel.send(f"Welcome {member.mention}, Hope you enjoy your stay here.")
+        guild = member.guild
+        if not self.welcome_channel(guild):
+            return
+        settings = await get_guild_settings(guild.id)
+        window = (settings or {}).get("welcome_batch_seconds") or 0
+        if window <= 0:
+            await self.send_welcome(guild, [member])
+            return
+        # Coalesce joins: the first join of a window schedules the welcome, later ones just queue up
+        pending = self.pending.get(guild.id)
+        if pending is not None:
+            pending.append(member)
+            return
+        self.pending[guild.id] = [member]
+        self.flushes[guild.id] = asyncio.create_task(self.flush_welcome(guild, window))
+
+    # ====== CHANNEL EVENTS ======
+    @discord.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if channel.name == WELCOME_CHANNEL_NAME:
+            self.channels.invalidate(channel.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name:
+            self.channels.invalidate(after.guild.id)
+
+    @discord.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.channels.invalidate(channel.guild.id)
 
 def setup(bot):
     bot.add_cog(Welcome(bot))
-    print("🔧 Events 'welcome' registered successfully") 
+    log.info("🔧 Events 'welcome' registered successfully")
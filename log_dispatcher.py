@@ -0,0 +1,133 @@
+"""
+Outbound queue for moderation log embeds, one worker per log channel
+"""
+import asyncio
+import logging
+import os
+import discord
+from cache import get_guild_settings
+
+log = logging.getLogger(__name__)
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 500)
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL") or 0.5)
+EMBEDS_PER_MESSAGE = 10  # Discord's limit
+IDLE_TIMEOUT = 60  # seconds before an idle channel worker exits
+
+
+STAT_KEYS = ("sent_messages", "sent_embeds", "dropped", "errors")
+
+
+class _ChannelQueue:
+    __slots__ = ("channel", "queue", "task", "stats")
+
+    def __init__(self, channel, max_queued, stats):
+        self.channel = channel
+        self.queue = asyncio.Queue(max_queued)
+        self.task = None
+        self.stats = stats  # shared with LogDispatcher._stats, so it outlives this queue
+
+
+class LogDispatcher:
+    """Packs log embeds into as few messages as possible, sent by one worker per channel.
+
+    Each channel has a single worker, so sends to one channel never compete for its
+    rate-limit bucket, and callers return as soon as the embed is queued.
+    """
+
+    def __init__(self, flush_interval=0.5, max_queued=500):
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self._channels = {}  # channel_id -> _ChannelQueue, dropped when its worker goes idle
+        self._stats = {}  # channel_id -> counters, kept after the worker exits
+        self._closing = False
+
+    def start(self):
+        """Batch embeds again after close(), e.g. when the bot logs back in"""
+        self._closing = False
+
+    def dispatch(self, channel, embed):
+        """Queue an embed for ``channel`` without waiting; returns False if the queue was full"""
+        state = self._channels.get(channel.id)
+        if state is None:
+            stats = self._stats.setdefault(channel.id, dict.fromkeys(STAT_KEYS, 0))
+            state = self._channels[channel.id] = _ChannelQueue(channel, self.max_queued, stats)
+        state.channel = channel
+        if state.queue.full():
+            state.stats["dropped"] += 1
+            return False
+        state.queue.put_nowait(embed)
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._run(state))
+        return True
+
+    async def _run(self, state):
+        while True:
+            try:
+                first = await asyncio.wait_for(state.queue.get(), IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if state.queue.empty():
+                    self._channels.pop(state.channel.id, None)
+                    return
+                continue
+            if not self._closing and state.queue.qsize() < EMBEDS_PER_MESSAGE - 1:
+                # Give the rest of a burst a moment to arrive
+                await asyncio.sleep(self.flush_interval)
+            embeds = [first]
+            while len(embeds) < EMBEDS_PER_MESSAGE and not state.queue.empty():
+                embeds.append(state.queue.get_nowait())
+            try:
+                await self._send(state, embeds)
+            finally:
+                for _ in embeds:
+                    state.queue.task_done()
+
+    async def _send(self, state, embeds):
+        for attempt in range(2):
+            try:
+                await state.channel.send(embeds=embeds)
+                state.stats["sent_messages"] += 1
+                state.stats["sent_embeds"] += len(embeds)
+                return
+            except discord.HTTPException as e:
+                # The HTTP client already waits out rate limits; if it still gave up, back off once more
+                if e.status == 429 and attempt == 0:
+                    await asyncio.sleep(getattr(e, "retry_after", None) or 5)
+                    continue
+                state.stats["errors"] += 1
+                log.error("❌ Failed to send %d log embeds to %s: %s", len(embeds), state.channel.id, e)
+                return
+            except Exception as e:
+                state.stats["errors"] += 1
+                log.error("❌ Failed to send %d log embeds to %s: %s", len(embeds), state.channel.id, e)
+                return
+
+    async def close(self):
+        """Send everything still queued, then stop the workers"""
+        self._closing = True
+        for state in list(self._channels.values()):
+            if state.task is not None and not state.task.done():
+                await state.queue.join()
+                state.task.cancel()
+                # Wait for the cancellation, so no worker is left pending when the loop closes
+                await asyncio.gather(state.task, return_exceptions=True)
+
+    def stats(self):
+        channels = {
+            channel_id: {"queued": state.queue.qsize() if (state := self._channels.get(channel_id)) else 0, **counters}
+            for channel_id, counters in self._stats.items()
+        }
+        totals = {key: sum(channel[key] for channel in channels.values()) for key in ("queued", *STAT_KEYS)}
+        return {"channels": channels, **totals}
+
+
+log_dispatcher = LogDispatcher(LOG_FLUSH_INTERVAL, LOG_QUEUE_SIZE)
+
+
+async def send_mod_log(guild, embed):
+    """Queue an embed for the guild's configured log channel, if it has one"""
+    settings = await get_guild_settings(guild.id)
+    if settings and settings.get("log_channel_id"):
+        channel = guild.get_channel(settings["log_channel_id"])
+        if channel:
+            log_dispatcher.dispatch(channel, embed)
@@ -0,0 +1,167 @@
+"""
+Structured logging: records are queued on the calling thread and written by a background
+listener thread, so a slow stdout never blocks the event loop.
+
+Modules log through ``logging.getLogger(__name__)``. High-frequency event logs pass
+``extra={"event": "<name>"}`` and are sampled and rate limited per event name before they
+are queued.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVEL = (os.getenv("LOG_LEVEL") or "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS") or "discord=WARNING"  # e.g. "discord=WARNING,events=DEBUG"
+LOG_FORMAT = (os.getenv("LOG_FORMAT") or "text").lower()  # "text" or "json"
+LOG_EVENT_SAMPLE = int(os.getenv("LOG_EVENT_SAMPLE") or 1)  # keep 1 in N event records
+LOG_EVENT_RATE = float(os.getenv("LOG_EVENT_RATE") or 20)  # event records per second per event, 0 for no limit
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+def parse_levels(spec):
+    """Parse ``"discord=WARNING,events.welcome=DEBUG"`` into ``{"discord": 30, "events.welcome": 10}``"""
+    levels = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, level = part.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not name.strip() or not isinstance(value, int):
+            raise ValueError(f"Invalid log level setting {part.strip()!r}")
+        levels[name.strip()] = value
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are included as top-level keys"""
+
+    converter = time.gmtime
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} ({suppressed} similar suppressed)" if suppressed else text
+
+
+class EventThrottle(logging.Filter):
+    """Samples and rate limits records logged with ``extra={"event": ...}``; other records pass.
+
+    Keeps one in ``sample`` records per event, then at most ``rate`` per second per event
+    (a token bucket with a one-second burst). Dropped records are counted and the next one
+    that passes carries the count as ``record.suppressed``.
+    """
+
+    def __init__(self, sample=1, rate=0.0, clock=time.monotonic):
+        super().__init__()
+        self.sample = max(1, sample)
+        self.rate = rate
+        self.clock = clock
+        self._events = {}  # event -> [seen, tokens, last refill, suppressed since last kept]
+        self._lock = threading.Lock()  # records can come from the database driver's threads
+
+    def filter(self, record):
+        event = getattr(record, "event", None)
+        if event is None:
+            return True
+        now = self.clock()
+        with self._lock:
+            state = self._events.get(event)
+            if state is None:
+                state = self._events[event] = [0, self.rate, now, 0]
+            state[0] += 1
+            if (state[0] - 1) % self.sample:
+                state[3] += 1
+                return False
+            if self.rate:
+                state[1] = min(self.rate, state[1] + (now - state[2]) * self.rate)
+                state[2] = now
+                if state[1] < 1:
+                    state[3] += 1
+                    return False
+                state[1] -= 1
+            record.suppressed, state[3] = state[3], 0
+        return True
+
+    def stats(self):
+        """Records seen per event and how many are waiting to be reported as suppressed"""
+        with self._lock:
+            return {event: {"seen": state[0], "suppressed": state[3]} for event, state in self._events.items()}
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Render arguments and tracebacks now, keeping the traceback apart from the message
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+event_throttle = EventThrottle(LOG_EVENT_SAMPLE, LOG_EVENT_RATE)
+
+
+def setup_logging(level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT, stream=None, throttle=event_throttle):
+    """Route every logger through a queue to a listener thread that writes to ``stream`` (stdout)"""
+    global _listener
+    stop_logging()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    # Filter before queueing so dropped event records cost no formatting or I/O
+    queue_handler.addFilter(throttle)
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out everything still queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,178 @@
+"""
+Member statistics kept up to date from gateway events instead of scanning guild.members
+"""
+import os
+import heapq
+import discord
+
+MEMBER_COUNTS_CHECK = os.getenv("MEMBER_COUNTS_CHECK", "").lower() in ("1", "true", "yes")
+
+
+class GuildMemberCounts:
+    __slots__ = ("humans", "bots", "online")
+
+    def __init__(self, humans=0, bots=0, online=0):
+        self.humans = humans
+        self.bots = bots
+        self.online = online
+
+    def as_dict(self):
+        return {"humans": self.humans, "bots": self.bots, "online": self.online}
+
+
+def _is_online(member):
+    return member.status != discord.Status.offline
+
+
+def scan_members(guild):
+    """Count humans, bots and online members with a full pass over the member cache"""
+    counts = GuildMemberCounts()
+    for member in guild.members:
+        if member.bot:
+            counts.bots += 1
+        else:
+            counts.humans += 1
+        if _is_online(member):
+            counts.online += 1
+    return counts
+
+
+class MemberCounters:
+    """Per-guild human/bot/online counts, rebuilt once per guild and then updated from events"""
+
+    def __init__(self):
+        self._guilds = {}  # guild_id -> GuildMemberCounts
+
+    def rebuild(self, guild):
+        counts = scan_members(guild)
+        self._guilds[guild.id] = counts
+        return counts
+
+    def get(self, guild):
+        counts = self._guilds.get(guild.id)
+        if counts is None:
+            counts = self.rebuild(guild)
+        return counts
+
+    def drop(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    def member_joined(self, member):
+        counts = self._guilds.get(member.guild.id)
+        if counts is None:
+            return  # Not tracked yet; the first get() will scan
+        if member.bot:
+            counts.bots += 1
+        else:
+            counts.humans += 1
+        if _is_online(member):
+            counts.online += 1
+
+    def member_left(self, member):
+        counts = self._guilds.get(member.guild.id)
+        if counts is None:
+            return
+        if member.bot:
+            counts.bots = max(0, counts.bots - 1)
+        else:
+            counts.humans = max(0, counts.humans - 1)
+        if _is_online(member):
+            counts.online = max(0, counts.online - 1)
+
+    def presence_changed(self, before, after):
+        counts = self._guilds.get(after.guild.id)
+        if counts is None:
+            return
+        was_online, is_online = _is_online(before), _is_online(after)
+        if is_online and not was_online:
+            counts.online += 1
+        elif was_online and not is_online:
+            counts.online = max(0, counts.online - 1)
+
+    def verify(self, guild):
+        """Compare the counters with a full scan and resync them.
+
+        Returns ``{field: (counted, actual)}`` for every field that had drifted.
+        """
+        counted = self.get(guild).as_dict()
+        actual = self.rebuild(guild).as_dict()
+        return {field: (counted[field], actual[field]) for field in actual if counted[field] != actual[field]}
+
+
+class MembershipIndex:
+    """Reference-counted set of users the bot shares a guild with.
+
+    Each user id maps to the number of guilds it is a member of, so unique users,
+    total memberships and per-guild sizes are all available without a scan.
+    """
+
+    def __init__(self):
+        self._refs = {}  # user_id -> number of guilds containing them
+        self._sizes = {}  # guild_id -> member count
+        self.memberships = 0
+        self.built = False
+
+    @property
+    def unique_users(self):
+        return len(self._refs)
+
+    def guild_size(self, guild_id):
+        return self._sizes.get(guild_id, 0)
+
+    def largest_guilds(self, n=5):
+        return heapq.nlargest(n, self._sizes.items(), key=lambda item: item[1])
+
+    def build(self, guilds):
+        self._refs.clear()
+        self._sizes.clear()
+        self.memberships = 0
+        for guild in guilds:
+            self.add_guild(guild)
+        self.built = True
+
+    def ensure_built(self, guilds):
+        if not self.built:
+            self.build(guilds)
+
+    def _add(self, user_id):
+        self._refs[user_id] = self._refs.get(user_id, 0) + 1
+        self.memberships += 1
+
+    def _remove(self, user_id):
+        refs = self._refs.get(user_id)
+        if refs is None:
+            return
+        if refs <= 1:
+            del self._refs[user_id]
+        else:
+            self._refs[user_id] = refs - 1
+        self.memberships -= 1
+
+    def add_guild(self, guild):
+        if guild.id in self._sizes:
+            self.remove_guild(guild)
+        for member in guild.members:
+            self._add(member.id)
+        self._sizes[guild.id] = len(guild.members)
+
+    def remove_guild(self, guild):
+        if self._sizes.pop(guild.id, None) is None:
+            return
+        for member in guild.members:
+            self._remove(member.id)
+
+    def member_joined(self, member):
+        if not self.built:
+            return
+        self._add(member.id)
+        self._sizes[member.guild.id] = self._sizes.get(member.guild.id, 0) + 1
+
+    def member_left(self, member):
+        if not self.built or member.guild.id not in self._sizes:
+            return
+        self._remove(member.id)
+        self._sizes[member.guild.id] = max(0, self._sizes[member.guild.id] - 1)
+
+
+member_counters = MemberCounters()
+membership_index = MembershipIndex()
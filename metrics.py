@@ -0,0 +1,242 @@
+"""
+Latency and error metrics for slash commands, event listeners and database calls
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from pymongo import monitoring
+
+# Log-spaced bucket upper bounds from 10µs to ~61s, 25% apart
+BUCKETS = [0.00001 * 1.25 ** i for i in range(71)]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are interpolated within a bucket"""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket catches everything slower
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+
+class Series:
+    __slots__ = ("histogram", "errors")
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.errors = 0
+
+
+class Metrics:
+    """Registry of latency series keyed by (kind, name) and plain counters keyed by (name, label)"""
+
+    def __init__(self):
+        self._series = {}
+        self._counters = {}
+        # Database timings arrive from the driver's worker threads
+        self._lock = threading.Lock()
+
+    def observe(self, kind, name, seconds, error=False):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = Series()
+            series.histogram.observe(seconds)
+            if error:
+                series.errors += 1
+
+    def increment(self, name, label, amount=1):
+        with self._lock:
+            self._counters[(name, label)] = self._counters.get((name, label), 0) + amount
+
+    def counter(self, name, label):
+        return self._counters.get((name, label), 0)
+
+    def summary(self, kind=None):
+        """Return one row per series: kind, name, count, errors and p50/p95/p99 in milliseconds"""
+        with self._lock:
+            rows = [
+                {
+                    "kind": series_kind,
+                    "name": name,
+                    "count": series.histogram.count,
+                    "errors": series.errors,
+                    "p50_ms": series.histogram.percentile(0.50) * 1000,
+                    "p95_ms": series.histogram.percentile(0.95) * 1000,
+                    "p99_ms": series.histogram.percentile(0.99) * 1000,
+                }
+                for (series_kind, name), series in self._series.items()
+                if kind is None or series_kind == kind
+            ]
+        return sorted(rows, key=lambda row: row["p95_ms"], reverse=True)
+
+    def prometheus_text(self):
+        """Render every series and counter in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for kind in sorted({kind for kind, _ in self._series}):
+                metric = f"recon_{kind}_latency_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for (series_kind, name), series in sorted(self._series.items()):
+                    if series_kind != kind:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(BUCKETS, series.histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f'{metric}_bucket{{name="{name}",le="{bound:.6g}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{name="{name}",le="+Inf"}} {series.histogram.count}')
+                    lines.append(f'{metric}_sum{{name="{name}"}} {series.histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{name="{name}"}} {series.histogram.count}')
+                lines.append(f"# TYPE recon_{kind}_errors_total counter")
+                for (series_kind, name), series in sorted(self._series.items()):
+                    if series_kind == kind:
+                        lines.append(f'recon_{kind}_errors_total{{name="{name}"}} {series.errors}')
+            for counter in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE recon_{counter}_total counter")
+                for (name, label), value in sorted(self._counters.items()):
+                    if name == counter:
+                        lines.append(f'recon_{counter}_total{{name="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Copy every series and counter into plain lists, e.g. to send to another process"""
+        with self._lock:
+            return {
+                "series": [
+                    [kind, name, list(series.histogram.counts), series.histogram.sum, series.errors]
+                    for (kind, name), series in self._series.items()
+                ],
+                "counters": [[name, label, value] for (name, label), value in self._counters.items()],
+            }
+
+    def merge(self, exported):
+        """Add another registry's export() into this one; histograms merge bucket by bucket"""
+        with self._lock:
+            for kind, name, counts, total, errors in exported["series"]:
+                series = self._series.get((kind, name))
+                if series is None:
+                    series = self._series[(kind, name)] = Series()
+                histogram = series.histogram
+                histogram.counts = [mine + theirs for mine, theirs in zip(histogram.counts, counts)]
+                histogram.count += sum(counts)
+                histogram.sum += total
+                series.errors += errors
+            for name, label, value in exported["counters"]:
+                self._counters[(name, label)] = self._counters.get((name, label), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._counters.clear()
+
+
+metrics = Metrics()
+
+
+# ====== INSTRUMENTATION ======
+def timed(kind, name, func):
+    """Wrap a coroutine function so each call is recorded under (kind, name)"""
+    @functools.wraps(func)
+    async def wrapped(*args, **kwargs):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.observe(kind, name, time.perf_counter() - start, error)
+    wrapped.__instrumented__ = True
+    return wrapped
+
+
+def _walk_commands(commands):
+    # Cog.walk_commands() only descends into groups, so top-level commands are collected here too
+    for command in commands:
+        yield command
+        yield from _walk_commands(getattr(command, "subcommands", []))
+
+
+def instrument_cog(bot, cog):
+    """Time every slash command and event listener of an already added cog"""
+    for command in _walk_commands(cog.get_commands()):
+        callback = getattr(command, "callback", None)
+        if callback is None or getattr(callback, "__instrumented__", False):
+            continue
+        command.callback = timed("command", command.qualified_name, callback)
+
+    # Swap each registered listener for a timed one; the cog attribute is replaced too
+    # so remove_cog() still finds and unregisters it
+    for event_name, method_name in cog.__cog_listeners__:
+        method = getattr(cog, method_name)
+        if getattr(method, "__instrumented__", False):
+            continue
+        wrapped = timed("event", f"{cog.qualified_name}.{event_name}", method)
+        bot.remove_listener(method, event_name)
+        setattr(cog, method_name, wrapped)
+        bot.add_listener(wrapped, event_name)
+
+
+class DatabaseTimer(monitoring.CommandListener):
+    """Records the duration of every MongoDB command the driver sends"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metrics.observe("db", event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        metrics.observe("db", event.command_name, event.duration_micros / 1e6, error=True)
+
+
+# ====== PROMETHEUS ENDPOINT ======
+async def _local_text():
+    return metrics.prometheus_text()
+
+
+async def start_metrics_server(port, host="127.0.0.1", render=_local_text):
+    """Serve the Prometheus text format on a local port.
+
+    ``render`` is awaited for each scrape; by default it renders this process's metrics.
+    """
+    async def handle_scrape(reader, writer):
+        try:
+            # Read and ignore the request; every path serves the metrics
+            while (await reader.readline()).strip():
+                pass
+            body = (await render()).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: close\r\n\r\n" + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_scrape, host, port)
@@ -1,136 +1,488 @@
 import discord
 import os
+import sys
+import time
+import json
+import asyncio
+import logging
+import hashlib
+import argparse
+import builtins
+import inspect
+import threading
 import importlib
-import traceback
+import importlib.util
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-class DiscordBot(discord.Bot):
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE") or ".command_hash"
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+METRICS_PORT = int(os.getenv("METRICS_PORT") or 0)
+
+# db reads its configuration from the environment at import time
+from cache_profiles import CACHE_PROFILE, cache_options
+from cluster import cluster_client
+from db import close_database, mod_log_writer, warm_up_database
+from log_dispatcher import log_dispatcher
+from logging_config import setup_logging
+from member_stats import membership_index
+from metrics import instrument_cog, metrics, start_metrics_server
+from ratelimit import rate_limiter, RATE_LIMIT_SWEEP_INTERVAL
+from retention import log_archiver, RETENTION_INTERVAL
+from sharding import shard_options, shard_stats
+
+SHARDED, SHARD_OPTIONS = shard_options()
+
+# Named explicitly: this module also runs as __main__
+log = logging.getLogger("recon")
+
+def _timed_import(module_name):
+    """Import a module, returning (module, error, milliseconds taken)"""
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+    except Exception as e:
+        return None, e, (time.perf_counter() - start) * 1000
+    return module, None, (time.perf_counter() - start) * 1000
+
+def file_fingerprint(path, previous=None):
+    """Return (mtime_ns, size, sha256) for a file, skipping the hash if mtime and size match ``previous``"""
+    stat = path.stat()
+    if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+        return previous
+    return stat.st_mtime_ns, stat.st_size, hashlib.sha256(path.read_bytes()).hexdigest()
+
+def command_signature(commands, *scope):
+    """Hash application command payloads (names, options, permissions, guild ids) plus any extra scope values"""
+    payloads = [
+        {"command": command.to_dict(), "guild_ids": sorted(command.guild_ids or [])}
+        for command in commands
+    ]
+    payloads.sort(key=lambda payload: (payload["command"]["name"], payload["guild_ids"]))
+    return hashlib.sha256(json.dumps([payloads, scope], sort_keys=True, default=str).encode()).hexdigest()
+
+def _cog_commands(cogs):
+    return [command for cog in cogs for command in cog.get_commands()]
+
+def format_startup_profile(entries, total_seconds=None):
+    """Render the loader's per-module timings as a plain-text table"""
+    width = max([len("Module")] + [len(entry["module"]) for entry in entries])
+    lines = [f"{'Module':<{width}}  {'Import':>9}  {'Setup':>9}  Status"]
+    lines.append("-" * len(lines[0]))
+    for entry in sorted(entries, key=lambda e: e["import_ms"] + e["setup_ms"], reverse=True):
+        lines.append(f"{entry['module']:<{width}}  {entry['import_ms']:>7.1f}ms  {entry['setup_ms']:>7.1f}ms  {entry['status']}")
+    if total_seconds is not None:
+        lines.append(f"Startup took {total_seconds * 1000:.0f}ms for {len(entries)} modules")
+    return "\n".join(lines)
+
+class ImportProfiler:
+    """Times every module imported while installed, printed like ``python -X importtime``"""
+
+    def __init__(self):
+        self.records = []  # (self_us, cumulative_us, depth, module name) in completion order
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._original_import = None
+        self._original_import_module = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            self._original_import = None
+
+    def _timed(self, name, load, *args, **kwargs):
+        if name in sys.modules:
+            return load(*args, **kwargs)
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)  # time spent in nested imports
+        start = time.perf_counter()
+        try:
+            return load(*args, **kwargs)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1e6
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self.records.append((elapsed - nested, elapsed, len(stack), name))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            resolved = importlib.util.resolve_name("." * level + name, package) if package else name
+        else:
+            resolved = name
+        return self._timed(resolved, self._original_import, name, globals, locals, fromlist, level)
+
+    def _import_module(self, name, package=None):
+        resolved = importlib.util.resolve_name(name, package) if name.startswith(".") else name
+        return self._timed(resolved, self._original_import_module, name, package)
+
+    def dump(self, file=None):
+        file = file or sys.stderr
+        print("import time: self [us] | cumulative | imported package", file=file)
+        for self_us, cumulative_us, depth, name in self.records:
+            print(f"import time: {self_us:>9.0f} | {cumulative_us:>10.0f} | {'  ' * depth}{name}", file=file)
+
+def _discover_modules(folder_path):
+    """Map module names to files in a folder, skipping files starting with underscore (templates)"""
+    return {
+        f"{folder_path.name}.{file_path.stem}": file_path
+        for file_path in sorted(folder_path.glob("*.py"))
+        if not file_path.name.startswith("_")
+    }
+
+# AutoShardedBot runs several gateway connections in this process; it is not a discord.Bot subclass
+class DiscordBot(discord.AutoShardedBot if SHARDED else discord.Bot):
     def __init__(self):
         super().__init__(
-            intents=discord.Intents.all(),
-            debug_guilds=[int(os.getenv("DEVGUILD"))] if os.getenv("DEVGUILD") else None  # Instant slash command registration for your test server
+            **cache_options(CACHE_PROFILE),  # intents, member cache, chunking and message cache size
+            **SHARD_OPTIONS,
+            debug_guilds=[int(os.getenv("DEVGUILD"))] if os.getenv("DEVGUILD") else None,  # Instant slash command registration for your test server
+            auto_sync_commands=False  # setup_hook syncs, and only when the command tree changed
         )
+        self.cache_profile = CACHE_PROFILE
+        self.setup_started = False
         self.loaded_commands = set()
         self.loaded_events = set()
+        self.startup_profile = []  # one entry per module: import/setup time and status
+        self.startup_seconds = None
+        self.import_profiler = None
+        self.module_fingerprints = {}  # module name -> file fingerprint when last (re)loaded
+        self.module_cogs = {}  # module name -> names of the cogs its setup() added
+        self.watch_interval = None  # seconds between checks for changed files, None to disable
+        self._watch_task = None
+        self._retention_task = None
+        self._ratelimit_task = None
+        self.metrics_server = None
 
     async def setup_hook(self):
+        # on_ready fires again after every reconnect; loading twice would duplicate cogs
+        if self.setup_started:
+            return
+        self.setup_started = True
+        start = time.perf_counter()
+        self.startup_profile = []
+        await self.warm_up_database()
         await self.load_commands()
         await self.load_events()
+        await self.sync_command_tree()
+        self.startup_seconds = time.perf_counter() - start
+        log.info("Startup profile:\n%s", self.startup_report())
+        if self.import_profiler is not None:
+            self.import_profiler.uninstall()
+            self.import_profiler.dump()
+        log_dispatcher.start()
+        if self.watch_interval and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_extensions())
+        # The archiver covers every guild, so only one cluster may run it (see cluster.py)
+        if self._retention_task is None and (not cluster_client.enabled or cluster_client.cluster_id == 0):
+            self._retention_task = asyncio.create_task(log_archiver.run_forever(RETENTION_INTERVAL))
+        if self._ratelimit_task is None:
+            self._ratelimit_task = asyncio.create_task(rate_limiter.run_forever(RATE_LIMIT_SWEEP_INTERVAL))
+        if cluster_client.enabled:
+            self.register_cluster_handlers()
+            cluster_client.start()
+        if METRICS_PORT and self.metrics_server is None:
+            try:
+                self.metrics_server = await start_metrics_server(METRICS_PORT)
+                log.info("📈 Serving metrics on http://127.0.0.1:%d/metrics", METRICS_PORT)
+            except OSError as e:
+                log.error("❌ Failed to start metrics server: %s", e)
+
+    def register_cluster_handlers(self):
+        """Answer the IPC commands other clusters broadcast (see cluster.py)"""
+        async def status(args):
+            membership_index.ensure_built(self.guilds)
+            return {
+                "guilds": len(self.guilds),
+                "memberships": membership_index.memberships,
+                "shards": shard_stats.snapshot(self),
+            }
+
+        async def reload(args):
+            return await self.reload_changed()
+
+        async def cluster_metrics(args):
+            return metrics.export()
+
+        cluster_client.register("status", status)
+        cluster_client.register("reload", reload)
+        cluster_client.register("metrics", cluster_metrics)
+
+    def command_tree_hash(self):
+        """Stable hash of every registered slash command and the scope it is synced to"""
+        return command_signature(self.pending_application_commands, self.application_id, self.debug_guilds)
+
+    async def sync_command_tree(self):
+        """Sync slash commands unless the tree matches the one recorded at the last successful sync"""
+        if cluster_client.enabled and cluster_client.cluster_id != 0:
+            # Commands are global; cluster 0 syncs them for everyone
+            await self.bind_command_ids()
+            return False
+        tree_hash = self.command_tree_hash()
+        hash_file = Path(COMMAND_HASH_FILE)
+        if not FORCE_COMMAND_SYNC and hash_file.exists() and hash_file.read_text().strip() == tree_hash:
+            log.info("Slash commands unchanged since last sync, skipping")
+            await self.bind_command_ids()
+            return False
         await self.sync_commands()
+        try:
+            hash_file.write_text(tree_hash)
+        except OSError as e:
+            log.warning("⚠️  Could not save command tree hash: %s", e)
+        return True
+
+    async def bind_command_ids(self):
+        """Look up the ids Discord gave the already-registered commands, without syncing them.
+
+        py-cord only records command ids while syncing, and interactions are routed by id,
+        so a skipped sync would otherwise leave every global command unknown.
+        """
+        commands = self.pending_application_commands
+        scopes = {None} | {guild_id for command in commands for guild_id in command.guild_ids or ()}
+        for guild_id in scopes:
+            if guild_id is None:
+                registered = await self.http.get_global_commands(self.application_id)
+            else:
+                registered = await self.http.get_guild_commands(self.application_id, guild_id)
+            for data in registered:
+                command = discord.utils.find(
+                    lambda command: command.name == data["name"] and command.type == data.get("type", 1)
+                    and (command.guild_ids is None if guild_id is None else guild_id in (command.guild_ids or ())),
+                    commands
+                )
+                if command is not None:
+                    command.id = data["id"]
+                    self._application_commands[command.id] = command
+
+    def startup_report(self):
+        return format_startup_profile(self.startup_profile, self.startup_seconds)
+
+    async def close(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        if self._retention_task is not None:
+            self._retention_task.cancel()
+        if self._ratelimit_task is not None:
+            self._ratelimit_task.cancel()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        # Send queued log embeds and write out buffered mod logs before the loop goes away
+        await log_dispatcher.close()
+        await mod_log_writer.close()
+        await close_database()
+        await cluster_client.close()
+        await super().close()
+
+    async def warm_up_database(self):
+        """Connect to the database before the first command and create the indexes its queries rely on"""
+        try:
+            ping_ms, missing = await warm_up_database()
+            log.info("Database reachable in %.1fms", ping_ms)
+            if missing:
+                log.warning("⚠️  Missing database indexes: %s", ", ".join(missing))
+            else:
+                log.info("Database indexes verified")
+        except Exception as e:
+            log.error("❌ Database warmup failed: %s", e)
 
     async def load_commands(self):
         """Automatically load all commands from the commands folder"""
-        commands_path = Path("commands")
-        if not commands_path.exists():
-            print("Commands folder not found!")
-            return
+        await self._load_folder("commands", self.loaded_commands)
 
-        print(f"Looking for commands in: {commands_path.absolute()}")
-        command_files = list(commands_path.glob("*.py"))
-        print(f"Found {len(command_files)} Python files")
+    async def load_events(self):
+        """Automatically load all events from the events folder"""
+        await self._load_folder("events", self.loaded_events)
 
-        for file_path in command_files:
-            print(f"Processing file: {file_path.name}")
-            if file_path.name.startswith("_"):
-                print(f"Skipping template file: {file_path.name}")
-                continue  # Skip files starting with underscore
+    async def _load_folder(self, folder, loaded):
+        """Import every module in ``folder`` concurrently, then run their setup() on the loop"""
+        folder_path = Path(folder)
+        if not folder_path.exists():
+            log.warning("%s folder not found!", folder.capitalize())
+            return
+
+        modules = _discover_modules(folder_path)
+        module_names = list(modules)
+        for module_name, file_path in modules.items():
+            self.module_fingerprints[module_name] = file_fingerprint(file_path)
+        imports = await asyncio.gather(*(asyncio.to_thread(_timed_import, name) for name in module_names))
 
-            module_name = f"commands.{file_path.stem}"
-            print(f"Attempting to import: {module_name}")
+        # setup() registers cogs and listeners, which must happen on the event loop
+        for module_name, (module, error, import_ms) in zip(module_names, imports):
+            entry = {"module": module_name, "import_ms": import_ms, "setup_ms": 0.0, "status": "ok"}
+            self.startup_profile.append(entry)
+            if error is not None:
+                entry["status"] = "import failed"
+                log.error("❌ Failed to load %s: %s", module_name, error, exc_info=error)
+                continue
+            if not hasattr(module, "setup"):
+                entry["status"] = "no setup()"
+                log.warning("⚠️  %s missing setup() function", module_name)
+                continue
+            start = time.perf_counter()
             try:
-                module = importlib.import_module(module_name)
-                print(f"Successfully imported: {module_name}")
-                if hasattr(module, 'setup'):
-                    print(f"Found setup function in {module_name}")
-                    module.setup(self)
-                    self.loaded_commands.add(module_name)
-                    print(f"Loaded command: {file_path.stem}")
-                else:
-                    print(f"⚠️  Command file {file_path.stem} missing setup() function")
+                await self._setup_module(module_name, module)
+                loaded.add(module_name)
             except Exception as e:
-                print(f"❌ Failed to load command {file_path.stem}: {e}")
-                traceback.print_exc()
+                entry["status"] = "setup failed"
+                log.exception("❌ Failed to set up %s: %s", module_name, e)
+            entry["setup_ms"] = (time.perf_counter() - start) * 1000
 
-    async def load_events(self):
-        """Automatically load all events from the events folder"""
-        events_path = Path("events")
-        if not events_path.exists():
-            print("Events folder not found!")
-            return
+    async def _setup_module(self, module_name, module):
+        """Run a module's setup() and remember which cogs it added"""
+        before = set(self.cogs)
+        try:
+            result = module.setup(self)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            # Don't leave a half-registered module behind
+            for name in set(self.cogs) - before:
+                self.remove_cog(name)
+            raise
+        self.module_cogs[module_name] = [name for name in self.cogs if name not in before]
+        for name in self.module_cogs[module_name]:
+            instrument_cog(self, self.cogs[name])
 
-        print(f"Looking for events in: {events_path.absolute()}")
-        event_files = list(events_path.glob("*.py"))
-        print(f"Found {len(event_files)} Python files")
+    def _unload_module(self, module_name, loaded):
+        for name in self.module_cogs.pop(module_name, []):
+            self.remove_cog(name)
+        loaded.discard(module_name)
+        self.module_fingerprints.pop(module_name, None)
+        sys.modules.pop(module_name, None)
 
-        for file_path in event_files:
-            print(f"Processing file: {file_path.name}")
-            if file_path.name.startswith("_"):
-                print(f"Skipping template file: {file_path.name}")
-                continue  # Skip files starting with underscore
+    async def _reload_module(self, module_name, loaded):
+        """Swap a module's cogs for freshly imported ones; returns True if its commands changed"""
+        old_cogs = {name: self.cogs[name] for name in self.module_cogs.get(module_name, []) if name in self.cogs}
+        old_signature = command_signature(_cog_commands(old_cogs.values()))
+        if module_name in sys.modules:
+            module = importlib.reload(sys.modules[module_name])
+        else:
+            module = importlib.import_module(module_name)
+        if not hasattr(module, "setup"):
+            raise AttributeError(f"{module_name} missing setup() function")
+        # The new code imported cleanly, so swap the cogs; rolled back if setup() fails
+        for name in old_cogs:
+            self.remove_cog(name)
+        try:
+            await self._setup_module(module_name, module)
+        except Exception:
+            for cog in old_cogs.values():
+                self.add_cog(cog)
+            self.module_cogs[module_name] = list(old_cogs)
+            raise
+        loaded.add(module_name)
+        new_signature = command_signature(_cog_commands(self.cogs[name] for name in self.module_cogs[module_name]))
+        return new_signature != old_signature
 
-            module_name = f"events.{file_path.stem}"
-            print(f"Attempting to import: {module_name}")
+    async def _reload_folder(self, folder, loaded):
+        """Reload the modules in ``folder`` whose files changed since they were last loaded"""
+        report = {"reloaded": [], "unloaded": [], "failed": [], "commands_changed": False}
+        importlib.invalidate_caches()  # so newly created files can be imported
+        modules = _discover_modules(Path(folder))
+        for module_name in [name for name in self.module_fingerprints if name.startswith(f"{folder}.") and name not in modules]:
+            report["commands_changed"] |= any(self.cogs[name].get_commands() for name in self.module_cogs.get(module_name, []) if name in self.cogs)
+            self._unload_module(module_name, loaded)
+            report["unloaded"].append(module_name)
+        for module_name, file_path in modules.items():
+            previous = self.module_fingerprints.get(module_name)
+            fingerprint = file_fingerprint(file_path, previous)
+            self.module_fingerprints[module_name] = fingerprint
+            if previous is not None and fingerprint[2] == previous[2]:
+                continue
             try:
-                module = importlib.import_module(module_name)
-                print(f"Successfully imported: {module_name}")
-                if hasattr(module, 'setup'):
-                    print(f"Found setup function in {module_name}")
-                    module.setup(self)
-                    self.loaded_events.add(module_name)
-                    print(f"Loaded event: {file_path.stem}")
-                else:
-                    print(f"⚠️  Event file {file_path.stem} missing setup() function")
+                report["commands_changed"] |= await self._reload_module(module_name, loaded)
+                report["reloaded"].append(module_name)
+                log.info("🔄 Reloaded %s", module_name)
             except Exception as e:
-                print(f"❌ Failed to load event {file_path.stem}: {e}")
-                traceback.print_exc()
+                report["failed"].append((module_name, str(e)))
+                log.exception("❌ Failed to reload %s: %s", module_name, e)
+        return report
 
     async def reload_commands(self):
-        """Reload all commands (useful for development)"""
-        for module_name in list(self.loaded_commands):
-            try:
-                module = importlib.reload(importlib.import_module(module_name))
-                print(f"Reloaded command: {module_name}")
-            except Exception as e:
-                print(f"Failed to reload command {module_name}: {e}")
+        """Reload changed command modules (useful for development)"""
+        report = await self._reload_folder("commands", self.loaded_commands)
+        if report["commands_changed"]:
+            await self.sync_command_tree()
+        return report
 
     async def reload_events(self):
-        """Reload all events (useful for development)"""
-        for module_name in list(self.loaded_events):
+        """Reload changed event modules (useful for development)"""
+        report = await self._reload_folder("events", self.loaded_events)
+        if report["commands_changed"]:
+            await self.sync_command_tree()
+        return report
+
+    async def reload_changed(self):
+        """Reload changed commands and events, syncing slash commands at most once"""
+        commands_report = await self._reload_folder("commands", self.loaded_commands)
+        events_report = await self._reload_folder("events", self.loaded_events)
+        report = {key: commands_report[key] + events_report[key] for key in ("reloaded", "unloaded", "failed")}
+        report["synced"] = commands_report["commands_changed"] or events_report["commands_changed"]
+        if report["synced"]:
+            await self.sync_command_tree()
+        return report
+
+    async def _watch_extensions(self):
+        """Development mode: poll commands/ and events/ and hot reload whatever changed"""
+        while True:
+            await asyncio.sleep(self.watch_interval)
             try:
-                module = importlib.reload(importlib.import_module(module_name))
-                print(f"🔄 Reloaded event: {module_name}")
+                await self.reload_changed()
             except Exception as e:
-                print(f"❌ Failed to reload event {module_name}: {e}")
+                log.exception("❌ Hot reload failed: %s", e)
 
 # Initialize Bot
 bot = DiscordBot()
 
 @bot.event
 async def on_ready():
-    print(f"{bot.user} is ready and online!")
-    # Manually run setup logic if not already run
-    if not bot.loaded_commands or not bot.loaded_events:
-        print("[Manual] Running setup_hook, load_commands, and load_events...")
+    log.info("%s is ready and online!", bot.user)
+    # Manually run setup logic if not already run (on_ready repeats after reconnects)
+    if not bot.setup_started:
+        log.info("[Manual] Running setup_hook, load_commands, and load_events...")
         try:
             await bot.setup_hook()
         except Exception as e:
-            print(f"Error during setup: {e}")
-    print(f"Loaded {len(bot.loaded_commands)} commands and {len(bot.loaded_events)} events")
-    print("=" * 50)
+            log.exception("Error during setup: %s", e)
+    log.info("Loaded %d commands and %d events", len(bot.loaded_commands), len(bot.loaded_events))
+
+@bot.event
+async def on_shard_ready(shard_id):
+    # Only dispatched in sharded mode; on_ready still fires once all shards are up
+    log.info("🧩 Shard %d ready", shard_id)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Recon Discord bot")
+    parser.add_argument("--profile-startup", action="store_true", help="Print per-module import timing, like python -X importtime")
+    parser.add_argument("--watch", nargs="?", type=float, const=1.0, metavar="SECONDS", help="Hot reload changed commands and events (development)")
+    args = parser.parse_args(argv)
+    setup_logging()
     try:
         token = os.getenv('TOKEN')
         if not token:
-            print("ERROR: No TOKEN found in environment variables!")
-            print("Please create a .env file with your Discord bot token.")
+            log.error("ERROR: No TOKEN found in environment variables!")
+            log.error("Please create a .env file with your Discord bot token.")
             exit(1)
+        bot.watch_interval = args.watch
+        if args.profile_startup:
+            bot.import_profiler = ImportProfiler()
+            bot.import_profiler.install()
         bot.run(token)
     except Exception as e:
-        print(f"Failed to start bot: {e}")
+        log.exception("Failed to start bot: %s", e)
+        # A non-zero exit is what tells the cluster supervisor to restart this worker
+        sys.exit(1)
 
 # Run the bot
 if __name__ == "__main__":
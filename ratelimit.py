@@ -0,0 +1,119 @@
+"""
+Per-user token-bucket rate limits for slash commands that are expensive to serve
+"""
+import asyncio
+import functools
+import logging
+import math
+import os
+import time
+from cache import get_guild_settings
+from metrics import metrics
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_SWEEP_INTERVAL = float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL") or 60)
+
+# command -> (uses, seconds): each user gets ``uses`` calls per ``seconds`` in each guild.
+# Guilds override these with /settings ratelimit, stored as rate_limits: {command: [uses, seconds]}
+DEFAULT_LIMITS = {
+    "echo": (5, 10),
+    "rapsheet": (3, 30),
+    "settings show": (3, 30),
+    "serverinfo": (3, 30),
+    "userinfo": (5, 30),
+}
+
+
+class RateLimiter:
+    """Token buckets keyed by (command, guild id, user id).
+
+    A bucket holds up to ``uses`` tokens and refills at ``uses / seconds`` per second; a call
+    takes one token. Buckets that have refilled completely are the same as new ones, so
+    sweep() drops them to keep memory proportional to recently active users.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._buckets = {}  # key -> [tokens, last update, time the bucket is full again]
+        self.allowed = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, key, uses, seconds):
+        """Take a token; returns 0 if the call may go ahead, else the seconds until it may"""
+        now = self.clock()
+        rate = uses / seconds
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(uses)
+        else:
+            tokens = min(float(uses), bucket[0] + (now - bucket[1]) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+            self.allowed += 1
+        else:
+            retry_after = (1 - tokens) / rate
+            self.rejected += 1
+        self._buckets[key] = [tokens, now, now + (uses - tokens) / rate]
+        return retry_after
+
+    def sweep(self):
+        """Drop buckets that have refilled; returns how many were dropped"""
+        now = self.clock()
+        expired = [key for key, bucket in self._buckets.items() if bucket[2] <= now]
+        for key in expired:
+            del self._buckets[key]
+        return len(expired)
+
+    async def run_forever(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            dropped = self.sweep()
+            if dropped:
+                log.debug("Dropped %d refilled rate limit buckets", dropped)
+
+    def stats(self):
+        return {"buckets": len(self._buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+
+rate_limiter = RateLimiter()
+
+
+async def limit_for(guild_id, name):
+    """The (uses, seconds) limit for a command in a guild; uses 0 means unlimited"""
+    uses, seconds = DEFAULT_LIMITS[name]
+    if guild_id is not None:
+        doc = await get_guild_settings(guild_id)
+        override = ((doc or {}).get("rate_limits") or {}).get(name)
+        if override:
+            uses, seconds = override
+    return uses, seconds
+
+
+def rate_limited(name):
+    """Apply the rate limit for ``name`` (a DEFAULT_LIMITS key) to a slash command callback.
+
+    Goes below the slash_command decorator. Rejected calls get an ephemeral reply and are
+    counted under the ``ratelimit_rejections`` metric.
+    """
+    if name not in DEFAULT_LIMITS:
+        raise KeyError(f"No default rate limit for {name!r}")
+
+    def decorator(callback):
+        @functools.wraps(callback)
+        async def wrapped(self, ctx, *args, **kwargs):
+            guild_id = ctx.guild.id if ctx.guild is not None else None
+            uses, seconds = await limit_for(guild_id, name)
+            if uses:
+                retry_after = rate_limiter.hit((name, guild_id, ctx.author.id), uses, seconds)
+                if retry_after:
+                    metrics.increment("ratelimit_rejections", name)
+                    await ctx.respond(f"⏳ You're using `/{name}` too quickly. Try again in {math.ceil(retry_after)}s.", ephemeral=True)
+                    return
+            return await callback(self, ctx, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -0,0 +1,117 @@
+"""
+Per-guild mod log retention: expired logs are moved out of the hot collection into
+gzip-compressed JSON lines files, one per guild and month
+"""
+import asyncio
+import gzip
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from pymongo import ASCENDING
+from db import get_guild_settings_collection, get_mod_logs_collection
+from storage import encode_document, decode_document
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR") or "archive"
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL") or 3600)
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_SORT = [("timestamp", ASCENDING), ("_id", ASCENDING)]
+
+
+def archive_path(root, guild_id, timestamp):
+    return Path(root) / str(guild_id) / f"{timestamp:%Y-%m}.jsonl.gz"
+
+
+def append_archive(root, guild_id, docs):
+    """Append documents to their monthly archive files and fsync them before returning"""
+    by_path = {}
+    for doc in docs:
+        by_path.setdefault(archive_path(root, guild_id, doc["timestamp"]), []).append(doc)
+    for path, month_docs in by_path.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Each append is a new gzip member; readers see the concatenation as one stream
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as f:
+                f.write("".join(encode_document(doc) + "\n" for doc in month_docs).encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+def read_archive(root, guild_id, user_id=None):
+    """All archived logs for a guild (optionally one user), oldest first"""
+    docs = {}
+    directory = Path(root) / str(guild_id)
+    if not directory.is_dir():
+        return []
+    for path in sorted(directory.glob("*.jsonl.gz")):
+        with gzip.open(path, "rt") as f:
+            for line in f:
+                doc = decode_document(line)
+                if user_id is None or doc.get("user_id") == user_id:
+                    # A crash between archiving and deleting can archive a batch twice
+                    docs[doc["_id"]] = doc
+    return sorted(docs.values(), key=lambda doc: (doc["timestamp"], doc["_id"]))
+
+
+class LogArchiver:
+    """Moves logs older than each guild's retention window to the archive, in batches"""
+
+    def __init__(self, root, batch_size=1000):
+        self.root = root
+        self.batch_size = batch_size
+        self.archived = 0
+        self.runs = 0
+        self.last_run_ms = 0.0
+        self.last_error = None
+
+    async def archive_guild(self, guild_id, days, now=None):
+        """Archive one guild's expired logs; returns how many were moved"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+        logs = get_mod_logs_collection()
+        moved = 0
+        while True:
+            cursor = logs.find({"guild_id": guild_id, "timestamp": {"$lt": cutoff}}).sort(ARCHIVE_SORT).limit(self.batch_size)
+            batch = await cursor.to_list(length=self.batch_size)
+            if not batch:
+                return moved
+            # Write the archive first: a crash afterwards leaves duplicates, never losses
+            await asyncio.to_thread(append_archive, self.root, guild_id, batch)
+            await logs.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+            self.archived += len(batch)
+            if len(batch) < self.batch_size:
+                return moved
+
+    async def run_once(self, now=None):
+        """Apply every guild's retention policy once; returns {guild_id: logs moved}"""
+        start = time.perf_counter()
+        moved = {}
+        cursor = get_guild_settings_collection().find({"log_retention_days": {"$gt": 0}}, {"log_retention_days": 1})
+        for settings in await cursor.to_list(length=None):
+            count = await self.archive_guild(settings["_id"], settings["log_retention_days"], now)
+            if count:
+                moved[settings["_id"]] = count
+        self.runs += 1
+        self.last_run_ms = (time.perf_counter() - start) * 1000
+        return moved
+
+    async def run_forever(self, interval):
+        while True:
+            try:
+                moved = await self.run_once()
+                self.last_error = None
+                if moved:
+                    log.info("🗄️ Archived %d mod logs from %d servers", sum(moved.values()), len(moved))
+            except Exception as e:
+                self.last_error = str(e)
+                log.exception("❌ Mod log archival failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def stats(self):
+        return {"archived": self.archived, "runs": self.runs, "last_run_ms": self.last_run_ms, "last_error": self.last_error}
+
+
+log_archiver = LogArchiver(ARCHIVE_DIR, ARCHIVE_BATCH_SIZE)
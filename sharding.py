@@ -0,0 +1,87 @@
+"""
+Opt-in sharding: which shards this process runs, and per-shard health for /bot status
+"""
+import math
+import os
+import time
+import discord
+
+SHARD_COUNT = os.getenv("SHARD_COUNT") or ""  # empty: one connection, "auto": Discord's recommendation
+SHARD_IDS = os.getenv("SHARD_IDS") or ""  # e.g. "0-3,8"; needs a numeric SHARD_COUNT
+
+
+def parse_shard_ids(text):
+    """Parse a list of shard ids and ranges such as ``0-3,8`` into sorted ids"""
+    ids = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        ids.update(range(int(first), int(last or first) + 1))
+    return sorted(ids)
+
+
+def shard_options(count=SHARD_COUNT, ids=SHARD_IDS):
+    """Return (sharded, client keyword arguments) for the SHARD_COUNT/SHARD_IDS settings"""
+    count, ids = count.strip().lower(), ids.strip()
+    if not count and not ids:
+        return False, {}
+    options = {}
+    if count and count != "auto":
+        options["shard_count"] = int(count)
+    if ids:
+        if "shard_count" not in options:
+            raise ValueError("SHARD_IDS needs a numeric SHARD_COUNT")
+        options["shard_ids"] = parse_shard_ids(ids)
+        out_of_range = [shard_id for shard_id in options["shard_ids"] if shard_id >= options["shard_count"]]
+        if out_of_range:
+            raise ValueError(f"Shard ids {out_of_range} are outside SHARD_COUNT={options['shard_count']}")
+    return True, options
+
+
+class ShardStats:
+    """Per-shard latency, guild count and gateway event rate.
+
+    The rate comes from each session's sequence number, which Discord increments for
+    every dispatched event, sampled between calls.
+    """
+
+    def __init__(self):
+        self._samples = {}  # shard_id -> (monotonic time, sequence)
+
+    def _connections(self, bot):
+        """(shard_id, latency, websocket) for every shard this process runs"""
+        if isinstance(bot, discord.AutoShardedClient):
+            return [
+                (shard_id, shard.latency, getattr(getattr(shard, "_parent", None), "ws", None))
+                for shard_id, shard in sorted(bot.shards.items())
+            ]
+        return [(getattr(bot, "shard_id", None) or 0, bot.latency, getattr(bot, "ws", None))]
+
+    def snapshot(self, bot, now=None):
+        now = time.monotonic() if now is None else now
+        sharded = isinstance(bot, discord.AutoShardedClient)
+        guilds = {}
+        for guild in bot.guilds:
+            shard_id = guild.shard_id if sharded else 0
+            guilds[shard_id] = guilds.get(shard_id, 0) + 1
+        rows = []
+        for shard_id, latency, ws in self._connections(bot):
+            sequence = getattr(ws, "sequence", None)
+            rate = None
+            previous = self._samples.get(shard_id)
+            if sequence is not None:
+                if previous is not None and sequence >= previous[1] and now > previous[0]:
+                    rate = (sequence - previous[1]) / (now - previous[0])
+                self._samples[shard_id] = (now, sequence)
+            rows.append({
+                "id": shard_id,
+                "latency_ms": latency * 1000 if math.isfinite(latency) else None,  # nan before the first heartbeat
+                "guilds": guilds.get(shard_id, 0),
+                "events": sequence,
+                "events_per_sec": rate,
+            })
+        return rows
+
+
+shard_stats = ShardStats()
@@ -0,0 +1,568 @@
+"""
+Local storage backend: a Motor-shaped async API over SQLite, so single-node deployments
+don't need a Mongo server
+
+Each collection is a table holding the document as JSON plus one real column per indexed
+field. create_indexes() promotes fields to columns and indexes them; filters on promoted
+fields become parameterised SQL, anything else is checked in Python after the SQL narrows
+the rows down.
+"""
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+COMMIT_BATCH = 500  # writes before a commit is forced, regardless of the interval
+EPOCH = datetime(1970, 1, 1)
+
+
+# ====== DOCUMENT HELPERS ======
+def _compare(value, op, operand):
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if op == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise NotImplementedError(f"Unsupported query operator {op}")
+
+
+def _is_operator_dict(condition):
+    return isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)
+
+
+def matches(doc, query):
+    """Evaluate the subset of the Mongo query language the bot uses against a document"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+        elif _is_operator_dict(condition):
+            value = doc.get(key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def apply_update(doc, update):
+    """Apply $set/$setOnInsert/$inc/$max/$min/$unset to a document in place"""
+    for op, fields in update.items():
+        for key, value in fields.items():
+            if op in ("$set", "$setOnInsert"):
+                doc[key] = value
+            elif op == "$inc":
+                doc[key] = doc.get(key, 0) + value
+            elif op == "$max":
+                doc[key] = value if doc.get(key) is None else max(doc[key], value)
+            elif op == "$min":
+                doc[key] = value if doc.get(key) is None else min(doc[key], value)
+            elif op == "$unset":
+                doc.pop(key, None)
+            else:
+                raise NotImplementedError(f"Unsupported update operator {op}")
+
+
+def project(doc, projection):
+    if not projection:
+        return dict(doc)
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    if included:
+        result = {key: doc[key] for key in included if key in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+
+def sort_documents(docs, sort):
+    # Stable sorts applied last-key-first give a multi-key ordering; None sorts first, as in Mongo
+    for field, direction in reversed(sort):
+        docs = sorted(docs, key=lambda doc: (doc.get(field) is not None, doc.get(field)), reverse=direction < 0)
+    return docs
+
+
+def upsert_seed(query):
+    """The fields an upsert copies from its filter"""
+    return {key: value for key, value in query.items() if not key.startswith("$") and not _is_operator_dict(value)}
+
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+# ====== ENCODING ======
+def _to_utc_naive(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return {"$date": (_to_utc_naive(value) - EPOCH) // timedelta(microseconds=1)}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _decode_hook(obj):
+    if len(obj) == 1:
+        if "$date" in obj:
+            return EPOCH + timedelta(microseconds=obj["$date"])
+        if "$oid" in obj:
+            return ObjectId(obj["$oid"])
+    return obj
+
+
+def encode_document(doc):
+    return json.dumps(doc, default=_encode_default, separators=(",", ":"))
+
+
+def decode_document(text):
+    return json.loads(text, object_hook=_decode_hook)
+
+
+def sql_value(value):
+    """Map a document value to an SQLite value that sorts the same way"""
+    if value is None or isinstance(value, (int, float, str)):
+        return int(value) if isinstance(value, bool) else value
+    if isinstance(value, datetime):
+        return (_to_utc_naive(value) - EPOCH) // timedelta(microseconds=1)
+    if isinstance(value, ObjectId):
+        return str(value)  # hex order matches ObjectId order
+    return encode_document(value)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+SQL_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<=", "$eq": "IS", "$ne": "IS NOT"}
+
+
+def translate(query, columns):
+    """Translate a filter into (where_sql, params, complete).
+
+    Conditions on fields without a column are left out; ``complete`` is False when any
+    were, and the caller must check the rows with matches().
+    """
+    clauses, params, complete = [], [], True
+    for key, condition in query.items():
+        if key in ("$or", "$and"):
+            parts = [translate(clause, columns) for clause in condition]
+            if key == "$and":
+                for sql, part_params, part_complete in parts:
+                    clauses.append(f"({sql})")
+                    params.extend(part_params)
+                    complete = complete and part_complete
+            elif all(part_complete for _, _, part_complete in parts):
+                clauses.append("(" + " OR ".join(f"({sql})" for sql, _, _ in parts) + ")")
+                for _, part_params, _ in parts:
+                    params.extend(part_params)
+            else:
+                complete = False
+            continue
+        column = columns.get(key)
+        if column is None:
+            complete = False
+            continue
+        column = _quote(column)
+        if not _is_operator_dict(condition):
+            clauses.append(f"{column} IS ?")
+            params.append(sql_value(condition))
+            continue
+        for op, operand in condition.items():
+            if op in SQL_OPERATORS and (operand is not None or op in ("$eq", "$ne")):
+                clauses.append(f"{column} {SQL_OPERATORS[op]} ?")
+                params.append(sql_value(operand))
+            elif op in ("$in", "$nin") and operand and all(value is not None for value in operand):
+                negate = "NOT " if op == "$nin" else ""
+                clauses.append(f"{column} {negate}IN ({', '.join('?' * len(operand))})")
+                params.extend(sql_value(value) for value in operand)
+            elif op == "$exists":
+                clauses.append(f"{column} IS {'NOT ' if operand else ''}NULL")
+            else:
+                complete = False
+    return " AND ".join(clauses) or "1", params, complete
+
+
+# ====== SQLITE ======
+class SQLiteDatabase:
+    """Async SQLite database with Motor-style collection access (``db.mod_logs``, ``db["mod_logs"]``).
+
+    Every statement runs on one dedicated thread, which owns the connection, so the
+    event loop never blocks on disk and read-modify-write operations can't interleave.
+    Writes are committed in batches: after ``commit_interval`` seconds or COMMIT_BATCH
+    writes, whichever comes first.
+    """
+
+    def __init__(self, path, commit_interval=0.05):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn = None
+        self._collections = {}
+        self._dirty = 0
+        self._commit_handle = None
+        self.commits = 0
+
+    def __getitem__(self, name):
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = SQLiteCollection(self, name)
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    # --- worker thread ---
+    def _connection(self):
+        if self._conn is None:
+            # Statements are parameterised with stable SQL text, so the statement cache
+            # keeps them prepared across calls
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=512)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+        return self._conn
+
+    def _wrote(self, count=1):
+        self._dirty += count
+        if self._dirty >= COMMIT_BATCH:
+            self._commit()
+
+    def _commit(self):
+        if self._dirty and self._conn is not None:
+            self._conn.commit()
+            self._dirty = 0
+            self.commits += 1
+
+    # --- event loop ---
+    async def run(self, func, *args):
+        """Run ``func`` on the database thread and schedule a commit if it wrote anything"""
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, func, *args)
+        if self._dirty and self._commit_handle is None:
+            self._commit_handle = loop.call_later(self.commit_interval, self._timed_commit, loop)
+        return result
+
+    def _timed_commit(self, loop):
+        self._commit_handle = None
+        loop.run_in_executor(self._executor, self._commit)
+
+    async def commit(self):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._commit)
+
+    async def close(self):
+        if self._commit_handle is not None:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+
+        def close_connection():
+            self._commit()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, close_connection)
+
+
+class SQLiteCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+        self.table = _quote(name)
+        self.columns = None  # field -> column name, loaded on first use
+
+    # --- worker thread ---
+    def _ensure_table(self):
+        conn = self.database._connection()
+        if self.columns is None:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {self.table} ("_id" PRIMARY KEY, "_doc" TEXT NOT NULL)')
+            self.columns = {
+                row[1]: row[1] for row in conn.execute(f"PRAGMA table_info({self.table})") if row[1] != "_doc"
+            }
+        return conn
+
+    def _row_values(self, doc):
+        return [sql_value(doc.get(field)) for field in self.columns] + [encode_document(doc)]
+
+    def _insert_sql(self):
+        columns = ", ".join(_quote(column) for column in self.columns.values())
+        return f"INSERT INTO {self.table} ({columns}, \"_doc\") VALUES ({', '.join('?' * (len(self.columns) + 1))})"
+
+    def _update_sql(self):
+        assignments = ", ".join(f"{_quote(column)} = ?" for column in self.columns.values())
+        return f'UPDATE {self.table} SET {assignments}, "_doc" = ? WHERE "_id" IS ?'
+
+    def _select(self, query, sort=None, limit=0):
+        """Return matching documents, pushing the filter, sort and limit into SQL where possible"""
+        conn = self._ensure_table()
+        where, params, complete = translate(query or {}, self.columns)
+        sql = f'SELECT "_doc" FROM {self.table} WHERE {where}'
+        pushdown = complete and all(field in self.columns for field, _ in sort or [])
+        if pushdown and sort:
+            sql += " ORDER BY " + ", ".join(f"{_quote(self.columns[field])} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort)
+        if pushdown and limit:
+            sql += f" LIMIT {int(limit)}"
+        docs = [decode_document(row[0]) for row in conn.execute(sql, params)]
+        if not complete:
+            docs = [doc for doc in docs if matches(doc, query)]
+        if not pushdown:
+            if sort:
+                docs = sort_documents(docs, sort)
+            if limit:
+                docs = docs[:limit]
+        return docs
+
+    def _insert(self, docs, ordered=True):
+        conn = self._ensure_table()
+        sql = self._insert_sql()
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            doc.setdefault("_id", ObjectId())
+            try:
+                conn.execute(sql, self._row_values(doc))
+                inserted.append(doc["_id"])
+            except sqlite3.IntegrityError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        self.database._wrote(len(inserted))
+        return inserted, errors
+
+    def _write_back(self, doc):
+        self.database._connection().execute(self._update_sql(), self._row_values(doc) + [sql_value(doc["_id"])])
+
+    def _update(self, query, update, upsert, return_document=ReturnDocument.BEFORE):
+        """Update the first match (or insert on upsert); returns (before, after, inserted)"""
+        self._ensure_table()
+        found = self._select(query, limit=1)
+        if found:
+            before = found[0]
+            after = decode_document(encode_document(before))
+            apply_update(after, update)
+            self._write_back(after)
+            self.database._wrote()
+            return before, after, False
+        if not upsert:
+            return None, None, False
+        after = upsert_seed(query)
+        apply_update(after, update)
+        self._insert([after])
+        return None, after, True
+
+    def _replace(self, query, replacement, upsert):
+        """Replace the first match (or insert on upsert); returns (before, after, inserted)"""
+        self._ensure_table()
+        found = self._select(query, limit=1)
+        if found:
+            before = found[0]
+            after = {**replacement, "_id": before["_id"]}
+            self._write_back(after)
+            self.database._wrote()
+            return before, after, False
+        if not upsert:
+            return None, None, False
+        # A replacement upsert only takes the _id from its filter
+        after = dict(replacement)
+        if "_id" in query and not _is_operator_dict(query["_id"]):
+            after.setdefault("_id", query["_id"])
+        self._insert([after])
+        return None, after, True
+
+    def _bulk_update(self, requests):
+        """Apply UpdateOne/ReplaceOne requests in one executor job; returns (matched, upserted ids by index)"""
+        matched, upserted = 0, {}
+        for index, request in enumerate(requests):
+            if isinstance(request, UpdateOne):
+                before, after, inserted = self._update(request._filter, request._doc, request._upsert)
+            elif isinstance(request, ReplaceOne):
+                before, after, inserted = self._replace(request._filter, request._doc, request._upsert)
+            else:
+                raise NotImplementedError(f"Unsupported bulk request {request.__class__.__name__}")
+            matched += before is not None
+            if inserted:
+                upserted[index] = after["_id"]
+        return matched, upserted
+
+    def _count(self, query):
+        conn = self._ensure_table()
+        where, params, complete = translate(query or {}, self.columns)
+        if complete:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {where}", params).fetchone()[0]
+        return len(self._select(query))
+
+    def _delete(self, query):
+        conn = self._ensure_table()
+        where, params, complete = translate(query or {}, self.columns)
+        if complete:
+            deleted = conn.execute(f"DELETE FROM {self.table} WHERE {where}", params).rowcount
+        else:
+            ids = [sql_value(doc["_id"]) for doc in self._select(query)]
+            for doc_id in ids:
+                conn.execute(f'DELETE FROM {self.table} WHERE "_id" IS ?', (doc_id,))
+            deleted = len(ids)
+        self.database._wrote(deleted)
+        return deleted
+
+    def _create_indexes(self, models):
+        conn = self._ensure_table()
+        names = []
+        for model in models:
+            document = model.document
+            fields = list(document["key"])
+            for field in fields:
+                if field not in self.columns:
+                    # Promote the field to a real column and backfill it from the stored documents
+                    conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {_quote(field)}")
+                    rows = conn.execute(f'SELECT "_id", "_doc" FROM {self.table}').fetchall()
+                    conn.executemany(
+                        f'UPDATE {self.table} SET {_quote(field)} = ? WHERE "_id" IS ?',
+                        [(sql_value(decode_document(doc).get(field)), doc_id) for doc_id, doc in rows]
+                    )
+                    self.columns[field] = field
+            keys = ", ".join(f"{_quote(self.columns[field])} {'DESC' if direction < 0 else 'ASC'}" for field, direction in document["key"].items())
+            unique = "UNIQUE " if document.get("unique") else ""
+            conn.execute(f"CREATE {unique}INDEX IF NOT EXISTS {_quote(self.name + '.' + document['name'])} ON {self.table} ({keys})")
+            names.append(document["name"])
+        conn.commit()
+        return names
+
+    def _index_information(self):
+        conn = self._ensure_table()
+        info = {"_id_": {"key": [("_id", 1)]}}
+        prefix = self.name + "."
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (self.name,)):
+            if name.startswith(prefix):
+                columns = [row[2] for row in conn.execute(f"PRAGMA index_info({_quote(name)})")]
+                info[name[len(prefix):]] = {"key": [(column, 1) for column in columns]}
+        return info
+
+    def _explain(self, query, sort):
+        """Describe the SQLite plan with Mongo stage names, for db.explain_query_shapes()"""
+        conn = self._ensure_table()
+        where, params, complete = translate(query or {}, self.columns)
+        sql = f'SELECT "_doc" FROM {self.table} WHERE {where}'
+        if complete and sort and all(field in self.columns for field, _ in sort):
+            sql += " ORDER BY " + ", ".join(f"{_quote(self.columns[field])} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort)
+        stages = []
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            if "TEMP B-TREE" in detail:
+                stage = "SORT"
+            elif "USING INTEGER PRIMARY KEY" in detail or "USING PRIMARY KEY" in detail:
+                stage = "IDHACK"
+            elif "USING" in detail and "INDEX" in detail:
+                stage = "IXSCAN"
+            else:
+                stage = "COLLSCAN"
+            stages.append({"stage": stage, "detail": detail})
+        if not complete or (sort and "ORDER BY" not in sql):
+            stages.append({"stage": "SORT" if sort else "FILTER", "detail": "evaluated in Python"})
+        return {"queryPlanner": {"winningPlan": {"stages": stages}}}
+
+    # --- async API ---
+    async def insert_one(self, doc):
+        inserted, errors = await self.database.run(self._insert, [doc])
+        if errors:
+            raise DuplicateKeyError(errors[0]["errmsg"], 11000)
+        return _Result(inserted_id=inserted[0])
+
+    async def insert_many(self, docs, ordered=True):
+        inserted, errors = await self.database.run(self._insert, list(docs), ordered)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return _Result(inserted_ids=inserted)
+
+    async def find_one(self, query=None, projection=None):
+        docs = await self.database.run(self._select, query, None, 1)
+        return project(docs[0], projection) if docs else None
+
+    def find(self, query=None, projection=None):
+        return SQLiteCursor(self, query, projection)
+
+    async def count_documents(self, query):
+        return await self.database.run(self._count, query)
+
+    async def update_one(self, query, update, upsert=False):
+        before, after, inserted = await self.database.run(self._update, query, update, upsert)
+        return _Result(matched_count=int(before is not None), upserted_id=after["_id"] if inserted else None)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=ReturnDocument.BEFORE, projection=None):
+        before, after, _ = await self.database.run(self._update, query, update, upsert)
+        doc = after if return_document == ReturnDocument.AFTER else before
+        return project(doc, projection) if doc is not None else None
+
+    async def bulk_write(self, requests, ordered=True):
+        matched, upserted = await self.database.run(self._bulk_update, list(requests))
+        return _Result(matched_count=matched, upserted_ids=upserted)
+
+    async def delete_many(self, query):
+        return _Result(deleted_count=await self.database.run(self._delete, query))
+
+    async def create_indexes(self, models):
+        return await self.database.run(self._create_indexes, models)
+
+    async def index_information(self):
+        return await self.database.run(self._index_information)
+
+
+class SQLiteCursor:
+    def __init__(self, collection, query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = key if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        limit = min(filter(None, (self._limit, length)), default=0)
+        docs = await self._collection.database.run(self._collection._select, self._query, self._sort, limit)
+        return [project(doc, self._projection) for doc in docs]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list():
+            yield doc
+
+    async def explain(self):
+        return await self._collection.database.run(self._collection._explain, self._query, self._sort)
@@ -0,0 +1,71 @@
+import subprocess
+import sys
+from pathlib import Path
+from benchmarks.cache_profiles import measure
+from benchmarks.fakes import MemoryCollection, make_guild
+from benchmarks.replay import EventBuilder, generate_raid
+from db import INDEXES
+
+
+def test_memory_collection_matches_rapsheet_queries(run):
+    """Indexed lookups return the same pages as a scan would."""
+    collection = MemoryCollection("mod_logs")
+    async def main():
+        await collection.insert_many([{"guild_id": 1, "user_id": i % 3, "timestamp": i} for i in range(30)])
+        await collection.create_indexes(INDEXES["mod_logs"])
+        await collection.insert_one({"guild_id": 1, "user_id": 0, "timestamp": 100})
+        cursor = collection.find({"guild_id": 1, "user_id": 0, "timestamp": {"$gt": 20}}, {"timestamp": 1}).sort([("timestamp", -1)]).limit(2)
+        return await cursor.to_list(), await collection.count_documents({"guild_id": 1, "user_id": 0})
+    page, total = run(main())
+    assert [doc["timestamp"] for doc in page] == [100, 27]
+    assert total == 11
+
+def test_fake_guild_shape():
+    guild = make_guild(member_count=200)
+    assert guild.member_count == 202  # plus owner and bot
+    assert guild.get_member(guild.owner_id).top_role > guild.members[0].top_role
+
+def test_command_benchmarks_run():
+    """Every command runs against the fakes without raising."""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.commands", "--members", "300", "--iterations", "3"],
+        cwd=Path(__file__).parent, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    for name in ("serverinfo", "userinfo", "rapsheet", "warn", "massban"):
+        assert f"\n{name} " in result.stdout
+
+def test_raid_scenario_is_ordered_and_bans_joiners():
+    """Raiders join before they are banned, and the stream is sorted by time."""
+    events = generate_raid(joins=50, seed=1)
+    assert [e["t"] for e in events] == sorted(e["t"] for e in events)
+    joined = {e["user"]: e["t"] for e in events if e["type"] == "member_join"}
+    bans = [e for e in events if e["type"] == "member_ban"]
+    assert len(joined) == 50 and bans
+    assert all(ban["t"] > joined[ban["user"]] for ban in bans)
+
+def test_event_builder_updates_member_cache():
+    guild = make_guild(member_count=10)
+    builder = EventBuilder([guild])
+    name, (member,) = builder.build({"type": "member_join", "guild": 0, "user": 99})
+    assert name == "member_join" and guild.get_member(99) is member
+    name, (banned_guild, user) = builder.build({"type": "member_ban", "guild": 0, "user": 99})
+    assert banned_guild is guild and user is member
+    builder.build({"type": "member_remove", "guild": 0, "user": 99})
+    assert guild.get_member(99) is None
+
+def test_replay_runs_raid():
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.replay", "run", "--scenario", "raid", "--joins", "30", "--members", "200", "--rate", "0", "--template"],
+        cwd=Path(__file__).parent, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert "ModLogEvents.on_member_ban" in result.stdout
+    assert "Event loop lag" in result.stdout
+
+def test_cache_profiles_keep_what_they_promise():
+    """Only chunking profiles cache members, and only the full profile keeps messages."""
+    results = {profile: measure(profile, guilds=2, members=50, messages=20) for profile in ("full", "moderation", "minimal")}
+    assert [results[p]["members"] for p in ("full", "moderation", "minimal")] == [100, 100, 0]
+    assert [results[p]["messages"] for p in ("full", "moderation", "minimal")] == [20, 0, 0]
+    assert results["full"]["bytes"] > results["moderation"]["bytes"] > results["minimal"]["bytes"]
@@ -0,0 +1,22 @@
+import discord
+from benchmarks.fakes import FakeBot, FakeContext, FakeMember, make_guild
+from commands.botmanagement import BotManagementCommand
+
+
+class Context(FakeContext):
+    async def respond(self, *args, **kwargs):
+        self.reply = (args, kwargs)
+
+def subcommand(name):
+    return next(command for command in BotManagementCommand.group.subcommands if command.name == name)
+
+def test_internal_details_need_administrator(run):
+    """Database, metrics and startup details are only shown to administrators."""
+    guild = make_guild(member_count=5)
+    member = FakeMember(1, "member", guild, guild.roles[:1], None, permissions=discord.Permissions(manage_guild=True))
+    cog = BotManagementCommand(FakeBot([guild]))
+    for name, arguments in {"db": {}, "metrics": {"kind": None}, "profile": {}}.items():
+        ctx = Context(guild, member)
+        run(subcommand(name).callback(cog, ctx, **arguments))
+        assert ctx.reply == (("❌ You need Administrator permissions to use this command.",), {"ephemeral": True}), name
+        assert subcommand(name).default_member_permissions == discord.Permissions(administrator=True)
@@ -0,0 +1,166 @@
+import asyncio
+import pytest
+import cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSettingsCollection:
+    def __init__(self, docs=None):
+        self.docs = dict(docs or {})
+        self.reads = 0
+
+    async def find_one(self, query):
+        self.reads += 1
+        await asyncio.sleep(0)
+        return self.docs.get(query["_id"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        doc.update(update["$set"])
+        return dict(doc)
+
+
+@pytest.fixture
+def settings_col(monkeypatch):
+    col = FakeSettingsCollection({1: {"_id": 1, "log_channel_id": 10}})
+    monkeypatch.setattr(cache, "get_guild_settings_collection", lambda: col)
+    cache.guild_settings_cache.clear()
+    return col
+
+def test_ttl_cache_expires_entries():
+    """Entries are dropped once their TTL has passed."""
+    clock = FakeClock()
+    c = cache.TTLCache(maxsize=10, ttl=5, clock=clock)
+    c.set("a", 1)
+    assert c.get("a") == 1
+    clock.now = 6
+    assert c.get("a") is None
+    assert c.stats()["hits"] == 1
+    assert c.stats()["misses"] == 1
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted when full."""
+    c = cache.TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.evictions == 1
+
+def test_concurrent_misses_share_one_query(settings_col, run):
+    """Concurrent lookups for an uncached guild hit the database once."""
+    async def main():
+        return await asyncio.gather(*(cache.get_guild_settings(1) for _ in range(5)))
+    results = run(main())
+    assert all(r["log_channel_id"] == 10 for r in results)
+    assert settings_col.reads == 1
+
+def test_update_writes_through(settings_col, run):
+    """Updating settings refreshes the cached document without another read."""
+    async def main():
+        await cache.get_guild_settings(1)
+        await cache.update_guild_settings(1, {"log_channel_id": 20})
+        return await cache.get_guild_settings(1)
+    assert run(main())["log_channel_id"] == 20
+    assert settings_col.reads == 1
+
+def test_invalidate_where_drops_matching_keys():
+    ttl = cache.TTLCache(maxsize=10, ttl=60)
+    for key in [("guild", 1), ("member", 1, 5), ("member", 2, 5), ("member", 1, 6)]:
+        ttl.set(key, key)
+    ttl.invalidate_where(lambda key: key[0] == "member" and key[1] == 1)
+    assert sorted(ttl._data) == [("guild", 1), ("member", 2, 5)]
+
+def test_info_embeds_are_cached_until_an_event_invalidates_them(monkeypatch, run):
+    """Volatile fields are fresh on every call; the rest changes only after an invalidating event."""
+    from types import SimpleNamespace
+    import db
+    from benchmarks.fakes import FakeBot, FakeChannel, FakeContext, FakeMember, MemoryDatabase, make_guild
+    from commands.serverinfo import ServerinfoCommand
+    from commands.userinfo import UserinfoCommand
+    from events.embedcache import EmbedCacheEvents
+
+    class Context(FakeContext):
+        async def respond(self, *args, **kwargs):
+            self.embed = kwargs["embed"]
+
+    def field(embed, name):
+        return next(field.value for field in embed.fields if field.name.startswith(name))
+
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    cache.embed_cache.clear()
+    hits = cache.embed_cache.hits
+    guild = make_guild(member_count=20, channel_count=4)
+    bot = FakeBot([guild])
+    serverinfo, userinfo, events = ServerinfoCommand(bot), UserinfoCommand(bot), EmbedCacheEvents(bot)
+    ctx = Context(guild, guild.members[0])
+
+    async def main():
+        await serverinfo.serverinfo_command.callback(serverinfo, ctx)
+        first = ctx.embed
+        guild.add_member(FakeMember(10 ** 17, "late", guild, guild.roles[:1], first.timestamp))
+        guild.add_channel(FakeChannel(10 ** 17 + 1, "new"))
+        await serverinfo.serverinfo_command.callback(serverinfo, ctx)
+        second = ctx.embed
+        await events.on_guild_channel_create(SimpleNamespace(guild=guild))
+        await serverinfo.serverinfo_command.callback(serverinfo, ctx)
+        third = ctx.embed
+
+        target = guild.members[1]
+        await userinfo.userinfo_command.callback(userinfo, ctx, target)
+        await userinfo.userinfo_command.callback(userinfo, ctx, target)
+        cached_member = cache.member_embed_key(guild.id, target.id) in cache.embed_cache._data
+        await events.on_guild_role_update(None, SimpleNamespace(guild=guild))
+        return first, second, third, cached_member
+
+    first, second, third, cached_member = run(main())
+    assert [embed.fields[1].name for embed in (first, second, third)] == ["👥 Members"] * 3
+    total = lambda embed: int(field(embed, "👥").split("\n")[0].split()[-1])
+    assert total(second) == total(first) + 1
+    assert field(second, "📺") == field(first, "📺") != field(third, "📺")
+    assert cached_member and cache.embed_cache.hits - hits == 2
+    assert len(cache.embed_cache) == 0  # the role update dropped the guild and its members
+
+def test_serverinfo_reuses_approximate_counts(monkeypatch, run):
+    """Without the member cache, Discord's approximate counts are fetched once per guild per TTL."""
+    from types import SimpleNamespace
+    import discord
+    import db
+    from benchmarks.fakes import FakeBot, FakeContext, MemoryDatabase, make_guild
+    from commands.serverinfo import ServerinfoCommand
+
+    class Context(FakeContext):
+        async def respond(self, *args, **kwargs):
+            self.embed = kwargs["embed"]
+
+    class LeanBot(FakeBot):
+        intents = discord.Intents.default()
+        fetches = 0
+
+        async def fetch_guild(self, guild_id, with_counts=False):
+            self.fetches += 1
+            return SimpleNamespace(approximate_member_count=1200, approximate_presence_count=300)
+
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    cache.approximate_counts_cache.clear()
+    guild = make_guild(member_count=5, channel_count=4)
+    bot = LeanBot([guild])
+    serverinfo = ServerinfoCommand(bot)
+    ctx = Context(guild, guild.members[0])
+
+    async def main():
+        for _ in range(3):
+            await serverinfo.serverinfo_command.callback(serverinfo, ctx)
+
+    run(main())
+    assert bot.fetches == 1
+    assert "**Online:** 300" in ctx.embed.fields[1].value
@@ -0,0 +1,80 @@
+import asyncio
+import sys
+from cluster import ClusterClient, Supervisor, shard_ranges
+
+
+async def wait_until(condition, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition never became true")
+
+def test_shard_ranges_are_contiguous_and_balanced():
+    assert shard_ranges(10, 3) == [range(0, 4), range(4, 7), range(7, 10)]
+    assert shard_ranges(2, 2) == [range(0, 1), range(1, 2)]
+
+def test_broadcast_collects_every_cluster(tmp_path, run):
+    """A broadcast reaches every worker, the sender included; failures come back as errors."""
+    async def main():
+        supervisor = Supervisor(3, 3, str(tmp_path / "ipc.sock"), command=[])
+        await supervisor.start_server()
+        clients = [ClusterClient(supervisor.socket_path, cluster_id) for cluster_id in range(2)]
+        for client in clients:
+            async def status(args, client=client):
+                if client.cluster_id == 1:
+                    raise RuntimeError("shard 1 is down")
+                return {"guilds": 10 + args["extra"]}
+            client.register("status", status)
+            client.start()
+        await wait_until(lambda: all(client.connected for client in clients) and len(supervisor._connections) == 2)
+        replies = await clients[0].broadcast("status", {"extra": 5}, timeout=2)
+        for client in clients:
+            await client.close()
+        await wait_until(lambda: not supervisor._connections)
+        supervisor._server.close()
+        return replies
+
+    replies = run(main())
+    assert replies == [
+        {"cluster": 0, "data": {"guilds": 15}, "error": None},
+        {"cluster": 1, "data": None, "error": "shard 1 is down"},
+        {"cluster": 2, "data": None, "error": "not connected"},
+    ]
+
+def test_supervisor_restarts_crashed_workers(tmp_path, run):
+    """A worker that exits with an error is started again; a clean exit is left alone."""
+    async def main():
+        crashing = Supervisor(1, 1, str(tmp_path / "a.sock"), [sys.executable, "-c", "raise SystemExit(3)"], restart_delay=0.01)
+        task = asyncio.create_task(crashing.run())
+        await wait_until(lambda: crashing.restarts[0] >= 2, timeout=20)
+        crashing.stop()
+        await task
+        clean = Supervisor(1, 1, str(tmp_path / "b.sock"), [sys.executable, "-c", "pass"], restart_delay=0.01)
+        task = asyncio.create_task(clean.run())
+        await asyncio.sleep(1)
+        clean.stop()
+        await task
+        return clean.restarts[0]
+
+    assert run(main()) == 0
+
+def test_supervisor_restarts_a_bot_that_crashed(tmp_path, run):
+    """project.main() exits non-zero when the bot raises, so the supervisor restarts that worker."""
+    script = (
+        "import os, project\n"
+        "os.environ['TOKEN'] = 'test'\n"
+        "def crash(token): raise RuntimeError('gateway exploded')\n"
+        "project.bot.run = crash\n"
+        "project.main([])\n"
+    )
+
+    async def main():
+        supervisor = Supervisor(1, 1, str(tmp_path / "c.sock"), [sys.executable, "-c", script], restart_delay=0.01)
+        task = asyncio.create_task(supervisor.run())
+        await wait_until(lambda: supervisor.restarts[0] >= 1, timeout=60)
+        supervisor.stop()
+        await task
+        return supervisor.restarts[0]
+
+    assert run(main()) >= 1
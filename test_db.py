@@ -0,0 +1,91 @@
+import asyncio
+import os
+import subprocess
+import sys
+import db
+
+
+class FakeLogCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+
+def test_plan_stages_walks_nested_plans():
+    """Stages are collected from nested input stages."""
+    plan = {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "guild_user_timestamp_id"},
+    }
+    assert db.plan_stages(plan) == ["FETCH", "IXSCAN"]
+
+def test_plan_stages_handles_stage_lists():
+    """Stages under inputStages lists are collected too."""
+    plan = {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}
+    assert db.plan_stages(plan) == ["OR", "IXSCAN", "COLLSCAN"]
+
+def test_query_shapes_reference_indexed_collections():
+    """Every mod_logs query shape has indexes declared for its collection."""
+    for collection, _, _ in db.QUERY_SHAPES.values():
+        if collection != "guild_settings":
+            assert collection in db.INDEXES
+
+def test_writer_batches_by_size(run):
+    """A full batch is written without waiting for the flush interval."""
+    col = FakeLogCollection()
+    writer = db.ModLogWriter(lambda: col, batch_size=3, flush_interval=60)
+    async def main():
+        for i in range(3):
+            await writer.put({"n": i})
+        await asyncio.sleep(0.05)
+        await writer.close()
+    run(main())
+    assert [len(b) for b in col.batches] == [3]
+    assert writer.stats()["written"] == 3
+
+def test_writer_flushes_on_close(run):
+    """Queued documents are written when the writer is closed."""
+    col = FakeLogCollection()
+    writer = db.ModLogWriter(lambda: col, batch_size=100, flush_interval=60)
+    async def main():
+        await writer.put({"n": 1})
+        await writer.put({"n": 2})
+        await writer.close()
+    run(main())
+    assert sum(len(b) for b in col.batches) == 2
+    assert writer.stats()["queued"] == 0
+
+def test_writer_applies_backpressure(run):
+    """put() waits once max_queued documents are buffered."""
+    col = FakeLogCollection()
+    writer = db.ModLogWriter(lambda: col, batch_size=100, flush_interval=60, max_queued=2)
+    async def main():
+        # One document is held by the writer task, two more fill the queue
+        for i in range(4):
+            await writer.put({"n": i})
+    async def bounded():
+        try:
+            await asyncio.wait_for(main(), 0.1)
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            await writer.close()
+        return False
+    assert run(bounded())
+
+def test_client_is_created_on_first_use():
+    """Importing db opens nothing; the first lookup builds the client from the env settings."""
+    script = (
+        "import asyncio, db\n"
+        "assert 'client' not in vars(db) and 'db' not in vars(db)\n"
+        "db.get_mod_logs_collection()\n"
+        "options = db.client.options\n"
+        "print(options.pool_options.max_pool_size, options.server_selection_timeout, db.client.options.pool_options.metadata['application']['name'])\n"
+        "asyncio.run(db.close_database())\n"
+        "print(db.client)\n"
+    )
+    env = dict(os.environ, DB_BACKEND="mongo", MONGO_MAX_POOL_SIZE="7", MONGO_SERVER_SELECTION_TIMEOUT_MS="1500")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["7", "1.5", "recon", "None"]
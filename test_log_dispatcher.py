@@ -0,0 +1,59 @@
+import asyncio
+import log_dispatcher
+from log_dispatcher import LogDispatcher
+
+
+class FakeChannel:
+    def __init__(self, channel_id=1):
+        self.id = channel_id
+        self.messages = []
+
+    async def send(self, embeds):
+        self.messages.append(list(embeds))
+
+def test_burst_is_packed_ten_embeds_per_message(run):
+    """A burst of embeds is sent in messages of up to ten."""
+    channel = FakeChannel()
+    dispatcher = LogDispatcher(flush_interval=0.01)
+    async def main():
+        for i in range(25):
+            dispatcher.dispatch(channel, i)
+        await dispatcher.close()
+    run(main())
+    assert [len(m) for m in channel.messages] == [10, 10, 5]
+    assert dispatcher.stats()["sent_embeds"] == 25
+
+def test_full_queue_drops_and_counts(run):
+    """Embeds beyond the queue bound are dropped and counted per channel."""
+    channel = FakeChannel()
+    dispatcher = LogDispatcher(flush_interval=0.01, max_queued=3)
+    async def main():
+        accepted = [dispatcher.dispatch(channel, i) for i in range(5)]
+        stats = dispatcher.stats()
+        await dispatcher.close()
+        return accepted, stats
+    accepted, stats = run(main())
+    assert accepted == [True, True, True, False, False]
+    assert stats["channels"][1]["dropped"] == 2
+    assert stats["channels"][1]["queued"] == 3
+
+def test_counters_survive_idle_workers_and_restart(monkeypatch, run):
+    """An idle worker's exit keeps its channel's counters; start() brings batching back after close()."""
+    monkeypatch.setattr(log_dispatcher, "IDLE_TIMEOUT", 0.01)
+    channel = FakeChannel()
+    dispatcher = LogDispatcher(flush_interval=0.05)
+    async def main():
+        dispatcher.dispatch(channel, 0)
+        await asyncio.sleep(0.2)
+        idle = dispatcher.stats()
+        await dispatcher.close()
+        dispatcher.start()
+        dispatcher.dispatch(channel, 1)
+        await asyncio.sleep(0.01)
+        dispatcher.dispatch(channel, 2)
+        await dispatcher.close()
+        return idle
+    idle = run(main())
+    assert idle["channels"][1] == {"queued": 0, "sent_messages": 1, "sent_embeds": 1, "dropped": 0, "errors": 0}
+    assert channel.messages == [[0], [1, 2]]
+    assert dispatcher.stats()["sent_embeds"] == 3
@@ -0,0 +1,50 @@
+import io
+import json
+import logging
+import threading
+import pytest
+from logging_config import EventThrottle, parse_levels, setup_logging, stop_logging
+
+
+def test_event_throttle_samples_then_rate_limits():
+    """One in ``sample`` records is kept, at most ``rate`` a second; the next kept record reports the rest."""
+    now = [0.0]
+    throttle = EventThrottle(sample=2, rate=2, clock=lambda: now[0])
+    record = lambda event: logging.makeLogRecord({"event": event})
+    kept = [throttle.filter(record("on_message")) for _ in range(10)]
+    assert kept == [True, False, True, False, False, False, False, False, False, False]
+    now[0] = 1.0
+    passed = record("on_message")
+    assert throttle.filter(passed) and passed.suppressed == 7
+    assert throttle.filter(logging.makeLogRecord({"msg": "not an event"}))
+    assert throttle.stats() == {"on_message": {"seen": 11, "suppressed": 0}}
+
+def test_json_logs_are_written_off_the_calling_thread():
+    class Stream(io.StringIO):
+        threads = set()
+        def write(self, text):
+            self.threads.add(threading.current_thread().name)
+            return super().write(text)
+
+    stream = Stream()
+    root_level = logging.getLogger().level
+    setup_logging("INFO", "noisy=ERROR", "json", stream, EventThrottle())
+    try:
+        logging.getLogger("noisy.module").warning("hidden")
+        logging.getLogger("events.test").info("hello %s", "world", extra={"guild_id": 5})
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logging.getLogger("events.test").exception("failed")
+    finally:
+        stop_logging()
+        logging.getLogger().handlers.clear()
+        logging.getLogger().setLevel(root_level)
+        logging.getLogger("noisy").setLevel(logging.NOTSET)
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["logger"], line["message"]) for line in lines] == [("events.test", "hello world"), ("events.test", "failed")]
+    assert lines[0]["guild_id"] == 5 and lines[0]["level"] == "INFO"
+    assert "RuntimeError: boom" in lines[1]["exc_info"]
+    assert threading.current_thread().name not in stream.threads
+    with pytest.raises(ValueError):
+        parse_levels("discord=LOUD")
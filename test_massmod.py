@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import discord
+from benchmarks.fakes import FakeContext, make_guild
+from commands import massmod
+
+
+def snowflake_at(when):
+    return discord.utils.time_snowflake(when)
+
+def test_parse_user_ids_accepts_mentions_and_separators():
+    """Ids are extracted from mentions and mixed separators, without duplicates."""
+    text = "<@123456789012345678>, 223456789012345678\n<@!123456789012345678> nope"
+    assert massmod.parse_user_ids(text) == [123456789012345678, 223456789012345678]
+
+def test_select_targets_filters_by_join_time_and_account_age():
+    """Join-time and account-age filters work alone or combined."""
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    fresh = SimpleNamespace(id=snowflake_at(now - timedelta(days=1)), joined_at=now - timedelta(minutes=5))
+    old_account = SimpleNamespace(id=snowflake_at(now - timedelta(days=400)), joined_at=now - timedelta(minutes=5))
+    early_joiner = SimpleNamespace(id=snowflake_at(now - timedelta(days=1)), joined_at=now - timedelta(hours=5))
+    members = [fresh, old_account, early_joiner]
+    guild = SimpleNamespace(members=members, get_member=lambda user_id: next((m for m in members if m.id == user_id), None))
+    assert massmod.select_targets(guild, joined_within=10, now=now) == [fresh.id, old_account.id]
+    assert massmod.select_targets(guild, joined_within=10, account_age_days=7, now=now) == [fresh.id]
+    assert massmod.select_targets(guild, account_age_days=7, now=now) == [fresh.id, early_joiner.id]
+    assert massmod.select_targets(guild, now=now) == []
+
+def test_run_bounded_limits_concurrency(run):
+    """No more than the configured number of actions run at once."""
+    in_flight = peak = 0
+    async def action(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item == 3:
+            raise ValueError("boom")
+    succeeded, failed = run(massmod.run_bounded(range(10), action, 3))
+    assert peak == 3
+    assert sorted(succeeded) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert failed == {3: "boom"}
+
+def test_mass_action_reports_results_when_logging_fails(monkeypatch, run):
+    """A database failure after the kicks still shows the results and posts the summary to the log channel."""
+    class Context(FakeContext):
+        async def edit(self, *args, **kwargs):
+            self.edited = kwargs
+
+    class BrokenLogs:
+        async def insert_many(self, docs, ordered=True):
+            raise RuntimeError("database unavailable")
+
+    posted = []
+    async def send_mod_log(guild, embed):
+        posted.append(embed)
+
+    monkeypatch.setattr(massmod, "get_mod_logs_collection", lambda: BrokenLogs())
+    monkeypatch.setattr(massmod, "send_mod_log", send_mod_log)
+    guild = make_guild(member_count=3)
+    targets = [member.id for member in guild.members if member.id not in (guild.owner_id, guild.me.id)]
+    ctx = Context(guild, guild.owner)
+    run(massmod.MassModerationCog(None).mass_action(ctx, "kick", " ".join(map(str, targets)), None, None, "raid"))
+    fields = {field.name: field.value for field in ctx.edited["embed"].fields}
+    assert guild.kicked == 3 and "**Succeeded:** 3" in fields["Results"]
+    assert "database unavailable" in fields["⚠️ Not Logged"]
+    assert posted == [ctx.edited["embed"]]
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import discord
+from member_stats import MemberCounters, MembershipIndex
+
+
+def make_member(guild, bot=False, status=discord.Status.offline):
+    return SimpleNamespace(guild=guild, bot=bot, status=status)
+
+def make_guild(members=()):
+    guild = SimpleNamespace(id=1, members=[])
+    guild.members.extend(make_member(guild, *m) for m in members)
+    return guild
+
+def test_counters_follow_join_and_leave():
+    """Joins and leaves adjust the counts without rescanning."""
+    guild = make_guild([(False, discord.Status.online), (True, discord.Status.offline)])
+    counters = MemberCounters()
+    assert counters.get(guild).as_dict() == {"humans": 1, "bots": 1, "online": 1}
+    member = make_member(guild, bot=False, status=discord.Status.idle)
+    counters.member_joined(member)
+    assert counters.get(guild).as_dict() == {"humans": 2, "bots": 1, "online": 2}
+    counters.member_left(member)
+    assert counters.get(guild).as_dict() == {"humans": 1, "bots": 1, "online": 1}
+
+def test_presence_transitions_adjust_online():
+    """Only offline/online transitions change the online count."""
+    guild = make_guild([(False, discord.Status.offline)])
+    counters = MemberCounters()
+    counters.get(guild)
+    offline = make_member(guild)
+    online = make_member(guild, status=discord.Status.online)
+    dnd = make_member(guild, status=discord.Status.dnd)
+    counters.presence_changed(offline, online)
+    counters.presence_changed(online, dnd)
+    assert counters.get(guild).online == 1
+
+def test_verify_reports_and_fixes_drift():
+    """verify() compares against a full scan and resyncs."""
+    guild = make_guild([(False, discord.Status.offline)])
+    counters = MemberCounters()
+    counters.get(guild)
+    guild.members.append(make_member(guild, bot=True))
+    assert counters.verify(guild) == {"bots": (0, 1)}
+    assert counters.verify(guild) == {}
+
+def test_membership_index_counts_shared_users_once():
+    """A user in two guilds counts once as a user and twice as a membership."""
+    a = SimpleNamespace(id=1, members=[SimpleNamespace(id=10), SimpleNamespace(id=11)])
+    b = SimpleNamespace(id=2, members=[SimpleNamespace(id=10)])
+    index = MembershipIndex()
+    index.build([a, b])
+    assert (index.unique_users, index.memberships) == (2, 3)
+    index.member_left(SimpleNamespace(id=10, guild=a))
+    assert (index.unique_users, index.memberships) == (2, 2)
+    index.remove_guild(b)
+    assert (index.unique_users, index.memberships) == (1, 1)
+    assert index.largest_guilds() == [(1, 1)]
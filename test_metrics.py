@@ -0,0 +1,77 @@
+import discord
+from metrics import Histogram, Metrics, metrics, instrument_cog
+from project import DiscordBot
+
+
+class Sample(discord.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.joined = []
+
+    @discord.slash_command(name="sample")
+    async def sample(self, ctx):
+        raise RuntimeError("boom")
+
+    @discord.Cog.listener()
+    async def on_member_join(self, member):
+        self.joined.append(member)
+
+def test_histogram_percentiles():
+    """Percentiles land within one bucket (25%) of the true value."""
+    histogram = Histogram()
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)
+    assert abs(histogram.percentile(0.50) - 0.5) / 0.5 < 0.25
+    assert abs(histogram.percentile(0.99) - 0.99) / 0.99 < 0.25
+    assert histogram.count == 1000
+
+def test_prometheus_text():
+    """Histograms are cumulative and end with a +Inf bucket equal to the count."""
+    registry = Metrics()
+    registry.observe("command", "ping", 0.01)
+    registry.observe("command", "ping", 0.02, error=True)
+    registry.increment("ratelimit_rejections", "warn")
+    text = registry.prometheus_text()
+    assert 'recon_command_latency_seconds_bucket{name="ping",le="+Inf"} 2' in text
+    assert 'recon_command_errors_total{name="ping"} 1' in text
+    assert 'recon_ratelimit_rejections_total{name="warn"} 1' in text
+
+def test_instrument_cog_times_commands_and_listeners(run):
+    """Commands and listeners are wrapped once; errors are counted and re-raised."""
+    metrics.reset()
+    bot = DiscordBot()
+    cog = Sample(bot)
+    bot.add_cog(cog)
+    instrument_cog(bot, cog)
+    instrument_cog(bot, cog)  # idempotent
+    listeners = bot._event_handlers["on_member_join"]
+    assert len(listeners) == 1
+
+    async def main():
+        await listeners[0]("member")
+        try:
+            await cog.sample.callback(cog, None)
+        except RuntimeError:
+            pass
+    run(main())
+    rows = {row["name"]: row for row in metrics.summary()}
+    assert cog.joined == ["member"]
+    assert rows["Sample.on_member_join"]["count"] == 1
+    assert rows["sample"]["errors"] == 1
+    bot.remove_cog("Sample")
+    assert not bot._event_handlers.get("on_member_join")
+
+def test_merge_adds_exported_registries():
+    """Merging exports from two processes gives the same histogram as recording both in one."""
+    a, b, combined = Metrics(), Metrics(), Metrics()
+    for registry, samples in ((a, [0.001, 0.002]), (b, [0.5, 0.004, 0.003])):
+        for seconds in samples:
+            registry.observe("command", "warn", seconds)
+            combined.observe("command", "warn", seconds)
+        registry.increment("ratelimited", "warn")
+        combined.increment("ratelimited", "warn")
+    merged = Metrics()
+    merged.merge(a.export())
+    merged.merge(b.export())
+    assert merged.summary() == combined.summary()
+    assert merged.counter("ratelimited", "warn") == 2
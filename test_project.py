@@ -1,3 +1,5 @@
+import asyncio
+import discord
 import pytest
 import project
 
@@ -38,3 +40,146 @@ def test_bot_attributes(bot_instance):
     assert hasattr(bot_instance, "loaded_events")
     assert isinstance(bot_instance.loaded_commands, set)
     assert isinstance(bot_instance.loaded_events, set)
+
+def test_format_startup_profile_orders_slowest_first():
+    """The startup table lists the slowest module first."""
+    table = project.format_startup_profile([
+        {"module": "commands.fast", "import_ms": 1.0, "setup_ms": 0.5, "status": "ok"},
+        {"module": "commands.slow", "import_ms": 9.0, "setup_ms": 0.5, "status": "ok"},
+    ], 0.02)
+    lines = table.splitlines()
+    assert lines[2].startswith("commands.slow")
+    assert lines[-1] == "Startup took 20ms for 2 modules"
+
+PLUGIN_SOURCE = '''
+import discord
+
+class Hello(discord.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @discord.slash_command(name="hello", description="{description}")
+    async def hello(self, ctx):
+        await ctx.respond("{reply}")
+
+def setup(bot):
+    bot.add_cog(Hello(bot))
+'''
+
+def test_reload_only_syncs_when_commands_change(tmp_path, monkeypatch, run):
+    """Changed files are reloaded, and commands re-sync only if their payload changed."""
+    import sys
+    (tmp_path / "plugins").mkdir()
+    (tmp_path / "plugins" / "__init__.py").write_text("")
+    plugin = tmp_path / "plugins" / "hello.py"
+    plugin.write_text(PLUGIN_SOURCE.format(description="Say hi", reply="hi"))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+
+    bot = project.DiscordBot()
+    loaded = set()
+    try:
+        run(bot._load_folder("plugins", loaded))
+        first_cog = bot.get_cog("Hello")
+        assert run(bot._reload_folder("plugins", loaded))["reloaded"] == []
+
+        plugin.write_text(PLUGIN_SOURCE.format(description="Say hi", reply="hello there"))
+        report = run(bot._reload_folder("plugins", loaded))
+        assert report["reloaded"] == ["plugins.hello"]
+        assert not report["commands_changed"]
+        assert bot.get_cog("Hello") is not first_cog
+
+        plugin.write_text(PLUGIN_SOURCE.format(description="Say hello", reply="hello there"))
+        assert run(bot._reload_folder("plugins", loaded))["commands_changed"]
+    finally:
+        for name in [name for name in sys.modules if name.startswith("plugins")]:
+            del sys.modules[name]
+
+def test_command_tree_hash_tracks_guild_scope(run):
+    """The command tree hash is stable and changes with the guild scope."""
+    first, second = project.DiscordBot(), project.DiscordBot()
+    run(first.load_commands())
+    run(second.load_commands())
+    assert first.command_tree_hash() == second.command_tree_hash()
+    second.debug_guilds = [1234]
+    assert first.command_tree_hash() != second.command_tree_hash()
+
+def test_skipped_sync_still_routes_global_commands(tmp_path, monkeypatch, run):
+    """With an unchanged command tree the sync is skipped, but interactions still find their command."""
+    from types import SimpleNamespace
+    invoked = []
+
+    class Hello(discord.Cog):
+        @discord.slash_command(name="hello", description="Say hi")
+        async def hello(self, ctx):
+            pass
+
+    bot = project.DiscordBot()
+    bot.add_cog(Hello())
+    bot._connection.application_id = 42
+    hash_file = tmp_path / ".command_hash"
+    hash_file.write_text(bot.command_tree_hash())
+    monkeypatch.setattr(project, "COMMAND_HASH_FILE", str(hash_file))
+    async def get_global_commands(application_id):
+        return [{"id": "900", "name": "hello", "type": 1, "application_id": str(application_id)}]
+    async def sync_commands():
+        raise AssertionError("an unchanged tree must not be synced")
+    async def get_application_context(interaction):
+        return SimpleNamespace(interaction=interaction)
+    async def invoke_application_command(ctx):
+        invoked.append(ctx.interaction.command)
+    monkeypatch.setattr(bot.http, "get_global_commands", get_global_commands)
+    monkeypatch.setattr(bot, "sync_commands", sync_commands)
+    monkeypatch.setattr(bot, "get_application_context", get_application_context)
+    monkeypatch.setattr(bot, "invoke_application_command", invoke_application_command)
+    interaction = SimpleNamespace(type=discord.InteractionType.application_command, data={"id": "900", "name": "hello", "type": 1, "guild_id": "77"})
+    assert run(bot.sync_command_tree()) is False
+    run(bot.process_application_commands(interaction))
+    assert [command.name for command in invoked] == ["hello"]
+
+async def cancel_background_tasks(bot):
+    """Stop the tasks setup_hook started, so none is left pending when the loop closes"""
+    tasks = [task for task in (bot._retention_task, bot._ratelimit_task) if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+def test_setup_hook_runs_once(monkeypatch, run):
+    """A second setup_hook call (from a reconnect's on_ready) does nothing."""
+    bot = project.DiscordBot()
+    calls = []
+    async def record_step():
+        calls.append("setup")
+    monkeypatch.setattr(bot, "warm_up_database", record_step)
+    monkeypatch.setattr(bot, "load_commands", record_step)
+    monkeypatch.setattr(bot, "load_events", record_step)
+    async def fake_sync():
+        return False
+    monkeypatch.setattr(bot, "sync_command_tree", fake_sync)
+    async def main():
+        await bot.setup_hook()
+        retention_task = bot._retention_task
+        await bot.setup_hook()
+        assert bot._retention_task is retention_task
+        await cancel_background_tasks(bot)
+    run(main())
+    assert calls == ["setup", "setup", "setup"]
+
+def test_only_the_first_cluster_archives_mod_logs(monkeypatch, run):
+    """The retention archiver covers every guild, so other cluster workers don't start it."""
+    from types import SimpleNamespace
+    async def step():
+        return False
+    for cluster_id, archives in ((0, True), (1, False)):
+        bot = project.DiscordBot()
+        for name in ("warm_up_database", "load_commands", "load_events", "sync_command_tree"):
+            monkeypatch.setattr(bot, name, step)
+        monkeypatch.setattr(bot, "register_cluster_handlers", lambda: None)
+        monkeypatch.setattr(project, "cluster_client", SimpleNamespace(enabled=True, cluster_id=cluster_id, start=lambda: None))
+        async def main():
+            await bot.setup_hook()
+            started = bot._retention_task is not None
+            await cancel_background_tasks(bot)
+            return started
+        assert run(main()) == archives
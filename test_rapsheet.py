@@ -0,0 +1,50 @@
+from datetime import datetime
+from commands import rapsheet
+
+def test_first_page_query_has_no_range():
+    """The first page only filters on guild and user."""
+    assert rapsheet.page_query(1, 2) == {"guild_id": 1, "user_id": 2}
+
+def test_page_query_starts_at_key():
+    """Later pages resume at the (timestamp, _id) key, inclusive."""
+    ts = datetime(2024, 1, 1)
+    query = rapsheet.page_query(1, 2, (ts, "abc"))
+    assert query["$or"] == [
+        {"timestamp": {"$gt": ts}},
+        {"timestamp": ts, "_id": {"$gte": "abc"}},
+    ]
+
+def test_rapsheet_defers_before_a_slow_flush(monkeypatch, run):
+    """The interaction is acknowledged first, and a backlog in the log buffer doesn't hold the reply."""
+    import asyncio
+    import discord
+    import db
+    from benchmarks.fakes import FakeContext, MemoryDatabase, make_guild
+
+    class Context(FakeContext):
+        async def defer(self, *args, **kwargs):
+            self.calls.append("defer")
+        async def respond(self, *args, **kwargs):
+            self.calls.append("respond")
+
+    class StuckCollection:
+        async def insert_many(self, docs, ordered=True):
+            await asyncio.sleep(3600)
+
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    monkeypatch.setattr(rapsheet, "FLUSH_TIMEOUT", 0.05)
+    writer = db.ModLogWriter(StuckCollection, flush_interval=0)
+    monkeypatch.setattr(rapsheet, "mod_log_writer", writer)
+    guild = make_guild(member_count=5)
+    ctx = Context(guild, guild.owner)
+    ctx.calls = []
+    cog = rapsheet.RapSheetCog(None)
+
+    async def main():
+        await writer.put({"guild_id": guild.id, "user_id": 1})
+        await asyncio.wait_for(cog.rapsheet.callback(cog, ctx, guild.members[0], False), 1)
+        writer._task.cancel()
+        await asyncio.gather(writer._task, return_exceptions=True)
+
+    run(main())
+    assert ctx.calls == ["defer", "respond"]
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+import cache
+import ratelimit
+from metrics import metrics
+from ratelimit import RateLimiter, rate_limited
+
+
+def test_token_bucket_refills_and_sweeps():
+    """A burst of ``uses`` calls goes through, then one more every ``seconds / uses``; full buckets are swept."""
+    now = [0.0]
+    limiter = RateLimiter(clock=lambda: now[0])
+    assert [limiter.hit("a", 3, 30) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("a", 3, 30) == 10.0
+    now[0] = 10.0
+    assert limiter.hit("a", 3, 30) == 0.0
+    assert limiter.hit("b", 3, 30) == 0.0
+    now[0] = 19.0
+    assert limiter.sweep() == 0
+    now[0] = 40.0  # "b" refilled at 20, "a" at 40
+    assert limiter.sweep() == 2 and len(limiter) == 0
+    assert limiter.stats() == {"buckets": 0, "allowed": 5, "rejected": 1}
+
+def test_decorator_uses_guild_overrides_and_counts_rejections(monkeypatch, run):
+    class Command:
+        calls = 0
+
+        @rate_limited("echo")
+        async def echo(self, ctx, message):
+            self.calls += 1
+
+    class Context:
+        def __init__(self, guild_id, user_id):
+            self.guild = SimpleNamespace(id=guild_id)
+            self.author = SimpleNamespace(id=user_id)
+            self.replies = []
+
+        async def respond(self, content, ephemeral=False):
+            self.replies.append(content)
+
+    monkeypatch.setattr(ratelimit, "rate_limiter", RateLimiter(clock=lambda: 0.0))
+    cache.cache_guild_settings(901, {"_id": 901, "rate_limits": {"echo": [1, 60]}})
+    cache.cache_guild_settings(902, {"_id": 902, "rate_limits": {"echo": [0, 60]}})
+    before = metrics.counter("ratelimit_rejections", "echo")
+    command = Command()
+    limited, other_user, unlimited = Context(901, 1), Context(901, 2), Context(902, 1)
+
+    async def main():
+        for ctx in (limited, limited, other_user, *[unlimited] * 10):
+            await command.echo(ctx, "hi")
+
+    run(main())
+    assert command.calls == 12
+    assert limited.replies == ["⏳ You're using `/echo` too quickly. Try again in 60s."]
+    assert other_user.replies == unlimited.replies == []
+    assert metrics.counter("ratelimit_rejections", "echo") - before == 1
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+import db
+from benchmarks.fakes import FakeContext, MemoryDatabase, make_guild
+from commands.rapsheet import RapSheetView
+from retention import LogArchiver, read_archive
+
+
+def test_expired_logs_move_to_archive(tmp_path, monkeypatch, run):
+    """Only logs past the guild's retention window leave the hot collection, in batches."""
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    now = datetime(2024, 6, 1)
+    archiver = LogArchiver(tmp_path, batch_size=4)
+
+    async def main():
+        await db.get_guild_settings_collection().insert_many([{"_id": 1, "log_retention_days": 30}, {"_id": 2}])
+        await db.get_mod_logs_collection().insert_many(
+            [{"guild_id": guild_id, "user_id": 5, "timestamp": now - timedelta(days=days)} for guild_id in (1, 2) for days in range(0, 100, 10)]
+        )
+        moved = await archiver.run_once(now)
+        remaining = await db.get_mod_logs_collection().find({"guild_id": 1}).to_list()
+        return moved, remaining
+
+    moved, remaining = run(main())
+    assert moved == {1: 6}
+    assert sorted(doc["timestamp"] for doc in remaining) == [now - timedelta(days=d) for d in (30, 20, 10, 0)]
+    archived = read_archive(tmp_path, 1, user_id=5)
+    assert [doc["timestamp"] for doc in archived] == [now - timedelta(days=d) for d in (90, 80, 70, 60, 50, 40)]
+    assert read_archive(tmp_path, 2) == []
+
+def test_rapsheet_pages_archived_then_live(monkeypatch, run):
+    """Archived entries fill the first pages and live logs continue on the page they end."""
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    guild = make_guild(member_count=5)
+    user = guild.members[0]
+    start = datetime(2024, 1, 1)
+    archived = [{"_id": i, "action": "warn", "timestamp": start + timedelta(hours=i)} for i in range(15)]
+
+    async def main():
+        await db.get_mod_logs_collection().insert_many(
+            [{"guild_id": guild.id, "user_id": user.id, "action": "kick", "timestamp": start + timedelta(days=10, hours=i)} for i in range(12)]
+        )
+        view = RapSheetView(FakeContext(guild, guild.owner), user, 12, archived)
+        pages = []
+        for page in range(view.page_count):
+            embed = await view.load(page)
+            pages.append(([field.name.split(". ")[1] for field in embed.fields], view.next_page.disabled))
+        return pages
+
+    pages = run(main())
+    assert pages == [(["Warn"] * 10, False), (["Warn"] * 5 + ["Kick"] * 5, False), (["Kick"] * 7, True)]
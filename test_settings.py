@@ -0,0 +1,29 @@
+import discord
+import db
+from benchmarks.fakes import FakeContext, FakeMember, MemoryDatabase, make_guild
+from commands.settings import SettingsCog
+
+
+class Context(FakeContext):
+    async def respond(self, *args, **kwargs):
+        self.reply = kwargs
+
+def subcommand(name):
+    return next(command for command in SettingsCog.settings.subcommands if command.name == name)
+
+def test_destructive_settings_need_manage_server(monkeypatch, run):
+    """Members without Manage Server are refused before anything is written."""
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    guild = make_guild(member_count=5)
+    member = FakeMember(1, "member", guild, guild.roles[:1], None, permissions=discord.Permissions(kick_members=True))
+    cog = SettingsCog(None)
+    calls = {
+        "retention": {"days": 1},
+        "ratelimit": {"command": "rapsheet", "uses": 0, "seconds": 60},
+        "rebuildsummaries": {},
+    }
+    for name, arguments in calls.items():
+        ctx = Context(guild, member)
+        run(subcommand(name).callback(cog, ctx, **arguments))
+        assert ctx.reply["ephemeral"] and ctx.reply["embed"].title == "Missing Permissions", name
+    assert run(db.get_guild_settings_collection().find_one({"_id": guild.id})) is None
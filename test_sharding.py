@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+import discord
+import pytest
+from sharding import ShardStats, parse_shard_ids, shard_options
+
+
+def test_shard_options_from_env_values():
+    """No settings means one connection; ids need a numeric count that covers them."""
+    assert shard_options("", "") == (False, {})
+    assert shard_options("auto", "") == (True, {})
+    assert shard_options("8", "0-2, 6") == (True, {"shard_count": 8, "shard_ids": [0, 1, 2, 6]})
+    assert parse_shard_ids("3,1-2,2") == [1, 2, 3]
+    with pytest.raises(ValueError):
+        shard_options("", "0-1")
+    with pytest.raises(ValueError):
+        shard_options("2", "1-2")
+
+def test_shard_stats_rate_from_sequence():
+    """The event rate is the sequence delta between samples; a new session restarts it."""
+    ws = SimpleNamespace(sequence=100)
+    bot = SimpleNamespace(latency=0.05, ws=ws, guilds=[object(), object()])
+    stats = ShardStats()
+    first = stats.snapshot(bot, now=10.0)
+    assert first == [{"id": 0, "latency_ms": 50.0, "guilds": 2, "events": 100, "events_per_sec": None}]
+    ws.sequence = 400
+    assert stats.snapshot(bot, now=12.0)[0]["events_per_sec"] == 150.0
+    ws.sequence = 5
+    assert stats.snapshot(bot, now=13.0)[0]["events_per_sec"] is None
+
+def test_bot_class_follows_shard_settings():
+    """The default bot stays a discord.Bot; SHARD_COUNT switches to AutoShardedBot."""
+    import project
+    assert isinstance(project.bot, discord.Bot)
+    script = "import discord, project; print(type(project.bot).__mro__[1].__name__, project.bot.shard_count, project.bot.shard_ids)"
+    env = dict(os.environ, SHARD_COUNT="4", SHARD_IDS="2-3")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["AutoShardedBot", "4", "[2,", "3]"]
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+import pytest
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from db import INDEXES, plan_stages
+from storage import SQLiteDatabase, translate
+from commands.rapsheet import LOG_SORT, page_query
+
+
+def test_translate_pushes_indexed_fields_only():
+    """Conditions on promoted columns become SQL; others mark the filter incomplete."""
+    columns = {"_id": "_id", "guild_id": "guild_id", "timestamp": "timestamp"}
+    sql, params, complete = translate({"guild_id": 1, "timestamp": {"$gte": 5, "$lt": 9}}, columns)
+    assert sql == '"guild_id" IS ? AND "timestamp" >= ? AND "timestamp" < ?'
+    assert params == [1, 5, 9] and complete
+    _, _, complete = translate({"guild_id": 1, "reason": "spam"}, columns)
+    assert not complete
+
+def test_sqlite_collection_round_trip(tmp_path, run):
+    """Keyset pages, counts, upserts and duplicate handling behave like Mongo."""
+    database = SQLiteDatabase(str(tmp_path / "bot.db"))
+    logs = database["mod_logs"]
+    start = datetime(2024, 1, 1)
+
+    async def main():
+        await logs.insert_many([{"guild_id": 1, "user_id": i % 2, "reason": "r", "timestamp": start + timedelta(minutes=i)} for i in range(30)])
+        await logs.create_indexes(INDEXES["mod_logs"])  # promotes and backfills columns
+        first = await logs.find(page_query(1, 0)).sort(LOG_SORT).limit(11).to_list(length=11)
+        second = await logs.find(page_query(1, 0, (first[10]["timestamp"], first[10]["_id"]))).sort(LOG_SORT).limit(11).to_list(length=11)
+        count = await logs.count_documents({"guild_id": 1, "user_id": 0, "reason": "r"})
+        settings = database["guild_settings"]
+        doc = await settings.find_one_and_update({"_id": 7}, {"$set": {"fun_enabled": False}}, upsert=True, return_document=ReturnDocument.AFTER)
+        with pytest.raises(BulkWriteError) as error:
+            await settings.insert_many([{"_id": 8}, {"_id": 7}], ordered=False)
+        plan = await logs.find({"guild_id": 1, "user_id": 0}).sort(LOG_SORT).explain()
+        await database.close()
+        return first, second, count, doc, error.value.details["nInserted"], plan
+
+    first, second, count, doc, inserted, plan = run(main())
+    assert [d["timestamp"] for d in first] == [start + timedelta(minutes=2 * i) for i in range(11)]
+    assert second[0]["_id"] == first[10]["_id"] and len(second) == 5
+    assert count == 15
+    assert doc == {"_id": 7, "fun_enabled": False}
+    assert inserted == 1
+    stages = plan_stages(plan)
+    assert "IXSCAN" in stages and "SORT" not in stages
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+import db
+from benchmarks.fakes import MemoryDatabase
+from storage import SQLiteDatabase
+from db import ModLogWriter, get_mod_summary, rebuild_mod_summaries, record_mod_summaries, summary_pipeline
+
+
+def test_writer_keeps_summaries_in_step_with_rebuild(monkeypatch, run):
+    """Summaries updated on each flush match a rebuild from the logs plus the archive."""
+    monkeypatch.setattr(db, "db", MemoryDatabase())
+    start = datetime(2024, 1, 1)
+    actions = ["warn", "warn", "kick", "ban", "warn"]
+    logs = [{"guild_id": 1, "user_id": i % 2, "action": action, "timestamp": start + timedelta(hours=i)} for i, action in enumerate(actions)]
+    archived = [{"_id": "old", "guild_id": 1, "user_id": 0, "action": "warn", "timestamp": start - timedelta(days=400)}]
+
+    async def main():
+        await record_mod_summaries(archived)  # counted when first written, before being archived
+        writer = ModLogWriter(db.get_mod_logs_collection, batch_size=2, flush_interval=0.01, on_written=record_mod_summaries)
+        for log in logs:
+            await writer.put(log)
+        await writer.close()
+        incremental = [await get_mod_summary(1, user_id) for user_id in (0, 1)]
+        assert await rebuild_mod_summaries(1, archived) == 2
+        rebuilt = [await get_mod_summary(1, user_id) for user_id in (0, 1)]
+        return incremental, rebuilt
+
+    incremental, rebuilt = run(main())
+    assert incremental == rebuilt
+    assert rebuilt[0] == {
+        "_id": "1:0", "guild_id": 1, "user_id": 0, "total": 4, "warns": 3, "kicks": 1,
+        "last_action_at": start + timedelta(hours=4), "last_warn_at": start + timedelta(hours=4), "last_kick_at": start + timedelta(hours=2),
+    }
+    assert rebuilt[1]["bans"] == 1 and rebuilt[1]["warns"] == 1 and "last_kick_at" not in rebuilt[1]
+
+def test_summary_pipeline_groups_one_guild_by_user():
+    match, group = summary_pipeline(7)
+    assert match == {"$match": {"guild_id": 7}}
+    assert group["$group"]["_id"] == "$user_id"
+    assert set(group["$group"]) >= {"warns", "kicks", "bans", "last_warn_at", "last_action_at"}
+
+def test_rebuild_replaces_in_place_and_drops_only_stale_summaries(monkeypatch, tmp_path, run):
+    """A rebuild overwrites existing summaries and removes users without logs, leaving other guilds alone."""
+    database = SQLiteDatabase(str(tmp_path / "bot.db"))
+    monkeypatch.setattr(db, "db", database)
+    start = datetime(2024, 1, 1)
+
+    async def main():
+        summaries = db.get_mod_summary_collection()
+        await summaries.insert_many([
+            {"_id": "1:0", "guild_id": 1, "user_id": 0, "total": 9, "warns": 9},
+            {"_id": "1:5", "guild_id": 1, "user_id": 5, "total": 1, "kicks": 1},
+            {"_id": "2:5", "guild_id": 2, "user_id": 5, "total": 1, "kicks": 1},
+        ])
+        await db.get_mod_logs_collection().insert_one({"guild_id": 1, "user_id": 0, "action": "ban", "timestamp": start})
+        assert await rebuild_mod_summaries(1) == 1
+        rows = await summaries.find({}).to_list(length=None)
+        await database.close()
+        return {row["_id"]: row for row in rows}
+
+    rows = run(main())
+    assert set(rows) == {"1:0", "2:5"}
+    assert rows["1:0"]["bans"] == 1 and rows["1:0"]["total"] == 1 and "warns" not in rows["1:0"]
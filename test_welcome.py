@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+from events import welcome
+
+
+class FakeChannel:
+    def __init__(self):
+        self.id = 5
+        self.name = "welcome"
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+def make_guild(channel):
+    guild = SimpleNamespace(id=1, channels=[channel])
+    def get_channel(channel_id):
+        return channel if channel_id == channel.id else None
+    guild.get_channel = get_channel
+    return guild
+
+def test_joins_within_window_are_coalesced(monkeypatch, run):
+    """Joins inside the batch window produce a single welcome message."""
+    channel = FakeChannel()
+    guild = make_guild(channel)
+    async def settings(guild_id):
+        return {"welcome_batch_seconds": 0.05}
+    monkeypatch.setattr(welcome, "get_guild_settings", settings)
+    cog = welcome.Welcome(bot=None)
+    members = [SimpleNamespace(guild=guild, mention=f"<@{i}>") for i in range(3)]
+    async def main():
+        await asyncio.wait_for(asyncio.gather(*(cog.on_member_join(m) for m in members)), timeout=0.04)  # listeners don't wait out the window
+        await asyncio.gather(*cog.flushes.values())
+    run(main())
+    assert channel.sent == ["Welcome <@0>, <@1>, <@2>, Hope you enjoy your stay here."]
+    assert cog.pending == cog.flushes == {}
+
+def test_failed_welcome_still_ends_the_window(monkeypatch, run):
+    """A send error is logged and the next join starts a fresh batch."""
+    channel = FakeChannel()
+    guild = make_guild(channel)
+    async def settings(guild_id):
+        return {"welcome_batch_seconds": 0.01}
+    async def broken_send(content):
+        raise RuntimeError("channel gone")
+    monkeypatch.setattr(welcome, "get_guild_settings", settings)
+    cog = welcome.Welcome(bot=None)
+    async def main():
+        channel.send = broken_send
+        await cog.on_member_join(SimpleNamespace(guild=guild, mention="<@0>"))
+        await asyncio.gather(*cog.flushes.values())
+        assert cog.pending == {}
+        del channel.send
+        await cog.on_member_join(SimpleNamespace(guild=guild, mention="<@1>"))
+        await asyncio.gather(*cog.flushes.values())
+    run(main())
+    assert channel.sent == ["Welcome <@1>, Hope you enjoy your stay here."]
+
+def test_channel_lookup_is_cached_until_invalidated(run):
+    """The welcome channel is resolved by name once, then by id."""
+    channel = FakeChannel()
+    guild = make_guild(channel)
+    cog = welcome.Welcome(bot=None)
+    assert cog.welcome_channel(guild) is channel
+    guild.channels = []
+    assert cog.welcome_channel(guild) is channel
+    run(cog.on_guild_channel_delete(SimpleNamespace(guild=guild)))
+    assert cog.welcome_channel(guild) is None